@@ -1,20 +1,28 @@
+import asyncio
 import gc
-import hashlib
-import json
+import multiprocessing
 import os
+import queue
 import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
 
 import psutil
 from langchain.schema import Document
 from langchain_community.document_loaders import TextLoader, PyPDFLoader, Docx2txtLoader, \
     UnstructuredWordDocumentLoader, UnstructuredPDFLoader, UnstructuredExcelLoader
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
-from qdrant_client.models import PointStruct
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from tqdm import tqdm
 
+from app.config.settings import CHUNKER_MODE, EMBED_MAX_BATCH_SIZE, EMBEDDING_CHUNKER_SIMILARITY_THRESHOLD, \
+    SKIP_EXISTING_CHUNKS
+from app.utils.batch_embedding import build_point, embed_and_upsert, embed_sentence_chunks, embed_with_bisection, \
+    missing_indexes, plan_batches, token_lengths
+from app.utils.bulk_load import BulkLoadSession, restore_open_sessions
+from app.utils.checkpoint_store import CheckpointStore, file_content_hash
+from app.utils.lexical import has_lexical_vectors, sparse_vectors_config
 from app.utils.merge_meaning import SemanticChunker
+from app.utils.storage_profiles import VECTOR_NAME, collection_profile, quantization_config, vector_params
 
 # Constants for resource management
 MAX_MEMORY_PERCENT = 85  # Maximum memory usage percentage
@@ -22,7 +30,17 @@ CRITICAL_MEMORY_PERCENT = 90  # Critical memory threshold
 FORCE_EXIT_MEMORY_PERCENT = 95  # Force exit if memory exceeds this percentage
 MIN_AVAILABLE_MEMORY_GB = 2.0  # Minimum available memory in GB
 MEMORY_CHECK_INTERVAL = 5  # Memory check interval in seconds
-CHECKPOINT_FILE = "knowledge_checkpoint.json"  # Checkpoint file
+CHECKPOINT_DB = "knowledge_checkpoint.db"  # Checkpoint database (SQLite, per-file and per-chunk progress)
+MEMORY_BACKPRESSURE_TIMEOUT = 300  # Seconds of critical memory pressure before giving up and exiting
+
+# Constants for the ingestion pipeline
+QDRANT_URL = "http://localhost:6333"  # Qdrant server
+CHUNK_WORKERS = max(1, (os.cpu_count() or 2) - 2)  # Processes loading and chunking files
+EMBED_QUEUE_SIZE = 4  # Chunked files waiting for the embedding worker
+UPSERT_QUEUE_SIZE = 8  # Embedded batches waiting for the upsert stage
+UPSERT_CONCURRENCY = 2  # Upserts in flight at once
+STREAMING_FILE_SIZE_MB = 20  # Larger files skip the pipeline and are streamed page by page by process_file
+STREAM_SENTENCE_WINDOW = 2000  # Sentences embedded at once when streaming in embedding chunker mode
 
 # from langchain_ollama import OllamaEmbeddings
 # embeddings = OllamaEmbeddings(model="llama3.2:1b")
@@ -34,6 +52,16 @@ import torch
 embeddings = None
 client = None
 
+# Set by the memory monitor thread while producers should pause
+memory_pressure = threading.Event()
+
+# Progress of every file and chunk, shared by the pipeline stages
+checkpoint_store = CheckpointStore(CHECKPOINT_DB)
+
+# Chunks embedded and skipped during this run, for the run summary
+run_stats = {"embedded": 0, "embed_seconds": 0.0, "skipped": 0, "skipped_before_embedding": 0}
+run_stats_lock = threading.Lock()
+
 def initialize_embeddings():
     """Initialize the embedding model with proper error handling and optimization."""
     global embeddings, device
@@ -140,7 +168,7 @@ def initialize_qdrant_client():
 
         for retry in range(max_retries):
             try:
-                client = QdrantClient(url="http://localhost:6333")
+                client = QdrantClient(url=QDRANT_URL)
                 # Test connection
                 client.get_collections()
                 print("✅ Connected to Qdrant server successfully")
@@ -165,12 +193,15 @@ def create_collection(collection_name=''):
     try:
         # Check if collection exists
         if not client.collection_exists(collection_name):
-            print(f"   Creating collection '{collection_name}'...")
+            profile = collection_profile(collection_name)
+            print(f"   Creating collection '{collection_name}' with storage profile '{profile.name}'...")
             client.create_collection(
                 collection_name=collection_name,
                 vectors_config={
-                    "content": VectorParams(size=768, distance=Distance.COSINE)
-                }
+                    VECTOR_NAME: vector_params(profile)
+                },
+                sparse_vectors_config=sparse_vectors_config(profile.vectors_on_disk),
+                quantization_config=quantization_config(profile),
             )
             print(f"   Collection '{collection_name}' created successfully")
         else:
@@ -179,7 +210,78 @@ def create_collection(collection_name=''):
         print(f"   ❌ Error creating collection '{collection_name}': {str(e)}")
         raise
 
-def chunked_metadata(data, client=None, collection_name="base_knowledge"):
+def upsert_points(client, collection_name, points):
+    """
+    Upsert a batch of points, retrying with exponential backoff.
+
+    Returns:
+        True if the batch was written
+    """
+    # Upsert batch with retry logic
+    max_retries = 3
+    retry_delay = 2
+    for retry in range(max_retries):
+        try:
+            client.upsert(
+                collection_name=collection_name,
+                wait=True,
+                points=points
+            )
+            return True  # Success, exit retry loop
+        except Exception as e:
+            if retry < max_retries - 1:
+                print(f"   ⚠️ Error upserting batch (retry {retry+1}/{max_retries}): {str(e)}")
+                # Clean up memory before retry
+                gc.collect()
+                time.sleep(retry_delay)
+                retry_delay *= 2  # Exponential backoff
+            else:
+                print(f"   ❌ Failed to upsert batch after {max_retries} retries: {str(e)}")
+    return False
+
+def record_embedding(embedded, seconds):
+    """Add embedded chunks and the time spent on them to the run summary."""
+    with run_stats_lock:
+        run_stats["embedded"] += embedded
+        run_stats["embed_seconds"] += seconds
+
+def chunks_to_ingest(documents, collection_name, embedded=False):
+    """
+    Skip the chunks whose point is already in the collection, before they are embedded.
+
+    Args:
+        documents: The chunk Documents
+        collection_name: Name of the collection to check
+        embedded: True if the chunks already have vectors (embedding chunker mode)
+
+    Returns:
+        The indexes of the documents still to ingest
+    """
+    if not SKIP_EXISTING_CHUNKS or not documents:
+        return list(range(len(documents)))
+    kept = missing_indexes(documents, initialize_qdrant_client(), collection_name)
+    skipped = len(documents) - len(kept)
+    if skipped:
+        print(f"   ⏭️ Skipped {skipped} chunks already in collection {collection_name}")
+        with run_stats_lock:
+            run_stats["skipped"] += skipped
+            # Pooled vectors have been computed already, only their upsert is saved
+            if not embedded:
+                run_stats["skipped_before_embedding"] += skipped
+    return kept
+
+def print_run_summary():
+    """Print the chunks embedded and skipped during this run, with an estimate of the embedding time saved."""
+    with run_stats_lock:
+        stats = dict(run_stats)
+    seconds_per_chunk = stats["embed_seconds"] / stats["embedded"] if stats["embedded"] else 0.0
+    print(f"📊 Embedded {stats['embedded']} chunks in {stats['embed_seconds']:.1f}s")
+    if stats["skipped"]:
+        saved = stats["skipped_before_embedding"] * seconds_per_chunk
+        print(f"⏭️ Skipped {stats['skipped']} chunks already in Qdrant, "
+              f"{stats['skipped_before_embedding']} of them before embedding (about {saved:.1f}s saved)")
+
+def chunked_metadata(data, client=None, collection_name="base_knowledge", vectors=None):
     """
     Add documents to a Qdrant collection with content-based IDs to prevent conflicts.
 
@@ -192,6 +294,7 @@ def chunked_metadata(data, client=None, collection_name="base_knowledge"):
         data: List of Document objects to add to the collection
         client: QdrantClient instance to use (if None, will be initialized)
         collection_name: Name of the collection to add the data to
+        vectors: Optional precomputed vectors of the documents (embedding chunker mode)
     """
     # Initialize client and embeddings if not provided
     if client is None:
@@ -211,129 +314,44 @@ def chunked_metadata(data, client=None, collection_name="base_knowledge"):
     memory_monitor.start()
     print(f"   Started memory monitoring thread for collection {collection_name}")
 
-    # Calculate batch size based on data size and system resources
+    # Chunks whose content hash is already stored need no embedding
+    kept = chunks_to_ingest(data, collection_name, embedded=vectors is not None)
+    data = [data[i] for i in kept]
+    if vectors is not None:
+        vectors = [vectors[i] for i in kept]
+
+    # Calculate the largest batch allowed by system resources, shorter chunks are batched up to it
     batch_size = calculate_batch_size(len(data))
-    print(f"   Processing {len(data)} documents with batch size {batch_size}")
+    print(f"   Processing {len(data)} documents with batch size up to {batch_size}")
 
     # Create progress bar
     pbar = tqdm(total=len(data), desc=f"Processing {collection_name}", 
                 unit="docs", ncols=100, position=0, leave=True)
 
-    try:
-        # Process documents in batches
-        total_processed = 0
-        for i in range(0, len(data), batch_size):
-            # Monitor system resources
-            monitor_system_resources()
-
-            # Get current batch
-            batch = data[i:i+batch_size]
-            chunked_metadata = []
-
-            # Process each document in the batch
-            for item in batch:
-                content = item.page_content
-                source = item.metadata["source"]
-
-                # Generate a deterministic ID based on the content
-                content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
-                point_id = int(content_hash[:16], 16)
-
-                try:
-                    # Embed the content with Tesla P40 optimized error handling
-                    try:
-                        # Optimize for Tesla P40: Pre-allocate GPU memory if needed
-                        if torch.cuda.is_available():
-                            # Check if GPU memory is fragmented
-                            allocated_memory = torch.cuda.memory_allocated(0)
-                            total_memory = torch.cuda.get_device_properties(0).total_memory
-                            free_memory = total_memory - allocated_memory
-                            total_free = total_memory - allocated_memory
-
-                            # If memory is fragmented (reserved but not used), clear cache
-                            if total_free - free_memory > 1 * 1024 * 1024 * 1024:  # 1GB difference
-                                torch.cuda.empty_cache()
-
-                        # Use a context manager for better memory handling on Tesla P40
-                        with torch.no_grad():  # Disable gradient calculation for embeddings
-                            content_vector = embeddings.embed_query(content)
-                    except Exception as e:
-                        print(f"   ⚠️ Error embedding content: {str(e)}")
-                        # Tesla P40 optimized recovery procedure
-                        # Try to clean up memory and retry with more aggressive cleanup
-                        gc.collect(generation=2)  # Full collection
-                        if torch.cuda.is_available():
-                            torch.cuda.empty_cache()
-                            # Reset peak memory stats for Tesla P40
-                            if hasattr(torch.cuda, 'reset_peak_memory_stats'):
-                                torch.cuda.reset_peak_memory_stats()
-
-                        # Wait a bit longer for Tesla P40 to stabilize
-                        time.sleep(2)
-
-                        try:
-                            # Retry with explicit CUDA synchronization for Tesla P40
-                            if torch.cuda.is_available():
-                                torch.cuda.synchronize()
-                            with torch.no_grad():
-                                content_vector = embeddings.embed_query(content)
-                        except Exception as retry_e:
-                            print(f"   ❌ Failed to embed content after retry: {str(retry_e)}")
-                            continue
-
-                    vector_dict = {"content": content_vector}
-
-                    payload = {
-                        "page_content": content,
-                        "metadata": {
-                            "id": point_id,
-                            "source": source,
-                        }
-                    }
-
-                    metadata = PointStruct(id=point_id, vector=vector_dict, payload=payload)
-                    chunked_metadata.append(metadata)
-                except Exception as e:
-                    print(f"   ❌ Error processing document: {str(e)}")
-
-            # Upsert batch with retry logic
-            max_retries = 3
-            retry_delay = 2
-            for retry in range(max_retries):
-                try:
-                    if chunked_metadata:  # Only upsert if we have data
-                        client.upsert(
-                            collection_name=collection_name,
-                            wait=True,
-                            points=chunked_metadata
-                        )
-                    break  # Success, exit retry loop
-                except Exception as e:
-                    if retry < max_retries - 1:
-                        print(f"   ⚠️ Error upserting batch (retry {retry+1}/{max_retries}): {str(e)}")
-                        # Clean up memory before retry
-                        gc.collect()
-                        if torch.cuda.is_available():
-                            torch.cuda.empty_cache()
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # Exponential backoff
-                    else:
-                        print(f"   ❌ Failed to upsert batch after {max_retries} retries: {str(e)}")
-
-            # Update progress
-            total_processed += len(batch)
-            pbar.update(len(batch))
-
-            # Save checkpoint every few batches
-            if i % (batch_size * 3) == 0 and i > 0:
-                save_checkpoint(collection_name, "batch_processing", total_processed, len(data))
+    def upsert(points):
+        upsert_points(client, collection_name, points)
 
-            # Clean up after each batch
-            chunked_metadata = []
-            gc.collect()
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
+    def after_batch(done):
+        # Update progress
+        pbar.update(done - pbar.n)
 
+    total_processed = 0
+    try:
+        # Embed in length-sorted batches sized by token count; the upsert of each
+        # batch runs while the next one is embedded
+        start_time = time.time()
+        total_processed, failed = embed_and_upsert(
+            data, embeddings, upsert,
+            max_batch_size=batch_size,
+            before_batch=monitor_system_resources,
+            after_batch=after_batch,
+            vectors=vectors,
+            lexical=has_lexical_vectors(client, collection_name),
+        )
+        if vectors is None:
+            record_embedding(len(data), time.time() - start_time)
+        if failed:
+            print(f"   ❌ Skipped {failed} documents that could not be embedded")
     finally:
         # Stop memory monitoring thread
         memory_monitor_stop.set()
@@ -356,10 +374,9 @@ def get_cpu_usage():
         "max_core": max(cpu_percent)
     }
 
-def monitor_system_resources():
-    """Monitor system resources and take action if necessary."""
+def get_memory_status():
+    """Get system and process memory usage, with the backpressure and critical flags."""
     memory = psutil.virtual_memory()
-    cpu_info = get_cpu_usage()
     process = psutil.Process(os.getpid())
     process_memory_gb = process.memory_info().rss / (1024 ** 3)
     total_memory_gb = memory.total / (1024 ** 3)
@@ -375,55 +392,105 @@ def monitor_system_resources():
         (memory.percent > 99 and process_memory_percent > 30)  # Extreme case
     )
 
-    if critical_memory_condition:
-        print(f"\n🚨 EXTREME MEMORY PRESSURE: {memory.percent:.1f}% (Process: {process_memory_gb:.2f}GB, {process_memory_percent:.1f}% of total)")
-        print(f"   Available memory: {available_memory_gb:.2f}GB of {total_memory_gb:.2f}GB total")
-        print(f"   Forcing graceful exit before OOM killer terminates the process...")
+    return {
+        "memory_percent": memory.percent,
+        "process_memory_gb": process_memory_gb,
+        "process_memory_percent": process_memory_percent,
+        "total_memory_gb": total_memory_gb,
+        "available_memory_gb": available_memory_gb,
+        "pressure": (memory.percent > MAX_MEMORY_PERCENT or available_memory_gb < MIN_AVAILABLE_MEMORY_GB
+                     or memory_pressure.is_set()),
+        "critical": critical_memory_condition,
+    }
 
-        # Save checkpoint data before exiting
-        try:
-            checkpoint_data = load_checkpoint() or {}
-            checkpoint_data["forced_exit"] = {
-                "timestamp": time.time(),
-                "memory_percent": memory.percent,
-                "process_memory_gb": process_memory_gb,
-                "process_memory_percent": process_memory_percent,
-                "total_memory_gb": total_memory_gb,
-                "available_memory_gb": available_memory_gb
-            }
-            with open(CHECKPOINT_FILE, 'w') as f:
-                json.dump(checkpoint_data, f)
-            print(f"   Checkpoint saved before exit")
-        except Exception as e:
-            print(f"   Failed to save checkpoint: {str(e)}")
+def force_exit(status):
+    """Save a checkpoint and exit before the OOM killer terminates the process."""
+    memory_percent = status["memory_percent"]
+    process_memory_gb = status["process_memory_gb"]
+    process_memory_percent = status["process_memory_percent"]
+    total_memory_gb = status["total_memory_gb"]
+    available_memory_gb = status["available_memory_gb"]
 
-        # Log the event
-        try:
-            with open("oom_prevention.log", "a") as f:
-                f.write(f"\n--- OOM Prevention Exit at {time.strftime('%Y-%m-%d %H:%M:%S')} ---\n")
-                f.write(f"System memory: {memory.percent:.1f}% used\n")
-                f.write(f"Process memory: {process_memory_gb:.2f}GB ({process_memory_percent:.1f}% of total)\n")
-                f.write(f"Total memory: {total_memory_gb:.2f}GB\n")
-                f.write(f"Available memory: {available_memory_gb:.2f}GB\n")
-                f.write(f"Forcing exit to prevent OOM killer\n")
-        except:
-            pass
+    print(f"\n🚨 EXTREME MEMORY PRESSURE: {memory_percent:.1f}% (Process: {process_memory_gb:.2f}GB, {process_memory_percent:.1f}% of total)")
+    print(f"   Available memory: {available_memory_gb:.2f}GB of {total_memory_gb:.2f}GB total")
+    print(f"   Pressure did not ease after {MEMORY_BACKPRESSURE_TIMEOUT}s, forcing graceful exit before OOM killer terminates the process...")
 
-        # Force exit with a non-zero status code
-        print("💥 Exiting to prevent OOM killer termination. Restart the script to continue from checkpoint.")
-        os._exit(1)  # Force immediate exit
+    # Committed chunks are already in the checkpoint store, record why the run stopped
+    try:
+        checkpoint_store.record_event("forced_exit", {
+            "memory_percent": memory_percent,
+            "process_memory_gb": process_memory_gb,
+            "process_memory_percent": process_memory_percent,
+            "total_memory_gb": total_memory_gb,
+            "available_memory_gb": available_memory_gb
+        })
+        print(f"   Forced exit recorded in the checkpoint store")
+    except Exception as e:
+        print(f"   Failed to record the forced exit: {str(e)}")
+
+    # os._exit skips the session cleanup, turn HNSW indexing back on for the collections being loaded
+    restored = restore_open_sessions()
+    if restored:
+        print(f"   Indexing threshold restored on {restored} collection(s)")
+
+    # Log the event
+    try:
+        with open("oom_prevention.log", "a") as f:
+            f.write(f"\n--- OOM Prevention Exit at {time.strftime('%Y-%m-%d %H:%M:%S')} ---\n")
+            f.write(f"System memory: {memory_percent:.1f}% used\n")
+            f.write(f"Process memory: {process_memory_gb:.2f}GB ({process_memory_percent:.1f}% of total)\n")
+            f.write(f"Total memory: {total_memory_gb:.2f}GB\n")
+            f.write(f"Available memory: {available_memory_gb:.2f}GB\n")
+            f.write(f"Forcing exit to prevent OOM killer\n")
+    except:
+        pass
+
+    # Force exit with a non-zero status code
+    print("💥 Exiting to prevent OOM killer termination. Restart the script to continue from checkpoint.")
+    os._exit(1)  # Force immediate exit
+
+def monitor_system_resources():
+    """Apply backpressure: block the caller while memory is under pressure.
+
+    Producers call this before loading a file or embedding a batch, so they pause
+    while the upsert stage drains the queues. The process only exits as a last
+    resort, when memory stays critical for MEMORY_BACKPRESSURE_TIMEOUT seconds."""
+    waiting_since = None
+    while True:
+        status = get_memory_status()
+        if not status["pressure"] and not status["critical"]:
+            if waiting_since is not None:
+                print(f"   ✅ Memory pressure eased after {time.time() - waiting_since:.1f}s, resuming")
+            return
+
+        if waiting_since is None:
+            waiting_since = time.time()
+            print(f"\n⏸️ Memory pressure ({status['memory_percent']:.1f}% used, {status['available_memory_gb']:.2f}GB available), pausing until it eases")
+
+        if time.time() - waiting_since > MEMORY_BACKPRESSURE_TIMEOUT:
+            if status["critical"]:
+                force_exit(status)
+            # High but not critical, keep going rather than stalling forever
+            print(f"   ⚠️ Memory still high after {MEMORY_BACKPRESSURE_TIMEOUT}s, resuming anyway")
+            return
+
+        # Release what we can while waiting for the downstream stages to drain
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        time.sleep(MEMORY_CHECK_INTERVAL / 2)
 
 def calculate_batch_size(items_count: int) -> int:
-    """Calculate appropriate batch size based on collection size and system resources.
-    Optimized for Tesla P40 GPU with 24GB memory."""
-    # Start with a higher default for Tesla P40
-    batch_size = 16
+    """Calculate the maximum embedding batch size based on collection size and system resources.
+    Optimized for Tesla P40 GPU with 24GB memory. The token budget further limits batches of long chunks."""
+    # Start from the configured embedding batch size
+    batch_size = EMBED_MAX_BATCH_SIZE
 
     # Adjust based on collection size
     if items_count > 10000:
-        batch_size = 12
+        batch_size = EMBED_MAX_BATCH_SIZE * 3 // 4
     elif items_count > 1000:
-        batch_size = 14
+        batch_size = EMBED_MAX_BATCH_SIZE * 7 // 8
 
     # Check system memory conditions
     memory = psutil.virtual_memory()
@@ -444,7 +511,7 @@ def calculate_batch_size(items_count: int) -> int:
                 print(f"   ⚠️ GPU memory usage high ({gpu_memory_percent:.1f}%), reducing batch size to {batch_size}")
             elif gpu_memory_percent < 30 and items_count > 100:
                 # If GPU has plenty of memory, we can increase batch size
-                batch_size = min(24, batch_size + 4)
+                batch_size = min(EMBED_MAX_BATCH_SIZE * 3 // 2, batch_size + EMBED_MAX_BATCH_SIZE // 4)
                 print(f"   ℹ️ GPU memory usage low ({gpu_memory_percent:.1f}%), increasing batch size to {batch_size}")
         except Exception as e:
             print(f"   ⚠️ Error checking GPU memory: {e}")
@@ -483,31 +550,6 @@ def calculate_batch_size(items_count: int) -> int:
 
     return batch_size
 
-def load_checkpoint():
-    """Load checkpoint data from file if it exists."""
-    if os.path.exists(CHECKPOINT_FILE):
-        try:
-            with open(CHECKPOINT_FILE, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading checkpoint: {e}")
-    return None
-
-def save_checkpoint(collection_name: str, file_path: str, processed_count: int, total_count: int):
-    """Save checkpoint data to file."""
-    try:
-        checkpoint_data = load_checkpoint() or {}
-        checkpoint_data[collection_name] = {
-            "file_path": file_path,
-            "processed_count": processed_count,
-            "total_count": total_count,
-            "timestamp": time.time()
-        }
-        with open(CHECKPOINT_FILE, 'w') as f:
-            json.dump(checkpoint_data, f)
-    except Exception as e:
-        print(f"Error saving checkpoint: {e}")
-
 def memory_monitor_thread_func(stop_event, collection_name):
     """Thread function to monitor memory usage during processing.
     Optimized for Tesla P40 GPU monitoring and management."""
@@ -558,8 +600,9 @@ def memory_monitor_thread_func(stop_event, collection_name):
             except Exception as e:
                 print(f"   ⚠️ Error monitoring Tesla P40 GPU memory: {e}")
 
-        # If memory usage is high, perform cleanup
+        # If memory usage is high, signal backpressure to the producers and perform cleanup
         if memory.percent > CRITICAL_MEMORY_PERCENT or process_memory_percent > 50 or gpu_memory_critical:
+            memory_pressure.set()
             print(f"\n⚠️ High resource usage detected: System RAM {memory.percent:.1f}%, Process {process_memory_gb:.2f}GB ({process_memory_percent:.1f}%)")
             if torch.cuda.is_available():
                 print(f"   Tesla P40 GPU memory: {gpu_memory_percent:.1f}%")
@@ -598,6 +641,9 @@ def memory_monitor_thread_func(stop_event, collection_name):
             except:
                 pass
 
+        else:
+            memory_pressure.clear()
+
         # Sleep before next check - adaptive sleep based on memory pressure
         # Tesla P40 specific monitoring intervals
         if gpu_memory_critical:
@@ -642,193 +688,732 @@ def process_directory(directory_path, collection_name):
             # Recursively process subdirectories
             process_directory(subfile_path, collection_name)
 
-def process_file(file_path, collection_name):
+def is_file_processed(file_path, collection_name, content_hash=None):
     """
-    Process a single file and add its content to the collection.
+    Check the checkpoint store for a file that was fully processed, deleting it if so.
 
     Args:
-        file_path: Path to the file to process
-        collection_name: Name of the collection to add the data to
+        file_path: Path to the file
+        collection_name: Name of the collection
+        content_hash: The hash of the file content, computed if not given
     """
-    # Check if we have a checkpoint for this file
-    checkpoint_data = load_checkpoint()
-    if checkpoint_data and collection_name in checkpoint_data:
-        checkpoint_info = checkpoint_data[collection_name]
-        if checkpoint_info.get("file_path") == file_path:
-            print(f"   📋 Resuming processing of {os.path.basename(file_path)} from checkpoint")
-            # If the file was already fully processed, we can skip it
-            if checkpoint_info.get("processed_count") == checkpoint_info.get("total_count"):
-                print(f"   ✅ File {os.path.basename(file_path)} was already fully processed")
-                try:
-                    os.remove(file_path)
-                    return
-                except Exception as e:
-                    print(f"   ⚠️ Error deleting file '{os.path.basename(file_path)}': {e}")
-                    return
+    content_hash = content_hash or file_content_hash(file_path)
+    if checkpoint_store.is_done(collection_name, file_path, content_hash):
+        print(f"   ✅ File {os.path.basename(file_path)} was already fully processed")
+        try:
+            os.remove(file_path)
+        except Exception as e:
+            print(f"   ⚠️ Error deleting file '{os.path.basename(file_path)}': {e}")
+        return True
+    return False
+
+def file_chunking(streamed):
+    """Describe how a file is split into chunks, the chunk indexes of a checkpoint depend on it."""
+    return f"{CHUNKER_MODE}:{'streamed' if streamed else 'whole'}"
 
+def start_file(file_path, collection_name, content_hash, streamed):
+    """
+    Register a file in the checkpoint store and return the indexes of its chunks already upserted.
+
+    A checkpoint of the file taken with another chunker mode, or by the other ingestion
+    path (streamed page by page or chunked whole), is discarded and the file starts over.
+    """
+    committed = checkpoint_store.start_file(collection_name, file_path, content_hash, file_chunking(streamed))
+    if committed:
+        print(f"   📋 Resuming processing of {os.path.basename(file_path)} from checkpoint, "
+              f"{len(committed)} chunks were already upserted")
+    return committed
+
+def read_pages(loader, label):
+    """Yield the pages of a loader one at a time, logging a loading error before re-raising it."""
+    try:
+        yield from loader.lazy_load()
+    except Exception as e:
+        print(f"   ❌ Error loading {label}: {str(e)}")
+        raise
+
+def read_pdf_pages(file_path):
+    """Yield the pages of a PDF, falling back to UnstructuredPDFLoader for malformed files."""
     filename = os.path.basename(file_path)
-    print(f"Processing file: {filename}")
+    pages_read = 0
+    # First try with PyPDFLoader
+    try:
+        for page in PyPDFLoader(file_path).lazy_load():
+            pages_read += 1
+            yield page
+        return
+    except Exception as pdf_error:
+        # Pages already handed out cannot be read again by another loader
+        if pages_read:
+            print(f"   ❌ Error loading PDF after {pages_read} pages: {str(pdf_error)}")
+            raise
+        error_msg = str(pdf_error).lower()
+        # If PyPDFLoader fails, try with UnstructuredPDFLoader as a fallback
+        if "cryptography" in error_msg:
+            print(f"   ⚠️ Encrypted PDF detected: {filename}")
+            raise
+        elif "invalid pdf header" in error_msg or "eof marker not found" in error_msg:
+            print(f"   ⚠️ Invalid PDF format, trying alternative loader: {filename}")
+        else:
+            print(f"   ❌ Error loading PDF: {error_msg}")
+            raise
+    yield from read_pages(UnstructuredPDFLoader(file_path), "PDF with alternative loader")
 
-    # Monitor system resources before processing
-    monitor_system_resources()
+def open_pages(file_path):
+    """
+    Open a file with the loader matching its extension, without reading it yet.
+
+    Args:
+        file_path: Path to the file to load
 
-    # Initialize variables
-    text_documents = []
+    Returns:
+        Tuple of (pages, source), pages is a generator of page Documents or None if the
+        file could not be opened; it raises if the file fails while being read
+    """
+    filename = os.path.basename(file_path)
     content = filename  # Default source is the filename
-    loader = None
 
+    # Process file based on extension
+    if filename.lower().endswith(".txt"):
+        # Explicitly use UTF-8 encoding for Vietnamese content
+        try:
+            loader = TextLoader(file_path, encoding='utf-8')
+
+            # Get the first line as source for txt files
+            with open(file_path, 'r', encoding='utf-8') as file:
+                content = file.readline().strip()
+        except Exception as e:
+            print(f"   ❌ Error loading text file: {str(e)}")
+            return None, content
+        return read_pages(loader, "text file"), content
+
+    elif filename.lower().endswith(".pdf"):
+        return read_pdf_pages(file_path), content
+
+    elif filename.lower().endswith(".docx"):
+        # Use Docx2txtLoader for .docx files with UTF-8 encoding
+        return read_pages(Docx2txtLoader(file_path), "DOCX file"), content
+
+    elif filename.lower().endswith(".doc"):
+        # Use UnstructuredWordDocumentLoader for .doc files with UTF-8 encoding
+        return read_pages(UnstructuredWordDocumentLoader(file_path), "DOC file"), content
+
+    elif filename.lower().endswith(".xlsx") or filename.lower().endswith(".xls"):
+        # Use UnstructuredExcelLoader for Excel files
+        return read_pages(UnstructuredExcelLoader(file_path), "Excel file"), content
+
+    # Skip files that are not txt, pdf, doc, docx, xls, or xlsx
+    print(f"   ⚠️ Unsupported file format: {filename}")
+    return None, content
+
+def load_file(file_path):
+    """
+    Load all pages of a file with the loader matching its extension.
+
+    Args:
+        file_path: Path to the file to load
+
+    Returns:
+        Tuple of (pages, source), pages is None if the file could not be loaded
+    """
+    pages, content = open_pages(file_path)
+    if pages is None:
+        return None, content
     try:
-        # Process file based on extension
-        if filename.lower().endswith(".txt"):
-            # Explicitly use UTF-8 encoding for Vietnamese content
-            try:
-                loader = TextLoader(file_path, encoding='utf-8')
-                text_documents = loader.load()
+        return list(pages), content
+    except Exception:
+        # The error has been logged by the page reader
+        return None, content
 
-                # Get the first line as source for txt files
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.readline().strip()
-            except Exception as e:
-                print(f"   ❌ Error loading text file: {str(e)}")
-                return
+def chunk_pages(pages, source):
+    """
+    Split loaded pages into semantic chunks.
 
-        elif filename.lower().endswith(".pdf"):
-            # First try with PyPDFLoader
-            try:
-                loader = PyPDFLoader(file_path)
-                text_documents = loader.load()
-            except Exception as pdf_error:
-                error_msg = str(pdf_error).lower()
-                # If PyPDFLoader fails, try with UnstructuredPDFLoader as a fallback
-                if "cryptography" in error_msg:
-                    print(f"   ⚠️ Encrypted PDF detected: {filename}")
-                    return
-                elif "invalid pdf header" in error_msg or "eof marker not found" in error_msg:
-                    print(f"   ⚠️ Invalid PDF format, trying alternative loader: {filename}")
-                    try:
-                        loader = UnstructuredPDFLoader(file_path)
-                        text_documents = loader.load()
-                    except Exception as unstructured_error:
-                        print(f"   ❌ Failed to load PDF with alternative loader: {str(unstructured_error)}")
-                        return
-                else:
-                    print(f"   ❌ Error loading PDF: {error_msg}")
-                    return
+    Args:
+        pages: The Documents returned by the loader
+        source: The source stored in the chunk metadata
 
-        elif filename.lower().endswith(".docx"):
-            try:
-                # Use Docx2txtLoader for .docx files with UTF-8 encoding
-                loader = Docx2txtLoader(file_path)
-                text_documents = loader.load()
-            except Exception as e:
-                print(f"   ❌ Error loading DOCX file: {str(e)}")
-                return
+    Returns:
+        List of Document chunks
+    """
+    # Create semantic chunker with optimized parameters
+    chunker = SemanticChunker(
+        min_sentences=2,
+        max_sentences=20,
+        similarity_threshold=0.3
+    )
 
-        elif filename.lower().endswith(".doc"):
-            try:
-                # Use UnstructuredWordDocumentLoader for .doc files with UTF-8 encoding
-                loader = UnstructuredWordDocumentLoader(file_path)
-                text_documents = loader.load()
-            except Exception as e:
-                print(f"   ❌ Error loading DOC file: {str(e)}")
-                return
+    all_documents = []
+    for doc in pages:
+        try:
+            # Create semantic chunks
+            chunks = chunker.create_semantic_chunks(doc.page_content)
 
-        elif filename.lower().endswith(".xlsx") or filename.lower().endswith(".xls"):
-            try:
-                # Use UnstructuredExcelLoader for Excel files
-                loader = UnstructuredExcelLoader(file_path)
-                text_documents = loader.load()
-            except Exception as e:
-                print(f"   ❌ Error loading Excel file: {str(e)}")
-                return
-        else:
-            # Skip files that are not txt, pdf, doc, docx, xls, or xlsx
-            print(f"   ⚠️ Unsupported file format: {filename}")
-            return
+            # Create Document objects
+            metadata = {"source": source}
+            all_documents.extend(Document(metadata=metadata, page_content=chunk) for chunk in chunks)
+        except Exception as e:
+            print(f"   ⚠️ Error chunking document: {str(e)}")
+            # Continue with next document
+            continue
 
-        # Check if we got any documents
-        if not text_documents:
-            print(f"   ⚠️ No content extracted from {filename}")
-            return
+    return all_documents
 
-        print(f"   📄 Extracted {len(text_documents)} pages/sections from {filename}")
+def split_pages(pages, source):
+    """
+    Split loaded pages into sentences for the embedding chunker.
 
-        # Create semantic chunker with optimized parameters
-        chunker = SemanticChunker(
-            min_sentences=2,
-            max_sentences=20,
-            similarity_threshold=0.3
-        )
+    Args:
+        pages: The Documents returned by the loader
+        source: The source stored in the chunk metadata
+
+    Returns:
+        List of (source, sentences) tuples, one per page with text
+    """
+    chunker = SemanticChunker()
+    sentence_pages = []
+    for doc in pages:
+        try:
+            sentences = chunker.split_into_sentences(doc.page_content)
+        except Exception as e:
+            print(f"   ⚠️ Error splitting document: {str(e)}")
+            continue
+        if sentences:
+            sentence_pages.append((source, sentences))
+    return sentence_pages
 
-        # Process documents in batches to avoid memory issues
-        all_documents = []
+def embed_sentence_pages(sentence_pages, filename):
+    """
+    Chunk sentence pages on their embeddings, reusing the sentence vectors for the chunks.
 
-        # Create progress bar for chunking
-        chunk_pbar = tqdm(total=len(text_documents), desc=f"Chunking {filename}", 
-                          unit="pages", ncols=100, position=0, leave=True)
+    Args:
+        sentence_pages: The (source, sentences) tuples from split_pages
+        filename: The file name, for logging
 
-        # Process each document/page
-        for doc in text_documents:
-            # Monitor system resources
-            monitor_system_resources()
+    Returns:
+        Tuple of (chunks, vectors)
+    """
+    chunker = SemanticChunker(
+        min_sentences=2,
+        max_sentences=20,
+        similarity_threshold=EMBEDDING_CHUNKER_SIMILARITY_THRESHOLD
+    )
+    start_time = time.time()
+    documents, vectors, reembedded = embed_sentence_chunks(
+        chunker, embeddings, sentence_pages,
+        max_batch_size=calculate_batch_size(sum(len(sentences) for _, sentences in sentence_pages)),
+        before_batch=monitor_system_resources,
+    )
+    record_embedding(len(documents), time.time() - start_time)
+    print(f"   🔢 Created {len(documents)} chunks from {filename}, "
+          f"{len(documents) - reembedded} with pooled sentence vectors and {reembedded} re-embedded")
+    return documents, vectors
 
-            try:
-                # Create semantic chunks
-                chunks = chunker.create_semantic_chunks(doc.page_content)
+def load_and_chunk_file(file_path):
+    """
+    Load and chunk one file. Runs in the chunking process pool, so it never touches the GPU.
 
-                # Create Document objects
-                metadata = {"source": content}
-                documents = [Document(metadata=metadata, page_content=chunk) for chunk in chunks]
+    In embedding chunker mode the file is only split into sentences here, the embedding
+    stage chunks it on the sentence vectors.
 
-                all_documents.extend(documents)
-                chunk_pbar.update(1)
+    Args:
+        file_path: Path to the file to process
 
-                # Perform garbage collection after processing each document
-                gc.collect()
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
+    Returns:
+        Tuple of (file_path, chunks), chunks is None if the file should be kept for another attempt;
+        in embedding chunker mode the chunks are (source, sentences) tuples
+    """
+    filename = os.path.basename(file_path)
+    pages, source = load_file(file_path)
+    if pages is None:
+        return file_path, None
+
+    # Check if we got any documents
+    if not pages:
+        print(f"   ⚠️ No content extracted from {filename}")
+        return file_path, None
+
+    print(f"   📄 Extracted {len(pages)} pages/sections from {filename}")
+    if CHUNKER_MODE == "embedding":
+        sentence_pages = split_pages(pages, source)
+        print(f"   🔢 Split {filename} into {sum(len(sentences) for _, sentences in sentence_pages)} sentences")
+        return file_path, sentence_pages
+    documents = chunk_pages(pages, source)
+    print(f"   🔢 Created {len(documents)} chunks from {filename}")
+    return file_path, documents
+
+def finish_file(file_path, collection_name, chunk_count):
+    """Mark a file as fully processed and delete it."""
+    checkpoint_store.finish_file(collection_name, file_path, chunk_count)
+    try:
+        os.remove(file_path)
+        print(f"   🗑️ Deleted file: {os.path.basename(file_path)}")
+    except Exception as e:
+        print(f"   ⚠️ Error deleting file '{os.path.basename(file_path)}': {e}")
 
-            except Exception as e:
-                print(f"   ⚠️ Error chunking document: {str(e)}")
-                # Continue with next document
-                chunk_pbar.update(1)
-                continue
+def stream_chunks(pages, source):
+    """
+    Chunk pages as they are read, yielding Document chunks.
 
-        chunk_pbar.close()
+    The last chunk of a page is carried over to the next page, so a chunk can straddle
+    a page break, unless it is already longer than max_sentences and can no longer be split.
+    Only one page and the carried sentences are held in memory.
 
-        # Save checkpoint before embedding and uploading
-        save_checkpoint(collection_name, file_path, 0, len(all_documents))
+    Args:
+        pages: Iterable of page Documents
+        source: The source stored in the chunk metadata
+    """
+    chunker = SemanticChunker(
+        min_sentences=2,
+        max_sentences=20,
+        similarity_threshold=0.3
+    )
+    metadata = {"source": source}
+    carry = []
+    for doc in pages:
+        try:
+            sentences = carry + chunker.split_into_sentences(doc.page_content)
+            groups = chunker.create_sentence_groups(sentences)
+        except Exception as e:
+            print(f"   ⚠️ Error chunking document: {str(e)}")
+            # Continue with next document
+            continue
+        if not groups:
+            continue
+
+        carry = []
+        if len(groups[-1]) <= chunker.max_sentences:
+            carry = [sentences[i] for i in groups.pop()]
+        for group in groups:
+            yield Document(metadata=metadata, page_content=' '.join(sentences[i] for i in group))
+
+    if carry:
+        yield Document(metadata=metadata, page_content=' '.join(carry))
+
+def stream_embedded_chunks(pages, source, filename):
+    """
+    Chunk pages on their sentence embeddings as they are read, yielding (Document, vector) pairs.
 
-        # Add documents to the collection
-        if all_documents:
-            print(f"   🔢 Created {len(all_documents)} chunks from {filename}")
-            processed_count = chunked_metadata(all_documents, collection_name=collection_name)
-            print(f"   ✅ Successfully processed {processed_count} chunks from {filename}")
+    Pages are embedded in windows of about STREAM_SENTENCE_WINDOW sentences; the embedding
+    chunker works per page, so its chunks do not straddle page breaks.
+
+    Args:
+        pages: Iterable of page Documents
+        source: The source stored in the chunk metadata
+        filename: The file name, for logging
+    """
+    window = []
+    window_sentences = 0
+    for doc in pages:
+        sentence_pages = split_pages([doc], source)
+        window.extend(sentence_pages)
+        window_sentences += sum(len(sentences) for _, sentences in sentence_pages)
+        if window_sentences >= STREAM_SENTENCE_WINDOW:
+            yield from zip(*embed_sentence_pages(window, filename))
+            window = []
+            window_sentences = 0
+    if window:
+        yield from zip(*embed_sentence_pages(window, filename))
+
+def process_file(file_path, collection_name, session=None):
+    """
+    Stream a single file into the collection.
+
+    Pages are read lazily and go page -> sentences -> chunks -> embedding batch -> upsert,
+    so memory stays flat regardless of the file size. The chunks of every flushed batch
+    are committed to the checkpoint store and an interrupted file resumes at its first
+    uncommitted chunk.
+
+    Args:
+        file_path: Path to the file to process
+        collection_name: Name of the collection to add the data to
+        session: Optional BulkLoadSession of the collection, one is opened for this file if None
+    """
+    # Check if we have a checkpoint for this file
+    content_hash = file_content_hash(file_path)
+    if is_file_processed(file_path, collection_name, content_hash):
+        return
 
-            # Update checkpoint to mark file as fully processed
-            save_checkpoint(collection_name, file_path, len(all_documents), len(all_documents))
+    filename = os.path.basename(file_path)
+    print(f"Processing file: {filename}")
+
+    # Wait for memory pressure to ease before processing
+    monitor_system_resources()
+
+    pages, source = open_pages(file_path)
+    if pages is None:
+        return
+
+    client = initialize_qdrant_client()
+    initialize_embeddings()
+    committed = start_file(file_path, collection_name, content_hash, streamed=True)
+    batch_size = calculate_batch_size(0)
+
+    # Defer indexing until the whole file is in, unless the caller already did
+    own_session = session is None
+    if own_session:
+        session = BulkLoadSession(client, collection_name).begin()
+    lexical = has_lexical_vectors(client, collection_name)
+
+    # Start memory monitoring thread
+    memory_monitor_stop = threading.Event()
+    memory_monitor = threading.Thread(
+        target=memory_monitor_thread_func,
+        args=(memory_monitor_stop, collection_name),
+        daemon=True
+    )
+    memory_monitor.start()
+
+    chunk_count = 0
+    processed_count = 0
+    failed_count = 0
+    batch = []
+
+    def upsert(points):
+        session.upsert(points)
+
+    def flush():
+        nonlocal processed_count, failed_count
+        kept = chunks_to_ingest([document for _, document, _ in batch], collection_name,
+                                embedded=CHUNKER_MODE == "embedding")
+        documents = [batch[i][1] for i in kept]
+        vectors = [batch[i][2] for i in kept] if CHUNKER_MODE == "embedding" else None
+        not_embedded = set()
+        start_time = time.time()
+        upserted, failed = embed_and_upsert(
+            documents, embeddings, upsert,
+            max_batch_size=batch_size,
+            before_batch=monitor_system_resources,
+            vectors=vectors,
+            lexical=lexical,
+            on_failed=lambda index: not_embedded.add(batch[kept[index]][0]),
+        )
+        if vectors is None:
+            record_embedding(len(documents), time.time() - start_time)
+        # Stop at a failed batch, its chunks are then never committed
+        session.flush()
+        processed_count += upserted
+        failed_count += failed
+        # Chunks that were skipped as already stored are committed too, the ones that
+        # could not be embedded are left for the next run
+        checkpoint_store.commit_chunks(collection_name, file_path, [chunk_index for chunk_index, _, _ in batch
+                                                                    if chunk_index not in not_embedded])
+        batch.clear()
+
+    try:
+        if CHUNKER_MODE == "embedding":
+            chunks = stream_embedded_chunks(pages, source, filename)
+        else:
+            chunks = ((document, None) for document in stream_chunks(pages, source))
+
+        for document, vector in chunks:
+            chunk_index = chunk_count
+            chunk_count += 1
+            if chunk_index in committed:
+                continue
+            batch.append((chunk_index, document, vector))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        if chunk_count:
+            print(f"   ✅ Successfully processed {processed_count} chunks from {filename}")
         else:
             print(f"   ⚠️ No chunks created from {filename}")
 
-        # Delete the file after successful processing
-        try:
-            os.remove(file_path)
-            print(f"   🗑️ Deleted file: {filename}")
-        except Exception as e:
-            print(f"   ⚠️ Error deleting file '{filename}': {e}")
+        if own_session:
+            # Build the index once the whole file is in
+            session.commit()
+
+        if failed_count:
+            # The next run embeds the uncommitted chunks again
+            print(f"   ❌ {failed_count} chunks of {filename} could not be embedded, keeping the file for the next run")
+        else:
+            # Update checkpoint to mark file as fully processed and delete the file
+            finish_file(file_path, collection_name, chunk_count)
 
     except Exception as e:
+        # The file is kept and the next run resumes at its first uncommitted chunk
         print(f"   ❌ Unexpected error processing file '{filename}': {str(e)}")
-        # Save checkpoint with current progress
-        if 'all_documents' in locals() and all_documents:
-            save_checkpoint(collection_name, file_path, 0, len(all_documents))
+        if own_session:
+            session.abort()
 
     finally:
+        # Stop memory monitoring thread
+        memory_monitor_stop.set()
+        memory_monitor.join(timeout=1.0)
+
         # Clean up resources
         gc.collect()
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
 
+def embedding_worker(embed_queue, upsert_queue, collection_name):
+    """
+    Embedding stage: the only thread that uses the embedding model.
+
+    Takes chunked files from embed_queue and puts one job per embedded batch on
+    upsert_queue. Each job carries the indexes of its embedded chunks, to commit them
+    once they are upserted, the number of batches of its file so the upsert stage knows
+    when the file is complete, and whether every chunk of the batch was embedded.
+    """
+    lexical = None
+    try:
+        while True:
+            item = embed_queue.get()
+            if item is None:
+                break
+            file_path, documents, committed = item
+
+            try:
+                if lexical is None:
+                    lexical = has_lexical_vectors(initialize_qdrant_client(), collection_name)
+                vectors = None
+                if CHUNKER_MODE == "embedding":
+                    # The chunk vectors are pooled from the sentence vectors, only upserts are batched
+                    documents, vectors = embed_sentence_pages(documents, os.path.basename(file_path))
+                chunk_count = len(documents)
+
+                # Skip the chunks committed by an interrupted run, then the ones already stored
+                uncommitted = [i for i in range(chunk_count) if i not in committed]
+                kept = chunks_to_ingest([documents[i] for i in uncommitted], collection_name,
+                                        embedded=vectors is not None)
+                pending = [uncommitted[k] for k in kept]
+                checkpoint_store.commit_chunks(collection_name, file_path, sorted(set(uncommitted) - set(pending)))
+
+                if vectors is not None:
+                    batch_size = calculate_batch_size(len(pending))
+                    batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+                else:
+                    texts = [documents[i].page_content for i in pending]
+                    batches = [[pending[k] for k in batch] for batch in plan_batches(
+                        token_lengths(embeddings, texts), max_batch_size=calculate_batch_size(len(pending)))]
+            except Exception as e:
+                # Keep the file for the next run and move on, the stages before us must not stall
+                print(f"   ❌ Error preparing {os.path.basename(file_path)} for embedding: {str(e)}")
+                # The upsert stage still reports the file as done, as failed so it is kept
+                upsert_queue.put((file_path, [], [], 0, 0, False))
+                continue
+            if not batches:
+                # Nothing to embed, the upsert stage still has to finish the file
+                upsert_queue.put((file_path, [], [], 0, chunk_count))
+                continue
+
+            for batch in batches:
+                # Pause while memory is under pressure
+                monitor_system_resources()
+                if vectors is not None:
+                    batch_vectors = [vectors[i] for i in batch]
+                else:
+                    start_time = time.time()
+                    batch_vectors = embed_with_bisection(embeddings, [documents[i].page_content for i in batch])
+                    record_embedding(len(batch), time.time() - start_time)
+                embedded = [i for i, vector in zip(batch, batch_vectors) if vector is not None]
+                points = [build_point(documents[i], vector, lexical)
+                          for i, vector in zip(batch, batch_vectors) if vector is not None]
+                if len(points) < len(batch):
+                    print(f"   ❌ Skipped {len(batch) - len(points)} chunks of {os.path.basename(file_path)} that could not be embedded")
+                # Blocks while the upsert stage is behind, which keeps memory flat; only the
+                # embedded chunks are committed and a batch with a failed chunk keeps the file
+                upsert_queue.put((file_path, points, embedded, len(batches), chunk_count, len(embedded) == len(batch)))
+    except Exception as e:
+        print(f"   ❌ Embedding worker failed: {str(e)}")
+        # Drain the queue so the producer never blocks on a dead worker
+        while embed_queue.get() is not None:
+            pass
+    finally:
+        upsert_queue.put(None)
+
+async def upsert_stage(upsert_queue, collection_name, on_file_done):
+    """
+    Async upsert stage: writes embedded batches with a bounded number of upserts in flight.
+
+    The chunks of every upserted batch are committed to the checkpoint store. A file is
+    finished (checkpointed and deleted) once all of its batches are upserted; a file with
+    a failed batch, or a chunk that could not be embedded, is kept so the next run resumes
+    at its uncommitted chunks.
+    """
+    async_client = AsyncQdrantClient(url=QDRANT_URL)
+    semaphore = asyncio.Semaphore(UPSERT_CONCURRENCY)
+    progress = {}  # file_path -> [batches done, batches failed]
+    tasks = set()
+
+    async def upsert_batch(file_path, points, chunk_indexes, total_batches, chunk_count, complete=True):
+        ok = True
+        try:
+            # Upsert batch with retry logic
+            max_retries = 3
+            retry_delay = 2
+            for retry in range(max_retries):
+                try:
+                    if points:
+                        # Indexing is deferred by the bulk load session of ingest_files
+                        await async_client.upsert(collection_name=collection_name, wait=False, points=points)
+                    break  # Success, exit retry loop
+                except Exception as e:
+                    if retry < max_retries - 1:
+                        print(f"   ⚠️ Error upserting batch (retry {retry+1}/{max_retries}): {str(e)}")
+                        await asyncio.sleep(retry_delay)
+                        retry_delay *= 2  # Exponential backoff
+                    else:
+                        print(f"   ❌ Failed to upsert batch after {max_retries} retries: {str(e)}")
+                        ok = False
+        finally:
+            semaphore.release()
+
+        if ok and chunk_indexes:
+            try:
+                await asyncio.to_thread(checkpoint_store.commit_chunks, collection_name, file_path, chunk_indexes)
+            except Exception as e:
+                # The batch is stored, a restart only upserts it again
+                print(f"   ⚠️ Error committing chunks of {os.path.basename(file_path)}: {str(e)}")
+
+        state = progress.setdefault(file_path, [0, 0])
+        state[0] += 1
+        state[1] += 0 if ok and complete else 1
+        if state[0] >= total_batches:
+            del progress[file_path]
+            if state[1]:
+                print(f"   ❌ {state[1]} batches of {os.path.basename(file_path)} failed, keeping the file for the next run")
+            else:
+                finish_file(file_path, collection_name, chunk_count)
+            on_file_done(file_path)
+
+    try:
+        while True:
+            job = await asyncio.to_thread(upsert_queue.get)
+            if job is None:
+                break
+            await semaphore.acquire()
+            task = asyncio.create_task(upsert_batch(*job))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        await async_client.close()
+
+def run_upsert_stage(upsert_queue, collection_name, on_file_done):
+    """Run the async upsert stage in the current thread, draining the queue if it fails."""
+    try:
+        asyncio.run(upsert_stage(upsert_queue, collection_name, on_file_done))
+    except Exception as e:
+        print(f"   ❌ Upsert stage failed, unfinished files are kept for the next run: {str(e)}")
+        # Drain the queue so the embedding worker never blocks on a dead stage
+        while upsert_queue.get() is not None:
+            pass
+
+def ingest_files(file_paths, collection_name, on_file_done=None):
+    """
+    Ingest many files into one collection with a staged pipeline.
+
+    Loading and chunking run in a process pool, embedding runs in a single worker
+    that owns the model, and upserts run in an async stage. The stages are joined
+    by bounded queues, so a slow stage blocks the ones before it instead of letting
+    chunks pile up in memory.
+
+    A worker holds a whole file, so files larger than STREAMING_FILE_SIZE_MB are
+    streamed page by page with process_file once the pipeline is done.
+
+    Everything is loaded in one BulkLoadSession: HNSW indexing is off while the points
+    arrive and the index is built once at the end.
+
+    Args:
+        file_paths: Paths of the files to ingest
+        collection_name: Name of the collection to add the data to
+        on_file_done: Optional callback receiving each file path once it is finished
+    """
+    on_file_done = on_file_done or (lambda file_path: None)
+
+    # The embedding worker uses the shared model
+    initialize_embeddings()
+
+    # Stop index building until every file is in
+    session = BulkLoadSession(initialize_qdrant_client(), collection_name).begin()
+    try:
+        embed_queue = queue.Queue(maxsize=EMBED_QUEUE_SIZE)
+        upsert_queue = queue.Queue(maxsize=UPSERT_QUEUE_SIZE)
+
+        # Start memory monitoring thread
+        memory_monitor_stop = threading.Event()
+        memory_monitor = threading.Thread(
+            target=memory_monitor_thread_func,
+            args=(memory_monitor_stop, collection_name),
+            daemon=True
+        )
+        memory_monitor.start()
+
+        embed_thread = threading.Thread(
+            target=embedding_worker, args=(embed_queue, upsert_queue, collection_name), daemon=True
+        )
+        upsert_thread = threading.Thread(
+            target=run_upsert_stage, args=(upsert_queue, collection_name, on_file_done), daemon=True
+        )
+        embed_thread.start()
+        upsert_thread.start()
+
+        def forward(future, file_path, content_hash):
+            try:
+                _, documents = future.result()
+            except Exception as e:
+                print(f"   ❌ Unexpected error processing file '{os.path.basename(file_path)}': {str(e)}")
+                documents = None
+            if documents is None:
+                on_file_done(file_path)
+                return
+            committed = start_file(file_path, collection_name, content_hash, streamed=False)
+            # Blocks while the embedding worker is behind
+            embed_queue.put((file_path, documents, committed))
+
+        large_files = []
+        try:
+            # Spawn the workers so they do not inherit the CUDA context of this process
+            with ProcessPoolExecutor(max_workers=CHUNK_WORKERS, mp_context=multiprocessing.get_context("spawn")) as pool:
+                pending = {}
+                for file_path in file_paths:
+                    content_hash = file_content_hash(file_path)
+                    if is_file_processed(file_path, collection_name, content_hash):
+                        on_file_done(file_path)
+                        continue
+                    if os.path.getsize(file_path) > STREAMING_FILE_SIZE_MB * 1024 * 1024:
+                        large_files.append(file_path)
+                        continue
+
+                    # Pause while memory is under pressure
+                    monitor_system_resources()
+                    pending[pool.submit(load_and_chunk_file, file_path)] = (file_path, content_hash)
+
+                    # Keep at most two files per worker in flight
+                    if len(pending) >= CHUNK_WORKERS * 2:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            forward(future, *pending.pop(future))
+
+                for future in as_completed(list(pending)):
+                    forward(future, *pending.pop(future))
+        finally:
+            embed_queue.put(None)
+            embed_thread.join()
+            upsert_thread.join()
+
+            # Stop memory monitoring thread
+            memory_monitor_stop.set()
+            memory_monitor.join(timeout=1.0)
+            memory_pressure.clear()
+
+        # Stream the large files one at a time, the embedding model is free again
+        for file_path in large_files:
+            process_file(file_path, collection_name, session=session)
+            on_file_done(file_path)
+    except BaseException:
+        session.abort()
+        raise
+
+    print(f"   🏗️ Building the index of collection {collection_name}...")
+    if session.commit():
+        print(f"   ✅ Collection '{collection_name}' indexed")
+
 def main():
     """Main function to process all folders in database as collections.
     Optimized for Tesla P40 GPU."""
@@ -921,31 +1506,20 @@ def main():
             # Sort files alphabetically
             all_files.sort()
 
-            # Process files with progress tracking
-            with tqdm(total=len(all_files), desc=f"Files in {folder_name}", 
+            # Run the files through the staged pipeline with progress tracking
+            with tqdm(total=len(all_files), desc=f"Files in {folder_name}",
                       unit="file", ncols=100, position=0, leave=True) as pbar:
+                ingest_files(all_files, folder_name, on_file_done=lambda file_path: pbar.update(1))
 
-                for file_idx, file_path in enumerate(all_files):
-                    # Update progress bar description with current file
-                    pbar.set_description(f"File {file_idx+1}/{len(all_files)}: {os.path.basename(file_path)}")
-
-                    # Process file
-                    try:
-                        process_file(file_path, folder_name)
-                    except Exception as e:
-                        print(f"   ❌ Unexpected error processing file: {str(e)}")
-
-                    # Update progress
-                    pbar.update(1)
-
-                    # Perform cleanup after each file
-                    gc.collect()
-                    if torch.cuda.is_available():
-                        torch.cuda.empty_cache()
+            # Perform cleanup after each collection
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
 
             print(f"✅ Completed processing collection: {folder_name}")
 
         print("\n🎉 All collections processed successfully")
+        print_run_summary()
 
     except Exception as e:
         print(f"❌ Unexpected error: {str(e)}")
@@ -159,7 +159,7 @@ def load_qa_from_json(json_file_path, collection_name=COLLECTION_NAME, custom_cl
     # Add all documents to the collection
     if all_documents:
         print(f"Adding {len(all_documents)} documents to collection {collection_name}")
-        chunked_metadata(all_documents, collection_name, custom_client=c)
+        chunked_metadata(all_documents, collection_name, custom_client=c, bulk=True)
         print("Q&A data successfully added to the model")
     else:
         print("No valid Q&A pairs found")
@@ -0,0 +1,197 @@
+"""
+Chain registry module.
+This module keeps compiled RAG chains alive across requests so they are built once per subject or user collection.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+from langchain_core.runnables.history import RunnableWithMessageHistory
+
+from app.config.settings import CHAIN_REGISTRY_MAX_SIZE
+
+
+class CompiledRagChain:
+    """
+    A RAG chain that is built once and shared by every request for the same key.
+
+    Only the chat history is supplied per call: it is registered under a one-off
+    session id for the duration of the invocation, so concurrent requests never
+    see each other's history.
+
+    The retriever, answer chain and document preparation step are kept alongside the
+    runnable so the streaming path can drive retrieval and generation separately.
+    """
+    def __init__(self, runnable, collections, output_messages_key="answer",
+                 retriever=None, answer_chain=None, prepare_documents=None):
+        self.collections = frozenset(collections)
+        self.retriever = retriever
+        self.answer_chain = answer_chain
+        self.prepare_documents = prepare_documents or (lambda documents, question, chat_history: (documents, chat_history))
+        self._histories = {}
+        self._lock = threading.Lock()
+        self.chain = RunnableWithMessageHistory(
+            runnable,
+            self._get_session_history,
+            input_messages_key="input",
+            history_messages_key="chat_history",
+            output_messages_key=output_messages_key,
+        )
+
+    def _get_session_history(self, session_id):
+        with self._lock:
+            return self._histories[session_id]
+
+    def _register_history(self, history):
+        session_id = str(uuid.uuid4())
+        with self._lock:
+            self._histories[session_id] = history
+        return session_id
+
+    def _release_history(self, session_id):
+        with self._lock:
+            self._histories.pop(session_id, None)
+
+    def invoke(self, question, history):
+        """
+        Run the chain for one question against the given chat history.
+
+        Args:
+            question (str): The question to answer
+            history (BaseChatMessageHistory): The history for this request; it is updated in place
+
+        Returns:
+            The chain output
+        """
+        session_id = self._register_history(history)
+        try:
+            return self.chain.invoke(
+                {"input": question},
+                config={"configurable": {"session_id": session_id}},
+            )
+        finally:
+            self._release_history(session_id)
+
+    async def ainvoke(self, question, history):
+        """
+        Async counterpart of invoke.
+
+        Args:
+            question (str): The question to answer
+            history (BaseChatMessageHistory): The history for this request; it is updated in place
+
+        Returns:
+            The chain output
+        """
+        session_id = self._register_history(history)
+        try:
+            return await self.chain.ainvoke(
+                {"input": question},
+                config={"configurable": {"session_id": session_id}},
+            )
+        finally:
+            self._release_history(session_id)
+
+class ChainRegistry:
+    """
+    Process-wide, thread-safe LRU registry of compiled RAG chains.
+
+    Builds of the same key are serialized by a per-key lock that lives as long as some
+    caller holds or waits for it. A build that an invalidation or clear overtook is not
+    cached, it is built again so the stale chain is never stored.
+    """
+    def __init__(self, max_size=CHAIN_REGISTRY_MAX_SIZE):
+        self.max_size = max_size
+        self._chains = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}  # key -> [lock, number of callers holding or waiting for it]
+        self._generation = 0  # Bumped by every invalidate and clear
+        self._invalidated_at = {}  # collection name -> generation of its last invalidation
+        self._cleared_at = 0
+
+    def _is_stale(self, chain, generation):
+        # Called with the registry lock held
+        if self._cleared_at > generation:
+            return True
+        return any(self._invalidated_at.get(collection_name, 0) > generation for collection_name in chain.collections)
+
+    def get_or_build(self, key, builder):
+        """
+        Get the chain for a key, building it with `builder` on first use.
+
+        Args:
+            key (tuple): The registry key, e.g. ("business", subject)
+            builder (callable): Zero-argument callable returning a CompiledRagChain
+
+        Returns:
+            CompiledRagChain: The cached or newly built chain
+        """
+        with self._lock:
+            chain = self._chains.get(key)
+            if chain is not None:
+                self._chains.move_to_end(key)
+                return chain
+            key_lock = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+
+        try:
+            # Build outside the registry lock so one slow build does not block other keys
+            with key_lock[0]:
+                while True:
+                    with self._lock:
+                        chain = self._chains.get(key)
+                        if chain is not None:
+                            self._chains.move_to_end(key)
+                            return chain
+                        generation = self._generation
+
+                    chain = builder()
+
+                    with self._lock:
+                        if self._is_stale(chain, generation):
+                            # Invalidated while it was built, it may hold the old prompt or data
+                            continue
+                        self._chains[key] = chain
+                        self._chains.move_to_end(key)
+                        while len(self._chains) > self.max_size:
+                            self._chains.popitem(last=False)
+                        return chain
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if key_lock[1] == 0:
+                    del self._key_locks[key]
+
+    def invalidate(self, collection_name):
+        """
+        Drop every chain that reads from the given collection.
+
+        Chains of the collection being built meanwhile are built again.
+
+        Args:
+            collection_name (str): The collection that was created, updated or deleted
+
+        Returns:
+            int: The number of chains dropped
+        """
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at[collection_name] = self._generation
+            stale_keys = [key for key, chain in self._chains.items() if collection_name in chain.collections]
+            for key in stale_keys:
+                del self._chains[key]
+        return len(stale_keys)
+
+    def clear(self):
+        """Drop every compiled chain, chains being built meanwhile are built again."""
+        with self._lock:
+            self._generation += 1
+            self._cleared_at = self._generation
+            self._chains.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._chains)
+
+# Shared registry used by the RAG module and invalidated by the routes
+chain_registry = ChainRegistry()
@@ -0,0 +1,275 @@
+"""
+Context packer module.
+This module assembles the retrieved documents into a context that fits a token budget of the chat model.
+"""
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from app.config.settings import CONTEXT_NEAR_DUPLICATE_THRESHOLD, CONTEXT_TOKEN_BUDGET, CONTEXT_TOKENIZER, MODEL_NUM_CTX, \
+    MODEL_NUM_PREDICT
+
+# Fallback when the model tokenizer cannot be loaded: Vietnamese syllables are roughly 1.4 tokens
+TOKENS_PER_WORD = 1.4
+
+# Tokens the stuff-documents chain adds around each document (the "\n\n" separator)
+DOCUMENT_SEPARATOR_TOKENS = 2
+
+# Tokens the chat template adds around each message (role header and end of turn)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Smallest context worth answering from, the answer reserve and then the oldest history
+# messages give way to make room for it
+MIN_CONTEXT_TOKENS = 256
+
+# The answer reserve is not cut below this, answers rarely use all of num_predict
+MIN_ANSWER_TOKENS = 256
+
+# Word n-grams compared to find near-duplicate chunks
+SHINGLE_SIZE = 3
+
+# Token counts of recently packed chunks, the same chunks come back for related questions
+TOKEN_COUNT_CACHE_SIZE = 4096
+
+
+class TokenCounter:
+    """
+    Counts tokens with the tokenizer of the chat model.
+
+    The tokenizer is loaded on first use from CONTEXT_TOKENIZER (a Hugging Face name or
+    a local path). When it cannot be loaded, counts are estimated from the word count.
+    """
+    def __init__(self, tokenizer_name: str = CONTEXT_TOKENIZER):
+        self.tokenizer_name = tokenizer_name
+        self._tokenizer = None
+        self._loaded = False
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_tokenizer(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        from transformers import AutoTokenizer
+                        self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name)
+                    except Exception as e:
+                        print(f"⚠️ Could not load tokenizer '{self.tokenizer_name}', estimating context tokens: {e}")
+                    self._loaded = True
+        return self._tokenizer
+
+    def count(self, text: str) -> int:
+        """
+        Count the tokens of a text.
+
+        Args:
+            text (str): The text
+
+        Returns:
+            int: The number of tokens, without special tokens
+        """
+        with self._lock:
+            if text in self._counts:
+                self._counts.move_to_end(text)
+                return self._counts[text]
+        tokenizer = self._get_tokenizer()
+        if tokenizer is not None:
+            count = len(tokenizer.encode(text, add_special_tokens=False))
+        else:
+            count = int(len(text.split()) * TOKENS_PER_WORD) + 1
+        with self._lock:
+            self._counts[text] = count
+            if len(self._counts) > TOKEN_COUNT_CACHE_SIZE:
+                self._counts.popitem(last=False)
+        return count
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Cut a text to at most max_tokens tokens.
+
+        Args:
+            text (str): The text
+            max_tokens (int): The maximum number of tokens
+
+        Returns:
+            str: The text cut at a token boundary, or at a word boundary without tokenizer
+        """
+        tokenizer = self._get_tokenizer()
+        if tokenizer is not None:
+            token_ids = tokenizer.encode(text, add_special_tokens=False)[:max_tokens]
+            return tokenizer.decode(token_ids, skip_special_tokens=True)
+        words = text.split()
+        return " ".join(words[:int(max_tokens / TOKENS_PER_WORD)])
+
+# Shared by every chain, the chat model is the same
+token_counter = TokenCounter()
+
+
+def count_message_tokens(messages, counter: TokenCounter = token_counter) -> int:
+    """
+    Count the tokens of chat messages as the chat template sends them.
+
+    Args:
+        messages: The messages, e.g. a rendered prompt or the chat history
+        counter (TokenCounter): The token counter of the chat model
+
+    Returns:
+        int: The tokens of the message contents plus the template tokens around each message
+    """
+    return sum(counter.count(message.content if isinstance(message.content, str) else str(message.content))
+               + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+def fit_context_budget(prompt_tokens: int, chat_history, token_budget: int = CONTEXT_TOKEN_BUDGET,
+                       num_ctx: int = MODEL_NUM_CTX, answer_tokens: int = MODEL_NUM_PREDICT,
+                       counter: TokenCounter = token_counter) -> Tuple[int, list]:
+    """
+    Work out the tokens left for the retrieved context of one call.
+
+    The context gets what the prompt, the history and the answer reserve leave of num_ctx,
+    at most token_budget. While that is under MIN_CONTEXT_TOKENS (or token_budget if
+    smaller), the answer reserve is cut down to MIN_ANSWER_TOKENS, then the oldest history
+    messages are dropped, so Ollama never has to truncate the prompt itself.
+
+    Args:
+        prompt_tokens (int): Tokens of the prompt rendered without history and context
+        chat_history: The history messages, oldest first
+        token_budget (int): The most tokens of context, from the settings or the subject profile
+        num_ctx (int): The context window of the chat model
+        answer_tokens (int): Tokens kept free for the answer
+        counter (TokenCounter): The token counter of the chat model
+
+    Returns:
+        Tuple[int, list]: The context budget, 0 or less if not even the prompt fits, and
+            the history messages kept
+    """
+    history = list(chat_history)
+    history_tokens = [count_message_tokens([message], counter) for message in history]
+    budget = num_ctx - prompt_tokens - answer_tokens - sum(history_tokens)
+    minimum = min(token_budget, MIN_CONTEXT_TOKENS)
+    if budget < minimum:
+        budget += answer_tokens - max(min(MIN_ANSWER_TOKENS, answer_tokens), answer_tokens - (minimum - budget))
+
+    dropped = 0
+    while history and budget < minimum:
+        budget += history_tokens.pop(0)
+        history.pop(0)
+        dropped += 1
+    if dropped:
+        print(f"⚠️ The prompt ({prompt_tokens} tokens) and history did not leave {minimum} context tokens "
+              f"in num_ctx={num_ctx}, dropped the {dropped} oldest history messages")
+    if budget <= 0:
+        print(f"⚠️ The prompt ({prompt_tokens} tokens) leaves no room for context in num_ctx={num_ctx}")
+    return min(token_budget, budget), history
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip().lower()
+
+def _shingles(text: str) -> frozenset:
+    words = text.split()
+    if len(words) <= SHINGLE_SIZE:
+        return frozenset([" ".join(words)])
+    return frozenset(" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+
+def _similarity(first: frozenset, second: frozenset) -> float:
+    # Overlap coefficient, so a chunk contained in a longer one counts as its duplicate
+    if not first or not second:
+        return 0.0
+    return len(first & second) / min(len(first), len(second))
+
+def remove_duplicates(documents: List[Document], threshold: float = CONTEXT_NEAR_DUPLICATE_THRESHOLD) -> List[Document]:
+    """
+    Drop documents whose text repeats a better ranked document.
+
+    The same chunk often comes back from both the subject collection and base_knowledge,
+    with different whitespace or as part of a longer chunk.
+
+    Args:
+        documents (List[Document]): The documents, best first
+        threshold (float): Share of word 3-grams of the shorter text found in the other above
+            which two documents are near-duplicates; 1 only drops exact duplicates
+
+    Returns:
+        List[Document]: The documents kept, in their order
+    """
+    kept = []
+    seen_texts = set()
+    kept_shingles = []
+    for document in documents:
+        text = _normalize(document.page_content)
+        if not text or text in seen_texts:
+            continue
+        shingles = _shingles(text)
+        if any(_similarity(shingles, other) >= threshold for other in kept_shingles):
+            continue
+        seen_texts.add(text)
+        kept_shingles.append(shingles)
+        kept.append(document)
+    return kept
+
+def group_by_source(documents: List[Document]) -> List[Document]:
+    """
+    Place the documents of each source next to each other.
+
+    Sources are ordered by their best document, documents keep their order within a source.
+
+    Args:
+        documents (List[Document]): The documents, best first
+
+    Returns:
+        List[Document]: The grouped documents
+    """
+    groups: Dict[Optional[str], List[Document]] = {}
+    for document in documents:
+        groups.setdefault(document.metadata.get("source"), []).append(document)
+    return [document for group in groups.values() for document in group]
+
+def _truncated(document: Document, max_tokens: int, counter: TokenCounter) -> Document:
+    # Copy, the retrieved document may be shared with the response cache or other requests
+    content = counter.truncate(document.page_content, max_tokens)
+    return Document(page_content=content, metadata={**document.metadata, "truncated": True})
+
+def pack_context(documents: List[Document], token_budget: int = CONTEXT_TOKEN_BUDGET,
+                 max_documents: Optional[int] = None, max_document_tokens: Optional[int] = None,
+                 counter: TokenCounter = token_counter) -> List[Document]:
+    """
+    Select the documents passed to the stuff-documents chain within a token budget.
+
+    Duplicates are removed, then documents are taken in retrieval order (by score, or by
+    fused rank for fused retrievers) while they fit; a document that does not fit is
+    skipped so a smaller one further down can still be used. If even the best document
+    is over the budget, it is cut to the budget instead of being dropped. The selection
+    is grouped by source.
+
+    Args:
+        documents (List[Document]): The retrieved documents, best first
+        token_budget (int): Tokens available for the context
+        max_documents (int, optional): Stop after this many documents
+        max_document_tokens (int, optional): Cut longer documents to this many tokens
+        counter (TokenCounter): The token counter of the chat model
+
+    Returns:
+        List[Document]: The documents to pass as context, none if the budget is 0 or less
+    """
+    if token_budget <= 0:
+        return []
+    packed = []
+    used = 0
+    for document in remove_duplicates(list(documents)):
+        if max_documents is not None and len(packed) >= max_documents:
+            break
+        tokens = counter.count(document.page_content)
+        if max_document_tokens is not None and tokens > max_document_tokens:
+            document = _truncated(document, max_document_tokens, counter)
+            tokens = max_document_tokens
+        tokens += DOCUMENT_SEPARATOR_TOKENS
+        if used + tokens <= token_budget:
+            packed.append(document)
+            used += tokens
+        elif not packed:
+            packed.append(_truncated(document, token_budget - DOCUMENT_SEPARATOR_TOKENS, counter))
+            used = token_budget
+    return group_by_source(packed)
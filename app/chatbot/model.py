@@ -2,54 +2,216 @@
 Chatbot model module.
 This module handles model initialization for the chatbot.
 """
+import threading
+import time
+
 import httpx
 from langchain_ollama import ChatOllama
 
-from app.config.settings import MODEL_NAME, MODEL_BASE_URL
+from app.config.settings import MODEL_NAME, MODEL_BASE_URL, MODEL_NUM_CTX, MODEL_NUM_PREDICT, OLLAMA_HEALTH_CHECK_INTERVAL, \
+    OLLAMA_HEALTH_CHECK_TIMEOUT, REWRITE_MODEL_NAME
+
+
+# Shared model instance, ChatOllama is stateless between calls so one instance serves every chain
+_model = None
+_rewrite_model = None
+_model_lock = threading.Lock()
+
+class OllamaHealthMonitor:
+    """
+    Background monitor that probes Ollama on an interval and caches the result.
+    """
+    def __init__(self, base_url=MODEL_BASE_URL, interval=OLLAMA_HEALTH_CHECK_INTERVAL, timeout=OLLAMA_HEALTH_CHECK_TIMEOUT):
+        self.base_url = base_url
+        self.interval = interval
+        self.timeout = timeout
+        self._status = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        # Reuse one connection across probes instead of opening a new one each time
+        self._client = httpx.Client(base_url=base_url, timeout=timeout)
+
+    def probe(self):
+        """
+        Probe Ollama once and cache the result.
+
+        Returns:
+            dict: The health status of the Ollama service
+        """
+        try:
+            response = self._client.get("/api/tags")
+            if response.status_code == 200:
+                status = {
+                    "status": "ok",
+                    "message": f"Ollama service is running at {self.base_url}",
+                    "models": response.json().get("models", [])
+                }
+            else:
+                status = {
+                    "status": "error",
+                    "message": f"Ollama service returned status code {response.status_code}",
+                    "url": self.base_url
+                }
+        except httpx.ConnectError:
+            status = {
+                "status": "error",
+                "message": f"Could not connect to Ollama service at {self.base_url}. Is Ollama running?",
+                "url": self.base_url,
+                "help": "You can configure the Ollama URL using the OLLAMA_BASE_URL environment variable."
+            }
+        except Exception as e:
+            status = {
+                "status": "error",
+                "message": f"An error occurred while checking Ollama health: {str(e)}",
+                "url": self.base_url
+            }
+
+        status["checked_at"] = time.time()
+        with self._lock:
+            self._status = status
+        return status
+
+    def get_status(self):
+        """
+        Get the cached health status, probing once if nothing is cached yet.
 
+        Returns:
+            dict: The health status of the Ollama service
+        """
+        with self._lock:
+            status = self._status
+        if status is None:
+            status = self.probe()
+        return status
+
+    def is_healthy(self):
+        """Return True if the last probe found Ollama running."""
+        return self.get_status()["status"] == "ok"
+
+    def start(self):
+        """Start the background probe thread if it is not running yet."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="ollama-health-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background probe thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.probe()
+            self._stop_event.wait(self.interval)
+
+# Shared health monitor used by initialize_model and the /health/ollama route
+health_monitor = OllamaHealthMonitor()
+
+def ensure_model_available():
+    """
+    Check Ollama availability from the cached health state.
+
+    Raises:
+        ConnectionError: If the last probe found Ollama not running or not accessible
+    """
+    status = health_monitor.get_status()
+    if status["status"] != "ok":
+        message = status["message"]
+        if "help" in status:
+            message = f"{message} {status['help']}"
+        raise ConnectionError(message)
 
 def initialize_model():
     """
-    Initialize the ChatOllama model with optimized parameters.
+    Get the shared ChatOllama model with optimized parameters.
+
+    The model is created once and reused. Ollama availability is read from the cached
+    state of the health monitor so no HTTP request is made on the request path.
+
+    Returns:
+        ChatOllama: The initialized model
+
+    Raises:
+        ConnectionError: If Ollama service is not running or not accessible
+    """
+    global _model
+
+    # Fail fast from the cached health state
+    ensure_model_available()
+
+    if _model is not None:
+        return _model
+
+    with _model_lock:
+        if _model is not None:
+            return _model
+        try:
+            # Configure ChatOllama to use GPU if available with highly optimized parameters for speed
+            _model = ChatOllama(
+                model=MODEL_NAME,
+                base_url=MODEL_BASE_URL,
+                temperature=0.1,
+                top_p=0.9,
+                top_k=40,
+                repeat_penalty=1.1,
+                num_predict=MODEL_NUM_PREDICT,
+                num_ctx=MODEL_NUM_CTX,
+                seed=42,
+                stop=["</end>"],  # Ensure the model is required to generate </end> in the prompt
+                format=None,
+                num_gpu=32,
+                num_thread=16,  # Adjust based on your physical system
+                keep_alive="10m",  # Keep model in RAM
+            )
+        except Exception as e:
+            # Re-raise as a ConnectionError with a helpful message
+            raise ConnectionError(f"Failed to initialize Ollama model: {str(e)}")
+
+    return _model
+
+def initialize_rewrite_model():
+    """
+    Get the model used to rewrite follow-up questions into standalone questions.
+
+    A dedicated small model is used when REWRITE_MODEL_NAME is set, otherwise the
+    main chat model is shared.
 
     Returns:
-        ChatOllama: The initialized model or None if initialization fails
+        ChatOllama: The rewrite model
 
     Raises:
         ConnectionError: If Ollama service is not running or not accessible
     """
-    try:
-        # Configure ChatOllama to use GPU if available with highly optimized parameters for speed
-        model = ChatOllama(
-            model=MODEL_NAME,
-            base_url=MODEL_BASE_URL,
-            temperature=0.1,
-            top_p=0.9,
-            top_k=40,
-            repeat_penalty=1.1,
-            num_predict=1024,
-            num_ctx=2048,
-            seed=42,
-            stop=["</end>"],  # Ensure the model is required to generate </end> in the prompt
-            format=None,
-            num_gpu=32,
-            num_thread=16,  # Adjust based on your physical system
-            keep_alive="10m",  # Keep model in RAM
-        )
-
-        # Test the connection to Ollama
-        # This will raise an exception if Ollama is not running
+    global _rewrite_model
+
+    if not REWRITE_MODEL_NAME:
+        return initialize_model()
+
+    ensure_model_available()
+
+    if _rewrite_model is not None:
+        return _rewrite_model
+
+    with _model_lock:
+        if _rewrite_model is not None:
+            return _rewrite_model
         try:
-            # Make a simple request to check if Ollama is running
-            response = httpx.get(f"{MODEL_BASE_URL}/api/tags")
-            if response.status_code != 200:
-                raise ConnectionError(f"Ollama service returned status code {response.status_code}")
-        except httpx.ConnectError as e:
-            raise ConnectionError(f"Could not connect to Ollama service at {MODEL_BASE_URL}. Is Ollama running? You can configure the Ollama URL using the OLLAMA_BASE_URL environment variable.") from e
-
-        return model
-    except Exception as e:
-        # Re-raise as a ConnectionError with a helpful message
-        if isinstance(e, ConnectionError):
-            raise
-        raise ConnectionError(f"Failed to initialize Ollama model: {str(e)}")
+            # Rewrites are one short sentence, keep the context and output small
+            _rewrite_model = ChatOllama(
+                model=REWRITE_MODEL_NAME,
+                base_url=MODEL_BASE_URL,
+                temperature=0.0,
+                num_predict=128,
+                num_ctx=MODEL_NUM_CTX,
+                seed=42,
+                keep_alive="10m",
+            )
+        except Exception as e:
+            raise ConnectionError(f"Failed to initialize Ollama rewrite model: {str(e)}")
+
+    return _rewrite_model
@@ -0,0 +1,164 @@
+"""
+Question rewriter module.
+This module turns follow-up questions into standalone questions before retrieval, skipping the LLM when it is not needed.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from langchain_core.output_parsers import StrOutputParser
+
+from app.chatbot.model import initialize_rewrite_model
+from app.chatbot.prompts import get_contextualize_q_prompt
+from app.config.settings import REWRITE_CACHE_SIZE
+
+# Words that usually point back to earlier turns ("it", "that", "they", "above", ...)
+REFERENCE_PATTERN = re.compile(
+    r"\b(nó|chúng|họ|ông ấy|bà ấy|anh ấy|chị ấy|cái đó|điều đó|việc đó|vấn đề đó|vấn đề này|điều này|việc này|"
+    r"như trên|ở trên|nói trên|vừa rồi|vừa nói|trước đó|cái kia|còn gì|còn nữa|thêm nữa|tiếp tục|tiếp theo|"
+    r"chi tiết hơn|rõ hơn|cụ thể hơn|ví dụ khác|tại sao vậy|thế còn|vậy còn)\b",
+    re.IGNORECASE,
+)
+
+# Questions shorter than this are too terse to stand on their own
+MIN_SELF_CONTAINED_WORDS = 4
+
+# Shared rewriter, so every chain shares one rewrite cache
+_question_rewriter = None
+_rewriter_lock = threading.Lock()
+
+def is_self_contained(question: str) -> bool:
+    """
+    Check whether a question can be understood without the chat history.
+
+    Args:
+        question (str): The question
+
+    Returns:
+        bool: True if the question has no back-references and is long enough
+    """
+    if len(question.split()) < MIN_SELF_CONTAINED_WORDS:
+        return False
+    return REFERENCE_PATTERN.search(question) is None
+
+def _cache_key(question: str, chat_history) -> str:
+    digest = hashlib.sha256()
+    for message in chat_history:
+        digest.update(f"{message.type}:{message.content}\n".encode("utf-8"))
+    digest.update(question.strip().lower().encode("utf-8"))
+    return digest.hexdigest()
+
+
+class QuestionRewriter:
+    """
+    History-aware question rewriting with a bypass and a cache.
+
+    The rewrite LLM call is skipped when the history is empty or the question is
+    self-contained, and rewrites are cached by history hash plus question.
+    """
+    SKIPPED = "skipped"
+    CACHE_HIT = "cache_hit"
+    REWRITTEN = "rewritten"
+
+    def __init__(self, model, prompt, cache_size=REWRITE_CACHE_SIZE):
+        self.chain = prompt | model | StrOutputParser()
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {self.SKIPPED: 0, self.CACHE_HIT: 0, self.REWRITTEN: 0}
+
+    def _count(self, status):
+        with self._lock:
+            self._counters[status] += 1
+
+    def _lookup(self, key):
+        with self._lock:
+            rewritten = self._cache.get(key)
+            if rewritten is not None:
+                self._cache.move_to_end(key)
+            return rewritten
+
+    def _store(self, key, rewritten):
+        with self._lock:
+            self._cache[key] = rewritten
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _prepare(self, question, chat_history):
+        """Return (question, status, cache key) without calling the LLM when possible."""
+        if not chat_history or is_self_contained(question):
+            self._count(self.SKIPPED)
+            return question, self.SKIPPED, None
+        key = _cache_key(question, chat_history)
+        rewritten = self._lookup(key)
+        if rewritten is not None:
+            self._count(self.CACHE_HIT)
+            return rewritten, self.CACHE_HIT, None
+        return None, None, key
+
+    def rewrite(self, question, chat_history):
+        """
+        Get the standalone form of a question.
+
+        Args:
+            question (str): The latest question
+            chat_history (list): The previous messages
+
+        Returns:
+            tuple: The standalone question and how it was obtained (skipped, cache_hit or rewritten)
+        """
+        rewritten, status, key = self._prepare(question, chat_history)
+        if status is not None:
+            return rewritten, status
+        rewritten = self.chain.invoke({"input": question, "chat_history": chat_history}).strip() or question
+        self._store(key, rewritten)
+        self._count(self.REWRITTEN)
+        return rewritten, self.REWRITTEN
+
+    async def arewrite(self, question, chat_history):
+        """
+        Async counterpart of rewrite.
+
+        Args:
+            question (str): The latest question
+            chat_history (list): The previous messages
+
+        Returns:
+            tuple: The standalone question and how it was obtained (skipped, cache_hit or rewritten)
+        """
+        rewritten, status, key = self._prepare(question, chat_history)
+        if status is not None:
+            return rewritten, status
+        rewritten = (await self.chain.ainvoke({"input": question, "chat_history": chat_history})).strip() or question
+        self._store(key, rewritten)
+        self._count(self.REWRITTEN)
+        return rewritten, self.REWRITTEN
+
+    def stats(self):
+        """
+        Get the rewrite counters.
+
+        Returns:
+            dict: Number of skipped, cached and LLM rewrites since start
+        """
+        with self._lock:
+            return dict(self._counters)
+
+def get_question_rewriter() -> QuestionRewriter:
+    """
+    Get the shared question rewriter.
+
+    Returns:
+        QuestionRewriter: The rewriter
+
+    Raises:
+        ConnectionError: If the rewrite model cannot be initialized
+    """
+    global _question_rewriter
+    if _question_rewriter is None:
+        with _rewriter_lock:
+            if _question_rewriter is None:
+                _question_rewriter = QuestionRewriter(initialize_rewrite_model(), get_contextualize_q_prompt())
+    return _question_rewriter
@@ -2,158 +2,139 @@
 RAG (Retrieval Augmented Generation) module.
 This module handles RAG functionality for the chatbot.
 """
+import asyncio
 import time
-import uuid
+from typing import Any, Dict, NamedTuple, Optional
 
 import httpx
-from langchain.chains import create_history_aware_retriever, create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain.retrievers import EnsembleRetriever
-from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
+from langchain_core.chat_history import InMemoryChatMessageHistory
 from langchain_core.runnables import RunnableLambda
-from langchain_core.runnables.history import RunnableWithMessageHistory
 
-from app.chatbot.model import initialize_model
-from app.chatbot.prompts import get_contextualize_q_prompt, get_qa_prompt, get_user_qa_prompt
-from app.database.vector_db import get_vector_store
+from app.chatbot.chain_registry import CompiledRagChain, chain_registry
+from app.chatbot.context_packer import count_message_tokens, fit_context_budget, pack_context
+from app.chatbot.model import ensure_model_available, initialize_model
+from app.chatbot.prompts import get_qa_prompt, get_user_qa_prompt
+from app.chatbot.question_rewriter import get_question_rewriter, is_self_contained
+from app.chatbot.retrieval import get_embeddings, get_fused_retriever, get_retriever
+from app.chatbot.subject_profiles import SubjectProfile, subject_profiles
+from app.config.settings import CONTEXT_TOKEN_BUDGET, RESPONSE_CACHE_ENABLED
 from app.utils.chat_history import load_previous_conversation, initialize_session_from_history, update_conversation
+from app.utils.response_cache import normalize_question, response_cache
+from app.utils.tenant_storage import business_search_target
+from app.utils.text_processing import StreamingAnswerFormatter
 
 
 class TimedRetriever:
     """
-    A retriever that tracks retrieval time.
+    A history-aware retriever that tracks retrieval time.
+
+    Follow-up questions are turned into standalone questions by the shared question
+    rewriter, which skips the LLM when there is no history or the question is
+    self-contained.
     """
-    def __init__(self, retriever):
+    def __init__(self, retriever, rewriter):
         self.retriever = retriever
+        self.rewriter = rewriter
 
     def invoke(self, query):
         retrieval_start = time.time()
         # Check if query is a string or a dict
         if isinstance(query, str):
-            # If it's a string, wrap it in a dict as expected by history_aware_retriever
-            docs = self.retriever.invoke({"input": query})
-        else:
-            # If it's already a dict, pass it through
-            docs = self.retriever.invoke(query)
+            query = {"input": query}
+        question, rewrite_status = self.rewriter.rewrite(query["input"], query.get("chat_history", []))
+        docs = self.retriever.invoke(question)
+        retrieval_time = time.time() - retrieval_start
+        return {"documents": docs, "retrieval_time": retrieval_time, "rewrite": rewrite_status}
+
+    async def ainvoke(self, query):
+        retrieval_start = time.time()
+        if isinstance(query, str):
+            query = {"input": query}
+        question, rewrite_status = await self.rewriter.arewrite(query["input"], query.get("chat_history", []))
+        docs = await self.retriever.ainvoke(question)
         retrieval_time = time.time() - retrieval_start
-        return {"documents": docs, "retrieval_time": retrieval_time}
+        return {"documents": docs, "retrieval_time": retrieval_time, "rewrite": rewrite_status}
 
-def answer_business(subject: str, question: str, user_id: str) -> str:
+def _prepare_context(profile: Optional[SubjectProfile], qa_prompt, documents, question: str, chat_history):
     """
-    Answer a business-related question.
+    Pack the retrieved documents into the tokens the prompt and history leave for the context.
+
+    The prompt is rendered without history and context and counted with the model
+    tokenizer, the history is counted message by message, and the context gets the rest
+    of num_ctx after the answer reserve, at most the token budget of the subject.
 
     Args:
-        subject (str): The subject of the question
-        question (str): The question to answer
-        user_id (str): The user ID
+        profile (SubjectProfile, optional): The profile of the subject, None for user collections
+        qa_prompt: The prompt template of the question-answer chain
+        documents: The retrieved documents
+        question (str): The question
+        chat_history (list): The previous messages
 
     Returns:
-        str: The answer or an error message if something goes wrong
+        Tuple of the documents and the history messages to pass to the question-answer chain,
+        the oldest messages are dropped if the history leaves too little room for the context
     """
-    # Start timing for performance monitoring
-    start_time = time.time()
+    prompt_tokens = count_message_tokens(qa_prompt.format_messages(context="", chat_history=[], input=question))
+    token_budget = (profile.context_token_budget if profile is not None else None) or CONTEXT_TOKEN_BUDGET
+    token_budget, chat_history = fit_context_budget(prompt_tokens, chat_history, token_budget)
+    if profile is None:
+        return pack_context(documents, token_budget), chat_history
+    documents = pack_context(
+        documents,
+        token_budget,
+        max_documents=profile.max_documents,
+        max_document_tokens=profile.max_document_tokens,
+    )
+    return documents, chat_history
 
-    try:
-        # Initialize model
-        model = initialize_model()
-    except ConnectionError as e:
-        # Return a user-friendly error message
-        return f"Error: {str(e)}"
-    except Exception as e:
-        # Return a generic error message for other exceptions
-        return f"An unexpected error occurred: {str(e)}"
+def _invalidate_subjects(subjects):
+    # Chains capture the prompt and retrieval parameters of their subject, and the cached
+    # answers were produced with them
+    for subject in subjects:
+        chain_registry.invalidate(subject)
+        response_cache.invalidate(subject)
 
-    # Log the request for analytics
-    store = {}
+subject_profiles.add_listener(_invalidate_subjects)
 
-    # Load only the last few messages instead of the entire history
-    first_message, recent_messages = load_previous_conversation(user_id, subject, f"{user_id}.txt")
+def _extract_answer(answer_result) -> str:
+    """
+    Extract the answer text from a business chain result.
 
-    if user_id not in store:
-        store[user_id] = InMemoryChatMessageHistory()
-    if first_message is not None and recent_messages is not None:
-        initialize_session_from_history(store[user_id], first_message, recent_messages)
+    Args:
+        answer_result: The chain output
 
-    def get_session_history(session_id: str) -> BaseChatMessageHistory:
-        if session_id not in store:
-            store[session_id] = InMemoryChatMessageHistory()
-        return store[session_id]
-
-    # Get contextualize question prompt
-    contextualize_q_prompt = get_contextualize_q_prompt()
-
-    # Get retrievers with optimized parameters - adjust based on subject
-    if subject == "political":
-        # Highly optimized political subject for maximum speed
-        retriever_1 = get_vector_store(
-            collection_name=f"{subject}",
-            embeddings=None,  # This will be filled in by the caller
-            search_limit=5,  # Drastically reduced from 10 to improve speed
-            score_threshold=0.8,  # Increased from 0.75 to focus only on highest quality matches
-            subject=subject  # Pass subject for dynamic embedding selection
-        )
-        retriever_2 = get_vector_store(
-            collection_name="base_knowledge",
-            embeddings=None,  # This will be filled in by the caller
-            search_limit=3,  # Reduced from 5 to improve speed
-            score_threshold=0.85,  # Increased from 0.8 to focus only on highest quality matches
-            subject=subject  # Pass subject for dynamic embedding selection
-        )
-        weights = [0.95, 0.05]  # Almost exclusively use subject-specific knowledge
-    elif subject in ["legal", "history"]:
-        # These subjects need higher precision
-        retriever_1 = get_vector_store(
-            collection_name=f"{subject}",
-            embeddings=None,  # This will be filled in by the caller
-            search_limit=20,  # More results for complex topics
-            score_threshold=0.65,  # Lower threshold to get more context
-            subject=subject  # Pass subject for dynamic embedding selection
-        )
-        retriever_2 = get_vector_store(
-            collection_name="base_knowledge",
-            embeddings=None,  # This will be filled in by the caller
-            search_limit=10,
-            score_threshold=0.75,
-            subject=subject  # Pass subject for dynamic embedding selection
-        )
-        weights = [0.8, 0.2]  # Heavily prioritize subject-specific knowledge
+    Returns:
+        str: The answer text
+    """
+    if isinstance(answer_result, dict):
+        if "answer" in answer_result:
+            if isinstance(answer_result["answer"], dict) and "content" in answer_result["answer"]:
+                answer = answer_result["answer"]["content"].strip()
+            else:
+                answer = str(answer_result["answer"]).strip()
+        else:
+            # Fallback if answer not found in expected format
+            answer = str(answer_result).strip()
     else:
-        # Standard retrieval for other subjects
-        retriever_1 = get_vector_store(
-            collection_name=f"{subject}",
-            embeddings=None,  # This will be filled in by the caller
-            search_limit=15,
-            score_threshold=0.7,
-            subject=subject  # Pass subject for dynamic embedding selection
-        )
-        retriever_2 = get_vector_store(
-            collection_name="base_knowledge",
-            embeddings=None,  # This will be filled in by the caller
-            search_limit=10,
-            score_threshold=0.8,
-            subject=subject  # Pass subject for dynamic embedding selection
-        )
-        weights = [0.7, 0.3]
-
-    # Create ensemble retriever with optimized weights
-    retriever = EnsembleRetriever(
-        retrievers=[retriever_1, retriever_2],
-        weights=weights
-    )
+        answer = str(answer_result).strip()
 
-    # Create history-aware retriever with timing
-    base_history_aware_retriever = create_history_aware_retriever(
-        model, retriever, contextualize_q_prompt
-    )
+    return answer.replace("<start>\n", "").replace("<end>\n", "")
 
-    # Wrap with timed retriever
-    timed_retriever = TimedRetriever(base_history_aware_retriever)
+def _create_timed_rag_chain(timed_retriever: TimedRetriever, question_answer_chain, prepare_documents=None):
+    """
+    Create the RAG runnable with timing for a retriever and a question-answer chain.
 
-    # Get QA prompt
-    qa_prompt = get_qa_prompt(subject)
+    Args:
+        timed_retriever (TimedRetriever): The history-aware retriever
+        question_answer_chain: The stuff-documents chain generating the answer
+        prepare_documents (callable, optional): Step applied to the documents, the question and the
+            history before generation, returns the documents and the history to generate with
 
-    # Create question-answer chain
-    question_answer_chain = create_stuff_documents_chain(model, qa_prompt)
+    Returns:
+        RunnableLambda: The runnable with sync and async implementations
+    """
+    prepare_documents = prepare_documents or (lambda documents, question, chat_history: (documents, chat_history))
 
     # Custom RAG chain with timing and optimizations
     def timed_rag_chain(inputs):
@@ -161,34 +142,15 @@ def answer_business(subject: str, question: str, user_id: str) -> str:
         # Make sure we're passing the entire inputs dict to the retriever
         # This ensures chat_history is available for the history-aware retriever
         retriever_output = timed_retriever.invoke(inputs)
-        documents = retriever_output["documents"]
+        documents, chat_history = prepare_documents(retriever_output["documents"], inputs["input"],
+                                                    inputs.get("chat_history", []))
         retrieval_time = retriever_output.get("retrieval_time", 0)
 
-        # Highly optimize for political subject - drastically limit documents to reduce context size
-        if subject == "political":
-            # For political questions, use minimal context to maximize speed
-            if hasattr(documents, "sort"):
-                try:
-                    # Try to sort by score if available and take only top 3 (reduced from 5)
-                    documents = sorted(documents, key=lambda doc: doc.metadata.get("score", 0), reverse=True)[:3]
-                except:
-                    # If sorting fails, just take the first 3 (reduced from 5)
-                    documents = documents[:3]
-            else:
-                # If documents can't be sorted, limit to first 3 (reduced from 5)
-                documents = documents[:3]
-
-            # For political questions, also truncate document content to reduce context size
-            for i, doc in enumerate(documents):
-                if hasattr(doc, "page_content") and len(doc.page_content) > 500:
-                    # Truncate long documents to 500 characters
-                    documents[i].page_content = doc.page_content[:500] + "..."
-
         # Generate answer
         generation_start = time.time()
         answer = question_answer_chain.invoke({
             "context": documents,
-            "chat_history": inputs.get("chat_history", []),
+            "chat_history": chat_history,
             "input": inputs["input"]
         })
         generation_time = time.time() - generation_start
@@ -198,47 +160,313 @@ def answer_business(subject: str, question: str, user_id: str) -> str:
             "answer": answer,
             "retrieval_time": retrieval_time,
             "generation_time": generation_time,
+            "rewrite": retriever_output.get("rewrite"),
+            "documents": documents
+        }
+
+    # Async twin of timed_rag_chain, used by ainvoke so no thread is held during retrieval or generation
+    async def atimed_rag_chain(inputs):
+        retriever_output = await timed_retriever.ainvoke(inputs)
+        documents, chat_history = prepare_documents(retriever_output["documents"], inputs["input"],
+                                                    inputs.get("chat_history", []))
+        retrieval_time = retriever_output.get("retrieval_time", 0)
+
+        generation_start = time.time()
+        answer = await question_answer_chain.ainvoke({
+            "context": documents,
+            "chat_history": chat_history,
+            "input": inputs["input"]
+        })
+        generation_time = time.time() - generation_start
+
+        return {
+            "answer": answer,
+            "retrieval_time": retrieval_time,
+            "generation_time": generation_time,
+            "rewrite": retriever_output.get("rewrite"),
             "documents": documents
         }
 
-    # Create conversational chain with message history
-    # Wrap the timed_rag_chain function with RunnableLambda to make it a proper Runnable object
-    runnable_chain = RunnableLambda(timed_rag_chain)
+    # Wrap the timed_rag_chain functions with RunnableLambda to make it a proper Runnable object
+    return RunnableLambda(timed_rag_chain, afunc=atimed_rag_chain)
+
+def _build_business_chain(subject: str) -> CompiledRagChain:
+    """
+    Build the compiled RAG chain for a subject.
+
+    Args:
+        subject (str): The subject of the chain
+
+    Returns:
+        CompiledRagChain: The compiled chain
+
+    Raises:
+        ConnectionError: If the model cannot be initialized
+    """
+    model = initialize_model()
+
+    # Retrieval parameters and context policy come from the subject profile
+    profile = subject_profiles.get(subject)
+    retriever_1 = get_retriever(
+        collection_name=f"{subject}",
+        subject=subject,  # Pass subject for dynamic embedding selection
+        **profile.subject_retrieval
+    )
+    retriever_2 = get_retriever(
+        collection_name="base_knowledge",
+        subject=subject,
+        **profile.base_retrieval
+    )
+    weights = list(profile.weights)
+
+    # Embed the question once and search both collections concurrently, fusing with the weights
+    retriever = get_fused_retriever([retriever_1, retriever_2], weights)
+
+    # Wrap with timed, history-aware retriever
+    timed_retriever = TimedRetriever(retriever, get_question_rewriter())
+
+    # Get QA prompt
+    qa_prompt = get_qa_prompt(subject)
+
+    # Create question-answer chain
+    question_answer_chain = create_stuff_documents_chain(model, qa_prompt)
+
+    def prepare_documents(documents, question, chat_history):
+        return _prepare_context(profile, qa_prompt, documents, question, chat_history)
+
+    runnable_chain = _create_timed_rag_chain(timed_retriever, question_answer_chain, prepare_documents)
 
-    conversational_rag_chain = RunnableWithMessageHistory(
+    return CompiledRagChain(
         runnable_chain,
-        get_session_history,
-        input_messages_key="input",
-        history_messages_key="chat_history",
-        output_messages_key="answer",
+        collections=[subject, "base_knowledge"],
+        retriever=timed_retriever,
+        answer_chain=question_answer_chain,
+        prepare_documents=prepare_documents,
     )
 
-    # Set timeout for LLM to prevent hanging
-    # Initialize answer_result to a default value
-    answer_result = {}
+def _get_business_chain(subject: str) -> CompiledRagChain:
+    """
+    Get the compiled chain of a subject, building it on first use.
+
+    Changed subject profile files are picked up first, which drops the stale chains.
+
+    Args:
+        subject (str): The subject of the chain
+
+    Returns:
+        CompiledRagChain: The compiled chain
+    """
+    subject_profiles.refresh()
+    return chain_registry.get_or_build(("business", subject), lambda: _build_business_chain(subject))
+
+def _get_user_chain(user_id: str) -> CompiledRagChain:
+    """
+    Get the compiled chain of a user collection, building it on first use.
+
+    Args:
+        user_id (str): The user ID
+
+    Returns:
+        CompiledRagChain: The compiled chain
+    """
+    return chain_registry.get_or_build(("user", user_id), lambda: _build_user_chain(user_id))
+
+async def _aget_ready_chain(get_chain, key: str) -> CompiledRagChain:
+    """
+    Check that Ollama is available and get a compiled chain, off the event loop.
+
+    Both can block: the health check probes Ollama when no status is cached yet, and
+    getting a chain may scan the subject profiles and build the chain with its retrievers
+    and model, which would stall every concurrent request.
+
+    Args:
+        get_chain (callable): _get_business_chain or _get_user_chain
+        key (str): The subject or user ID passed to get_chain
+
+    Returns:
+        CompiledRagChain: The compiled chain
+
+    Raises:
+        ConnectionError: If Ollama is not available
+    """
+    def ready_chain():
+        ensure_model_available()
+        return get_chain(key)
+
+    return await asyncio.to_thread(ready_chain)
+
+def _build_user_chain(user_id: str) -> CompiledRagChain:
+    """
+    Build the compiled RAG chain for a user collection.
+
+    Args:
+        user_id (str): The user ID, which is also the collection name, or the tenant in shared storage mode
+
+    Returns:
+        CompiledRagChain: The compiled chain
+
+    Raises:
+        ConnectionError: If the model cannot be initialized
+    """
+    model = initialize_model()
+
+    # Search the user's collection, or the user's tenant of the shared collection
+    collection_name, query_filter = business_search_target(user_id)
+
+    # Get retriever with optimized parameters for user-specific knowledge
+    retriever = get_retriever(
+        collection_name=collection_name,
+        search_limit=25,  # Higher limit for user-specific knowledge
+        hybrid_search_limit=10,  # Dense + lexical search needs fewer results to reach the right chunk
+        score_threshold=0.65,  # Lower threshold for user-specific knowledge to ensure more results
+        subject=None,  # Use default embeddings for user-specific knowledge
+        query_filter=query_filter,
+    )
+
+    # Wrap with timed, history-aware retriever
+    timed_retriever = TimedRetriever(retriever, get_question_rewriter())
+
+    # Get user QA prompt
+    qa_prompt = get_user_qa_prompt()
+
+    # Create question-answer chain
+    question_answer_chain = create_stuff_documents_chain(model, qa_prompt)
+
+    def prepare_documents(documents, question, chat_history):
+        return _prepare_context(None, qa_prompt, documents, question, chat_history)
+
+    runnable_chain = _create_timed_rag_chain(timed_retriever, question_answer_chain, prepare_documents)
+
+    return CompiledRagChain(
+        runnable_chain,
+        collections=[user_id],  # Invalidated per user, also when the collection is shared
+        retriever=timed_retriever,
+        answer_chain=question_answer_chain,
+        prepare_documents=prepare_documents,
+    )
+
+def _load_business_history(subject: str, user_id: str) -> dict:
+    """
+    Load the recent conversation of a user for a subject into a history store.
+
+    Args:
+        subject (str): The subject of the conversation
+        user_id (str): The user ID
+
+    Returns:
+        dict: The store mapping the user ID to its chat history
+    """
+    # Load only the last few messages instead of the entire history
+    first_message, recent_messages = load_previous_conversation(user_id, subject, f"{user_id}.txt")
+
+    store = {user_id: InMemoryChatMessageHistory()}
+    if first_message is not None and recent_messages is not None:
+        initialize_session_from_history(store[user_id], first_message, recent_messages)
+    return store
+
+class CacheLookup(NamedTuple):
+    """Result of a response cache lookup."""
+    eligible: bool
+    answer: Optional[str] = None
+    embedding: Optional[list] = None
+
+def _lookup_cached_answer(collection_name: str, question: str, chat_history, subject: Optional[str] = None) -> CacheLookup:
+    """
+    Look up a cached answer for a question.
+
+    Only questions that do not depend on the chat history are eligible, since the
+    cached answer was produced for another conversation.
+
+    Args:
+        collection_name (str): The collection the question is answered from
+        question (str): The question
+        chat_history (list): The previous messages
+        subject (str, optional): The subject used to select the embedding model
+
+    Returns:
+        CacheLookup: Whether the question is eligible, the cached answer and the question embedding
+    """
+    if not RESPONSE_CACHE_ENABLED or (chat_history and not is_self_contained(question)):
+        return CacheLookup(eligible=False)
     try:
-        answer_result = conversational_rag_chain.invoke(
-            {"input": question},
-            config={
-                "configurable": {"session_id": f"{user_id}"}
-            },
-        )
+        embedding = get_embeddings(subject).embed_query(normalize_question(question))
+    except Exception:
+        # Without an embedding only the exact tier is used
+        embedding = None
+    answer = response_cache.get(collection_name, question, embedding)
+    return CacheLookup(eligible=True, answer=answer, embedding=embedding)
+
+def _store_cached_answer(lookup: CacheLookup, collection_name: str, question: str, answer: str):
+    """
+    Store an answer in the response cache if the question was eligible.
 
-        # Process the answer
-        if isinstance(answer_result, dict):
-            if "answer" in answer_result:
-                if isinstance(answer_result["answer"], dict) and "content" in answer_result["answer"]:
-                    answer = answer_result["answer"]["content"].strip()
-                else:
-                    answer = str(answer_result["answer"]).strip()
-            else:
-                # Fallback if answer not found in expected format
-                answer = str(answer_result).strip()
-        else:
-            answer = str(answer_result).strip()
+    Args:
+        lookup (CacheLookup): The lookup made before answering
+        collection_name (str): The collection the question was answered from
+        question (str): The question
+        answer (str): The answer
+    """
+    if lookup.eligible and answer:
+        response_cache.put(collection_name, question, answer, lookup.embedding)
 
-        answer = answer.replace("<start>\n", "").replace("<end>\n", "")
+def _answer_output(answer: str, rewrite: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the output of the non-streaming answer functions.
+
+    Args:
+        answer (str): The answer or an error message
+        rewrite (str, optional): How the question was rewritten, None if no chain ran
+
+    Returns:
+        Dict[str, Any]: The answer with the rewrite status and the running rewrite counters,
+            as the "done" event of the streaming path carries them
+    """
+    return {"answer": answer, "rewrite": rewrite, "rewrite_stats": get_question_rewriter().stats()}
+
+def answer_business(subject: str, question: str, user_id: str) -> Dict[str, Any]:
+    """
+    Answer a business-related question.
+
+    Args:
+        subject (str): The subject of the question
+        question (str): The question to answer
+        user_id (str): The user ID
+
+    Returns:
+        Dict[str, Any]: The answer or an error message if something goes wrong, with how the
+            question was rewritten and the rewrite counters
+    """
+    store = _load_business_history(subject, user_id)
+
+    # Repeated standalone questions are answered from the response cache
+    lookup = _lookup_cached_answer(subject, question, store[user_id].messages, subject)
+    if lookup.answer is not None:
+        store[user_id].add_user_message(question)
+        store[user_id].add_ai_message(lookup.answer)
         update_conversation(store, subject, file_path=f"{user_id}.txt")
+        return _answer_output(lookup.answer)
+
+    try:
+        # Fail fast if the health monitor last saw Ollama down
+        ensure_model_available()
+
+        # Reuse the compiled chain for this subject, building it on first use
+        compiled_chain = _get_business_chain(subject)
+    except ConnectionError as e:
+        # Return a user-friendly error message
+        return _answer_output(f"Error: {str(e)}")
+    except Exception as e:
+        # Return a generic error message for other exceptions
+        return _answer_output(f"An unexpected error occurred: {str(e)}")
+
+    rewrite = None
+    try:
+        answer_result = compiled_chain.invoke(question, store[user_id])
+        rewrite = answer_result.get("rewrite")
+
+        answer = _extract_answer(answer_result)
+        update_conversation(store, subject, file_path=f"{user_id}.txt")
+        _store_cached_answer(lookup, subject, question, answer)
     except httpx.ConnectError as e:
         # Return a user-friendly error message for connection errors
         answer = f"Error: Could not connect to Ollama service. Is Ollama running? Details: {str(e)}"
@@ -246,9 +474,9 @@ def answer_business(subject: str, question: str, user_id: str) -> str:
         # Return a generic error message for other exceptions
         answer = f"An unexpected error occurred while processing your question: {str(e)}"
 
-    return answer
+    return _answer_output(answer, rewrite)
 
-def answer_user(question: str, user_id: str) -> str:
+def answer_user(question: str, user_id: str) -> Dict[str, Any]:
     """
     Answer a user-specific question.
 
@@ -257,80 +485,315 @@ def answer_user(question: str, user_id: str) -> str:
         user_id (str): The user ID
 
     Returns:
-        str: The answer or an error message if something goes wrong
+        Dict[str, Any]: The answer or an error message if something goes wrong, with how the
+            question was rewritten and the rewrite counters
     """
+    # The user chat is stateless, so every question is eligible for the response cache
+    lookup = _lookup_cached_answer(user_id, question, [])
+    if lookup.answer is not None:
+        return _answer_output(lookup.answer)
+
     try:
-        # Initialize model
-        model = initialize_model()
+        # Fail fast if the health monitor last saw Ollama down
+        ensure_model_available()
+
+        # Reuse the compiled chain for this user collection, building it on first use
+        compiled_chain = _get_user_chain(user_id)
     except ConnectionError as e:
         # Return a user-friendly error message
-        return f"Error: {str(e)}"
+        return _answer_output(f"Error: {str(e)}")
     except Exception as e:
         # Return a generic error message for other exceptions
-        return f"An unexpected error occurred: {str(e)}"
+        return _answer_output(f"An unexpected error occurred: {str(e)}")
 
-    # Create temp uuid 
-    session_id = str(uuid.uuid4())
+    # Invoke the chain with a fresh history, the user chat is stateless
+    rewrite = None
+    try:
+        answer_result = compiled_chain.invoke(question, InMemoryChatMessageHistory())
+        rewrite = answer_result.get("rewrite")
 
-    # Store chat history 
-    store = {}
+        # Process the answer
+        answer = answer_result["answer"].strip()
+        _store_cached_answer(lookup, user_id, question, answer)
+    except httpx.ConnectError as e:
+        # Return a user-friendly error message for connection errors
+        answer = f"Error: Could not connect to Ollama service. Is Ollama running? Details: {str(e)}"
+    except Exception as e:
+        # Return a generic error message for other exceptions
+        answer = f"An unexpected error occurred while processing your question: {str(e)}"
 
-    def get_session_history(session_id: str) -> BaseChatMessageHistory:
-        if session_id not in store:
-            store[session_id] = InMemoryChatMessageHistory()
-        return store[session_id]
+    return _answer_output(answer, rewrite)
 
-    # Get contextualize question prompt
-    contextualize_q_prompt = get_contextualize_q_prompt()
+async def aanswer_business(subject: str, question: str, user_id: str) -> Dict[str, Any]:
+    """
+    Answer a business-related question without blocking the event loop.
 
-    # Get retriever with optimized parameters for user-specific knowledge
-    retriever = get_vector_store(
-        collection_name=user_id,
-        embeddings=None,  # This will be filled in by the caller
-        search_limit=25,  # Higher limit for user-specific knowledge
-        score_threshold=0.65,  # Lower threshold for user-specific knowledge to ensure more results
-        subject=None  # Use default embeddings for user-specific knowledge
-    )
+    Async counterpart of answer_business built on the chain ainvoke API.
 
-    # Create history-aware retriever
-    history_aware_retriever = create_history_aware_retriever(
-        model, retriever, contextualize_q_prompt
-    )
+    Args:
+        subject (str): The subject of the question
+        question (str): The question to answer
+        user_id (str): The user ID
 
-    # Get user QA prompt
-    qa_prompt = get_user_qa_prompt()
+    Returns:
+        Dict[str, Any]: The answer or an error message if something goes wrong, with how the
+            question was rewritten and the rewrite counters
+    """
+    # History files are small, read them off the event loop anyway
+    store = await asyncio.to_thread(_load_business_history, subject, user_id)
 
-    # Create question-answer chain
-    question_answer_chain = create_stuff_documents_chain(model, qa_prompt)
+    # Embedding the question and reading the cache files stay off the event loop too
+    lookup = await asyncio.to_thread(_lookup_cached_answer, subject, question, store[user_id].messages, subject)
+    if lookup.answer is not None:
+        store[user_id].add_user_message(question)
+        store[user_id].add_ai_message(lookup.answer)
+        await asyncio.to_thread(update_conversation, store, subject, f"{user_id}.txt")
+        return _answer_output(lookup.answer)
 
-    # Create retrieval chain
-    rag_chain = create_retrieval_chain(history_aware_retriever, question_answer_chain)
+    try:
+        # Fail fast if the health monitor last saw Ollama down, then reuse or build the chain
+        compiled_chain = await _aget_ready_chain(_get_business_chain, subject)
+    except ConnectionError as e:
+        return _answer_output(f"Error: {str(e)}")
+    except Exception as e:
+        return _answer_output(f"An unexpected error occurred: {str(e)}")
 
-    # Create conversational chain with message history
-    conversational_rag_chain = RunnableWithMessageHistory(
-        rag_chain,
-        get_session_history,
-        input_messages_key="input",
-        history_messages_key="chat_history",
-        output_messages_key="answer",
-    )
+    rewrite = None
+    try:
+        answer_result = await compiled_chain.ainvoke(question, store[user_id])
+        rewrite = answer_result.get("rewrite")
+
+        answer = _extract_answer(answer_result)
+        await asyncio.to_thread(update_conversation, store, subject, f"{user_id}.txt")
+        await asyncio.to_thread(_store_cached_answer, lookup, subject, question, answer)
+    except httpx.ConnectError as e:
+        answer = f"Error: Could not connect to Ollama service. Is Ollama running? Details: {str(e)}"
+    except Exception as e:
+        answer = f"An unexpected error occurred while processing your question: {str(e)}"
+
+    return _answer_output(answer, rewrite)
+
+async def aanswer_user(question: str, user_id: str) -> Dict[str, Any]:
+    """
+    Answer a user-specific question without blocking the event loop.
+
+    Async counterpart of answer_user built on the chain ainvoke API.
+
+    Args:
+        question (str): The question to answer
+        user_id (str): The user ID
+
+    Returns:
+        Dict[str, Any]: The answer or an error message if something goes wrong, with how the
+            question was rewritten and the rewrite counters
+    """
+    lookup = await asyncio.to_thread(_lookup_cached_answer, user_id, question, [])
+    if lookup.answer is not None:
+        return _answer_output(lookup.answer)
 
-    # Invoke the chain
     try:
-        answer_result = conversational_rag_chain.invoke(
-            {"input": question},
-            config={
-                "configurable": {"session_id": f"{session_id}"}
-            },
-        )
+        # Fail fast if the health monitor last saw Ollama down, then reuse or build the chain
+        compiled_chain = await _aget_ready_chain(_get_user_chain, user_id)
+    except ConnectionError as e:
+        return _answer_output(f"Error: {str(e)}")
+    except Exception as e:
+        return _answer_output(f"An unexpected error occurred: {str(e)}")
+
+    rewrite = None
+    try:
+        answer_result = await compiled_chain.ainvoke(question, InMemoryChatMessageHistory())
+        rewrite = answer_result.get("rewrite")
 
-        # Process the answer
         answer = answer_result["answer"].strip()
+        await asyncio.to_thread(_store_cached_answer, lookup, user_id, question, answer)
     except httpx.ConnectError as e:
-        # Return a user-friendly error message for connection errors
         answer = f"Error: Could not connect to Ollama service. Is Ollama running? Details: {str(e)}"
     except Exception as e:
-        # Return a generic error message for other exceptions
         answer = f"An unexpected error occurred while processing your question: {str(e)}"
 
-    return answer
+    return _answer_output(answer, rewrite)
+
+def _get_sources(documents) -> list:
+    """
+    Summarize the documents used as context.
+
+    Args:
+        documents: The context documents
+
+    Returns:
+        list: One entry per distinct source with its best score
+    """
+    sources = {}
+    for doc in documents:
+        source = doc.metadata.get("source")
+        score = doc.metadata.get("score")
+        if source not in sources or (score is not None and score > (sources[source] or 0)):
+            sources[source] = score
+    return [{"source": source, "score": score} for source, score in sources.items()]
+
+async def _astream_answer(compiled_chain: CompiledRagChain, question: str, history):
+    """
+    Retrieve context then stream the answer tokens of a compiled chain.
+
+    Args:
+        compiled_chain (CompiledRagChain): The compiled chain
+        question (str): The question to answer
+        history (BaseChatMessageHistory): The chat history, the new turn is appended to it
+
+    Yields:
+        dict: "token" events while generating, a "replace" event if the formatted answer
+            replaces the streamed text, then a "done" event with timings and sources
+    """
+    chat_history = list(history.messages)
+    retriever_output = await compiled_chain.retriever.ainvoke({"input": question, "chat_history": chat_history})
+    documents, context_history = compiled_chain.prepare_documents(retriever_output["documents"], question, chat_history)
+    retrieval_time = retriever_output.get("retrieval_time", 0)
+
+    formatter = StreamingAnswerFormatter()
+    raw_answer = []
+    generation_start = time.time()
+    async for chunk in compiled_chain.answer_chain.astream({
+        "context": documents,
+        "chat_history": context_history,
+        "input": question
+    }):
+        raw_answer.append(chunk)
+        text = formatter.feed(chunk)
+        if text:
+            yield {"type": "token", "content": text}
+    text = formatter.finish()
+    if text:
+        yield {"type": "token", "content": text}
+    elif formatter.replaced:
+        # A value was extracted from JSON after a preamble, the streamed text is not the answer
+        yield {"type": "replace", "content": formatter.message}
+    generation_time = time.time() - generation_start
+
+    # Record the turn like RunnableWithMessageHistory does on the non-streaming path
+    history.add_user_message(question)
+    history.add_ai_message("".join(raw_answer))
+
+    yield {
+        "type": "done",
+        "retrieval_time": retrieval_time,
+        "generation_time": generation_time,
+        "rewrite": retriever_output.get("rewrite"),
+        "rewrite_stats": compiled_chain.retriever.rewriter.stats(),
+        "sources": _get_sources(documents),
+    }
+
+def _cached_answer_events(answer: str):
+    """
+    Replay a cached answer as stream events.
+
+    Args:
+        answer (str): The cached answer
+
+    Returns:
+        list: One "token" event with the whole answer and a "done" event
+    """
+    return [
+        {"type": "token", "content": answer},
+        {
+            "type": "done",
+            "retrieval_time": 0,
+            "generation_time": 0,
+            "rewrite": None,
+            "cache": "hit",
+            "cache_stats": response_cache.stats(),
+            "sources": [],
+        },
+    ]
+
+async def astream_business(subject: str, question: str, user_id: str):
+    """
+    Stream the answer to a business-related question.
+
+    Args:
+        subject (str): The subject of the question
+        question (str): The question to answer
+        user_id (str): The user ID
+
+    Yields:
+        dict: "token" events, a "replace" event if the formatted answer replaces them, then a
+            "done" event, or an "error" event if something goes wrong
+    """
+    store = await asyncio.to_thread(_load_business_history, subject, user_id)
+
+    lookup = await asyncio.to_thread(_lookup_cached_answer, subject, question, store[user_id].messages, subject)
+    if lookup.answer is not None:
+        store[user_id].add_user_message(question)
+        store[user_id].add_ai_message(lookup.answer)
+        await asyncio.to_thread(update_conversation, store, subject, f"{user_id}.txt")
+        for event in _cached_answer_events(lookup.answer):
+            yield event
+        return
+
+    try:
+        compiled_chain = await _aget_ready_chain(_get_business_chain, subject)
+    except ConnectionError as e:
+        yield {"type": "error", "message": f"Error: {str(e)}"}
+        return
+    except Exception as e:
+        yield {"type": "error", "message": f"An unexpected error occurred: {str(e)}"}
+        return
+
+    try:
+        answer = []
+        async for event in _astream_answer(compiled_chain, question, store[user_id]):
+            if event["type"] == "token":
+                answer.append(event["content"])
+            elif event["type"] == "replace":
+                answer = [event["content"]]
+            elif event["type"] == "done":
+                await asyncio.to_thread(update_conversation, store, subject, f"{user_id}.txt")
+                await asyncio.to_thread(_store_cached_answer, lookup, subject, question, "".join(answer))
+                event["cache"] = "miss" if lookup.eligible else "skipped"
+            yield event
+    except httpx.ConnectError as e:
+        yield {"type": "error", "message": f"Error: Could not connect to Ollama service. Is Ollama running? Details: {str(e)}"}
+    except Exception as e:
+        yield {"type": "error", "message": f"An unexpected error occurred while processing your question: {str(e)}"}
+
+async def astream_user(question: str, user_id: str):
+    """
+    Stream the answer to a user-specific question.
+
+    Args:
+        question (str): The question to answer
+        user_id (str): The user ID
+
+    Yields:
+        dict: "token" events, a "replace" event if the formatted answer replaces them, then a
+            "done" event, or an "error" event if something goes wrong
+    """
+    lookup = await asyncio.to_thread(_lookup_cached_answer, user_id, question, [])
+    if lookup.answer is not None:
+        for event in _cached_answer_events(lookup.answer):
+            yield event
+        return
+
+    try:
+        compiled_chain = await _aget_ready_chain(_get_user_chain, user_id)
+    except ConnectionError as e:
+        yield {"type": "error", "message": f"Error: {str(e)}"}
+        return
+    except Exception as e:
+        yield {"type": "error", "message": f"An unexpected error occurred: {str(e)}"}
+        return
+
+    try:
+        answer = []
+        async for event in _astream_answer(compiled_chain, question, InMemoryChatMessageHistory()):
+            if event["type"] == "token":
+                answer.append(event["content"])
+            elif event["type"] == "replace":
+                answer = [event["content"]]
+            elif event["type"] == "done":
+                await asyncio.to_thread(_store_cached_answer, lookup, user_id, question, "".join(answer))
+                event["cache"] = "miss"
+            yield event
+    except httpx.ConnectError as e:
+        yield {"type": "error", "message": f"Error: Could not connect to Ollama service. Is Ollama running? Details: {str(e)}"}
+    except Exception as e:
+        yield {"type": "error", "message": f"An unexpected error occurred while processing your question: {str(e)}"}
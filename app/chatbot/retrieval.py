@@ -0,0 +1,402 @@
+"""
+Retrieval module.
+This module provides Qdrant retrievers with native sync and async search for the RAG chains.
+"""
+import asyncio
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import Filter, Fusion, FusionQuery, Prefetch, SparseVector
+
+from app.config.settings import HYBRID_SEARCH_ENABLED, QDRANT_URL, QUERY_EMBEDDING_CACHE_SIZE, \
+    RETRIEVAL_SEARCH_TIMEOUT
+from app.utils.embedding_cache import CachedQueryEmbeddings
+from app.utils.lexical import LEXICAL_VECTOR_NAME, ahas_lexical_vectors, has_lexical_vectors, query_lexical_vector
+from app.utils.storage_profiles import collection_search_params
+
+# Embedding models by subject, None holds the default model
+_embeddings: Dict[Optional[str], Embeddings] = {}
+
+# Shared Qdrant clients, created lazily
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+# Sync clients that give up on Qdrant after a number of seconds, used by searches with a deadline
+_deadline_clients: Dict[int, QdrantClient] = {}
+
+# Sync answers run in the FastAPI threadpool, 40 threads by default, and each chain fuses
+# the subject and base_knowledge searches. One search thread per search of every request
+# thread keeps searches from queueing behind others and missing a deadline they never ran for.
+REQUEST_THREADS = 40
+RETRIEVERS_PER_CHAIN = 2
+SEARCH_WORKERS = REQUEST_THREADS * RETRIEVERS_PER_CHAIN
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="qdrant-search")
+
+# Rank constant of reciprocal rank fusion, the value EnsembleRetriever uses
+RRF_C = 60
+
+# Candidates of each of the dense and lexical searches per result of a hybrid search
+HYBRID_PREFETCH_FACTOR = 2
+
+# Whether each collection stores lexical vectors, looked up on its first search
+_lexical_collections: Dict[str, bool] = {}
+
+
+def register_embeddings(embeddings: Embeddings, subject: Optional[str] = None):
+    """
+    Register the embedding model used to embed queries.
+
+    Query embeddings are served from the shared query embedding cache, keyed by the
+    model, so subjects with different models never share vectors.
+
+    Args:
+        embeddings (Embeddings): The embedding model
+        subject (str, optional): The subject the model is dedicated to, None for the default model
+    """
+    if QUERY_EMBEDDING_CACHE_SIZE > 0 and not isinstance(embeddings, CachedQueryEmbeddings):
+        embeddings = CachedQueryEmbeddings(embeddings)
+    _embeddings[subject] = embeddings
+
+def get_embeddings(subject: Optional[str] = None) -> Embeddings:
+    """
+    Get the embedding model for a subject, falling back to the default model.
+
+    Args:
+        subject (str, optional): The subject of the query
+
+    Returns:
+        Embeddings: The embedding model
+
+    Raises:
+        RuntimeError: If no embedding model has been registered
+    """
+    embeddings = _embeddings.get(subject) or _embeddings.get(None)
+    if embeddings is None:
+        raise RuntimeError("No embedding model registered. Call register_embeddings() at startup.")
+    return embeddings
+
+def get_client() -> QdrantClient:
+    """Get the shared synchronous Qdrant client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = QdrantClient(url=QDRANT_URL)
+    return _client
+
+def get_deadline_client(timeout: float) -> QdrantClient:
+    """
+    Get a shared synchronous Qdrant client that stops waiting for Qdrant after a timeout.
+
+    The search timeout sent to Qdrant does not stop the request on the client side, so a
+    search of a slow collection would hold its search thread long after its deadline.
+
+    Args:
+        timeout (float): The deadline of the searches in seconds
+
+    Returns:
+        QdrantClient: The client
+    """
+    # Whole seconds, with one more so the caller sees its own deadline pass first
+    seconds = math.ceil(timeout) + 1
+    if seconds not in _deadline_clients:
+        with _client_lock:
+            if seconds not in _deadline_clients:
+                _deadline_clients[seconds] = QdrantClient(url=QDRANT_URL, timeout=seconds)
+    return _deadline_clients[seconds]
+
+def get_async_client() -> AsyncQdrantClient:
+    """Get the shared asynchronous Qdrant client."""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncQdrantClient(url=QDRANT_URL)
+    return _async_client
+
+def points_to_documents(points) -> List[Document]:
+    """
+    Convert scored Qdrant points to documents, keeping the score in the metadata.
+
+    Args:
+        points: The scored points returned by a query
+
+    Returns:
+        List[Document]: The documents
+    """
+    documents = []
+    for point in points:
+        payload = point.payload or {}
+        metadata = dict(payload.get("metadata") or {})
+        metadata["score"] = point.score
+        metadata["_collection_point_id"] = point.id
+        documents.append(Document(page_content=payload.get("page_content", ""), metadata=metadata))
+    return documents
+
+
+def is_hybrid_collection(collection_name: str) -> bool:
+    """
+    Check whether a collection is searched dense + lexical.
+
+    Args:
+        collection_name (str): The collection
+
+    Returns:
+        bool: True if hybrid search is enabled and the collection stores lexical vectors
+    """
+    if not HYBRID_SEARCH_ENABLED:
+        return False
+    if collection_name not in _lexical_collections:
+        _lexical_collections[collection_name] = has_lexical_vectors(get_client(), collection_name)
+    return _lexical_collections[collection_name]
+
+def invalidate_collection_info(collection_name: str):
+    """
+    Forget what was looked up about a collection, after it is created, rebuilt or deleted.
+
+    Args:
+        collection_name (str): The collection
+    """
+    _lexical_collections.pop(collection_name, None)
+
+async def ais_hybrid_collection(collection_name: str) -> bool:
+    """Async counterpart of is_hybrid_collection."""
+    if not HYBRID_SEARCH_ENABLED:
+        return False
+    if collection_name not in _lexical_collections:
+        _lexical_collections[collection_name] = await ahas_lexical_vectors(get_async_client(), collection_name)
+    return _lexical_collections[collection_name]
+
+
+class QdrantRetriever(BaseRetriever):
+    """
+    Retriever over one Qdrant collection with a native async search path.
+
+    Collections with lexical vectors are searched dense + lexical in one query: Qdrant
+    runs both searches and fuses them with reciprocal rank fusion, so exact identifiers
+    such as "146/2018/NĐ-CP" rank high even when the dense vectors miss them.
+    """
+    collection_name: str
+    search_limit: int = 10
+    hybrid_search_limit: Optional[int] = None
+    score_threshold: Optional[float] = None
+    subject: Optional[str] = None
+    vector_name: str = "content"
+    query_filter: Optional[Filter] = None
+
+    def _query_kwargs(self, query_vector: List[float], lexical_vector: Optional[SparseVector] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        kwargs = {
+            "collection_name": self.collection_name,
+            "query": query_vector,
+            "using": self.vector_name,
+            "limit": self.search_limit,
+            "score_threshold": self.score_threshold,
+            "query_filter": self.query_filter,
+            # Oversampling and rescoring for collections with quantized vectors
+            "search_params": collection_search_params(self.collection_name),
+            "with_payload": True,
+            # Qdrant takes whole seconds, the caller enforces the exact deadline
+            "timeout": math.ceil(timeout) if timeout else None,
+        }
+        if lexical_vector is None:
+            return kwargs
+
+        limit = self.hybrid_search_limit or self.search_limit
+        prefetch_limit = limit * HYBRID_PREFETCH_FACTOR
+        # The threshold applies to the dense similarity, fused scores are ranks
+        kwargs.update({
+            "prefetch": [
+                Prefetch(query=query_vector, using=self.vector_name, limit=prefetch_limit,
+                         score_threshold=self.score_threshold, filter=self.query_filter,
+                         params=kwargs["search_params"]),
+                Prefetch(query=lexical_vector, using=LEXICAL_VECTOR_NAME, limit=prefetch_limit,
+                         filter=self.query_filter),
+            ],
+            "query": FusionQuery(fusion=Fusion.RRF),
+            "using": None,
+            "limit": limit,
+            "score_threshold": None,
+            "search_params": None,
+        })
+        return kwargs
+
+    def search(self, query_vector: List[float], timeout: Optional[float] = None,
+               lexical_vector: Optional[SparseVector] = None) -> List[Document]:
+        """
+        Search the collection with an embedded query.
+
+        Args:
+            query_vector (List[float]): The query embedding
+            timeout (float, optional): Seconds Qdrant may spend on the search, the client also stops
+                waiting after them
+            lexical_vector (SparseVector, optional): The lexical vector of the query, used if the
+                collection stores lexical vectors
+
+        Returns:
+            List[Document]: The documents found
+        """
+        if lexical_vector is not None and not is_hybrid_collection(self.collection_name):
+            lexical_vector = None
+        # With a deadline the client gives up too, so a slow collection frees the search thread
+        client = get_deadline_client(timeout) if timeout else get_client()
+        response = client.query_points(**self._query_kwargs(query_vector, lexical_vector, timeout))
+        return points_to_documents(response.points)
+
+    async def asearch(self, query_vector: List[float], timeout: Optional[float] = None,
+                      lexical_vector: Optional[SparseVector] = None) -> List[Document]:
+        """Async counterpart of search."""
+        if lexical_vector is not None and not await ais_hybrid_collection(self.collection_name):
+            lexical_vector = None
+        response = await get_async_client().query_points(**self._query_kwargs(query_vector, lexical_vector, timeout))
+        return points_to_documents(response.points)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.search(get_embeddings(self.subject).embed_query(query), lexical_vector=query_lexical_vector(query))
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        query_vector = await get_embeddings(self.subject).aembed_query(query)
+        return await self.asearch(query_vector, lexical_vector=query_lexical_vector(query))
+
+
+def weighted_reciprocal_rank(result_lists: List[List[Document]], weights: List[float], c: int = RRF_C) -> List[Document]:
+    """
+    Merge ranked document lists with weighted reciprocal rank fusion.
+
+    Each document scores the sum of weight / (rank + c) over the lists it appears in,
+    documents with the same content are merged, as EnsembleRetriever does.
+
+    Args:
+        result_lists (List[List[Document]]): The ranked results of each search
+        weights (List[float]): The weight of each search
+        c (int): The rank constant
+
+    Returns:
+        List[Document]: The documents by decreasing fused score
+    """
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for results, weight in zip(result_lists, weights):
+        for rank, document in enumerate(results, start=1):
+            key = document.page_content
+            scores[key] = scores.get(key, 0.0) + weight / (rank + c)
+            # The first list wins on duplicates, it holds the highest weighted collection
+            documents.setdefault(key, document)
+    return [documents[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+class FusedRetriever(BaseRetriever):
+    """
+    Retriever over several Qdrant collections that embeds the query once.
+
+    The searches run concurrently and their results are merged with weighted reciprocal
+    rank fusion. Each search has a deadline: a collection that has not answered in time
+    is left out, so a slow collection gives partial results instead of stalling the request.
+    If no collection answers in time the retrieval fails rather than answer without context.
+    """
+    retrievers: List[QdrantRetriever]
+    weights: List[float]
+    c: int = RRF_C
+    search_timeout: float = RETRIEVAL_SEARCH_TIMEOUT
+
+    def _embeddings(self) -> Embeddings:
+        # The retrievers of a chain share the subject, and so the model
+        return get_embeddings(self.retrievers[0].subject)
+
+    def _report_timeouts(self, timed_out: List[QdrantRetriever]):
+        """Warn about the collections left out, or raise TimeoutError if every search timed out."""
+        if timed_out and len(timed_out) == len(self.retrievers):
+            names = ", ".join(f"'{retriever.collection_name}'" for retriever in timed_out)
+            raise TimeoutError(f"Searches of collections {names} exceeded {self.search_timeout}s")
+        for retriever in timed_out:
+            print(f"⚠️ Search of collection '{retriever.collection_name}' exceeded {self.search_timeout}s, "
+                  f"answering without it")
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        query_vector = self._embeddings().embed_query(query)
+        lexical_vector = query_lexical_vector(query)
+        futures = [_search_executor.submit(retriever.search, query_vector, self.search_timeout, lexical_vector)
+                   for retriever in self.retrievers]
+        wait(futures, timeout=self.search_timeout)
+        results = []
+        timed_out = []
+        for retriever, future in zip(self.retrievers, futures):
+            if future.done():
+                # A failed search raises like a single retriever would
+                results.append(future.result())
+            else:
+                # Drop a search still queued behind busy threads, a running one ends at the client timeout
+                future.cancel()
+                timed_out.append(retriever)
+                results.append([])
+        self._report_timeouts(timed_out)
+        return weighted_reciprocal_rank(results, self.weights, self.c)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        query_vector = await self._embeddings().aembed_query(query)
+        lexical_vector = query_lexical_vector(query)
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(retriever.asearch(query_vector, self.search_timeout, lexical_vector), self.search_timeout)
+              for retriever in self.retrievers),
+            return_exceptions=True,
+        )
+        results = []
+        timed_out = []
+        for retriever, outcome in zip(self.retrievers, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                timed_out.append(retriever)
+                results.append([])
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results.append(outcome)
+        self._report_timeouts(timed_out)
+        return weighted_reciprocal_rank(results, self.weights, self.c)
+
+def get_fused_retriever(retrievers: List[QdrantRetriever], weights: List[float]) -> FusedRetriever:
+    """
+    Get a retriever that searches several collections with one query embedding.
+
+    Args:
+        retrievers (List[QdrantRetriever]): The retrievers of each collection, sharing a subject
+        weights (List[float]): The weight of each collection in the fusion
+
+    Returns:
+        FusedRetriever: The retriever
+    """
+    return FusedRetriever(retrievers=retrievers, weights=weights)
+
+def get_retriever(collection_name: str, search_limit: int = 10, score_threshold: Optional[float] = None,
+                  subject: Optional[str] = None, query_filter: Optional[Filter] = None,
+                  hybrid_search_limit: Optional[int] = None) -> QdrantRetriever:
+    """
+    Get a retriever over a Qdrant collection.
+
+    Args:
+        collection_name (str): The collection to search
+        search_limit (int): The maximum number of documents to return
+        score_threshold (float, optional): The minimum similarity score
+        subject (str, optional): The subject used to select the embedding model
+        query_filter (Filter, optional): A payload filter applied to every search, e.g. a tenant filter
+        hybrid_search_limit (int, optional): The maximum number of documents when the collection is
+            searched dense + lexical, search_limit if not set
+
+    Returns:
+        QdrantRetriever: The retriever
+    """
+    return QdrantRetriever(
+        collection_name=collection_name,
+        search_limit=search_limit,
+        hybrid_search_limit=hybrid_search_limit,
+        score_threshold=score_threshold,
+        subject=subject,
+        query_filter=query_filter,
+    )
@@ -0,0 +1,204 @@
+"""
+Subject profiles module.
+This module loads the prompt, retrieval parameters and context policy of each subject from the subject_profiles/ folder and reloads them when the files change.
+"""
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.config.settings import SUBJECT_PROFILES_FOLDER, SUBJECT_PROFILES_RELOAD_INTERVAL
+
+# Profile every subject file is merged over, it is not a subject itself
+DEFAULT_PROFILE = "default"
+
+# get_retriever arguments a profile may set for each collection
+RETRIEVAL_KEYS = {"search_limit", "hybrid_search_limit", "score_threshold"}
+CONTEXT_KEYS = {"token_budget", "max_documents", "max_document_tokens"}
+
+
+class SubjectProfile(NamedTuple):
+    """How questions of a subject are answered."""
+    name: str
+    display_name: str
+    prompt: str  # The subject part of the QA system prompt
+    subject_retrieval: Dict[str, float]  # get_retriever arguments for the subject collection
+    base_retrieval: Dict[str, float]  # get_retriever arguments for base_knowledge
+    weights: Tuple[float, float]  # Weights of the subject collection and base_knowledge in the fusion
+    context_token_budget: Optional[int] = None  # None uses CONTEXT_TOKEN_BUDGET
+    max_documents: Optional[int] = None  # Documents kept in the context, None keeps what fits
+    max_document_tokens: Optional[int] = None  # Longer documents are cut, None keeps them whole
+
+
+def _merge(default: dict, profile: dict) -> dict:
+    # Sections are merged key by key, the per-collection retrieval settings are replaced whole
+    merged = {**default, **profile}
+    for section in ("retrieval", "context"):
+        merged[section] = {**(default.get(section) or {}), **(profile.get(section) or {})}
+    return merged
+
+def _check_keys(name: str, section: str, values: dict, allowed: set):
+    unknown = set(values) - allowed
+    if unknown:
+        raise ValueError(f"Subject profile '{name}': unknown {section} settings {', '.join(sorted(unknown))}")
+
+def _read_text(folder: str, file_name: Optional[str]) -> str:
+    if not file_name:
+        return ""
+    with open(os.path.join(folder, file_name), "r", encoding="utf-8") as file:
+        return file.read()
+
+def build_profile(name: str, data: dict, folder: str) -> SubjectProfile:
+    """
+    Build a subject profile from its merged settings.
+
+    The prompt is the text of prompt_file followed by the text of instructions_file,
+    where {subject_name} is replaced by the upper-cased display name.
+
+    Args:
+        name (str): The subject
+        data (dict): The settings, merged over the default profile
+        folder (str): The folder of the prompt files
+
+    Returns:
+        SubjectProfile: The profile
+
+    Raises:
+        ValueError: If a setting is unknown or missing
+    """
+    retrieval = data.get("retrieval") or {}
+    context = data.get("context") or {}
+    subject_retrieval = dict(retrieval.get("subject") or {})
+    base_retrieval = dict(retrieval.get("base_knowledge") or {})
+    _check_keys(name, "retrieval", subject_retrieval, RETRIEVAL_KEYS)
+    _check_keys(name, "retrieval", base_retrieval, RETRIEVAL_KEYS)
+    _check_keys(name, "context", context, CONTEXT_KEYS)
+    weights = tuple(retrieval.get("weights") or ())
+    if len(weights) != 2:
+        raise ValueError(f"Subject profile '{name}': expected 2 retrieval weights, got {len(weights)}")
+
+    display_name = data.get("display_name") or name
+    instructions = _read_text(folder, data.get("instructions_file"))
+    prompt = _read_text(folder, data.get("prompt_file")) + instructions.replace("{subject_name}", display_name.upper())
+    return SubjectProfile(
+        name=name,
+        display_name=display_name,
+        prompt=prompt,
+        subject_retrieval=subject_retrieval,
+        base_retrieval=base_retrieval,
+        weights=weights,
+        context_token_budget=context.get("token_budget"),
+        max_documents=context.get("max_documents"),
+        max_document_tokens=context.get("max_document_tokens"),
+    )
+
+
+class SubjectProfileRegistry:
+    """
+    The subject profiles of a folder, reloaded when its files change.
+
+    Every <subject>.json is merged over default.json. The folder is checked at most
+    every reload_interval seconds, on the next lookup; when a file changed, all profiles
+    are loaded again and the listeners are called with the subjects whose profile
+    differs. A folder that fails to load keeps the previous profiles.
+    """
+    def __init__(self, folder: str = SUBJECT_PROFILES_FOLDER, reload_interval: float = SUBJECT_PROFILES_RELOAD_INTERVAL):
+        self.folder = folder
+        self.reload_interval = reload_interval
+        self._profiles: Dict[str, SubjectProfile] = {}
+        self._signature = None
+        self._checked_at = 0.0
+        self._listeners: List[Callable[[List[str]], None]] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[List[str]], None]):
+        """
+        Register a callable receiving the names of the subjects changed by a reload.
+
+        Args:
+            listener (callable): Called with the list of changed subjects
+        """
+        self._listeners.append(listener)
+
+    def _folder_signature(self):
+        with os.scandir(self.folder) as entries:
+            return frozenset((entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                             for entry in entries if entry.is_file())
+
+    def _load(self) -> Dict[str, SubjectProfile]:
+        raw = {}
+        for file_name in sorted(os.listdir(self.folder)):
+            if file_name.endswith(".json"):
+                with open(os.path.join(self.folder, file_name), "r", encoding="utf-8") as file:
+                    raw[file_name[:-len(".json")]] = json.load(file)
+        default = raw.pop(DEFAULT_PROFILE, {})
+        return {name: build_profile(name, _merge(default, data), self.folder) for name, data in raw.items()}
+
+    def reload(self, force: bool = False) -> List[str]:
+        """
+        Load the profiles again if a file of the folder changed.
+
+        Args:
+            force (bool): Load even if no file changed
+
+        Returns:
+            List[str]: The subjects whose profile was added, changed or removed
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            signature = self._folder_signature()
+            if signature == self._signature and not force:
+                return []
+            try:
+                profiles = self._load()
+            except Exception as e:
+                if not self._profiles:
+                    raise
+                print(f"⚠️ Could not reload subject profiles from {self.folder}, keeping the current ones: {e}")
+                # Retried on the next change of the files, not on every check
+                self._signature = signature
+                return []
+            first_load = self._signature is None
+            changed = sorted(name for name in set(profiles) | set(self._profiles)
+                             if profiles.get(name) != self._profiles.get(name))
+            self._profiles = profiles
+            self._signature = signature
+
+        if changed and not first_load:
+            print(f"🔄 Reloaded subject profiles: {', '.join(changed)}")
+            for listener in self._listeners:
+                listener(changed)
+        return changed
+
+    def refresh(self):
+        """Reload the profiles if they were never loaded or the reload interval has passed."""
+        if self._signature is None or time.monotonic() - self._checked_at >= self.reload_interval:
+            self.reload()
+
+    def get(self, subject: str) -> SubjectProfile:
+        """
+        Get the profile of a subject.
+
+        Args:
+            subject (str): The subject
+
+        Returns:
+            SubjectProfile: The profile
+
+        Raises:
+            ValueError: If the subject has no profile
+        """
+        self.refresh()
+        try:
+            return self._profiles[subject]
+        except KeyError:
+            raise ValueError(f"Unknown subject '{subject}', no profile in {self.folder}") from None
+
+    def subjects(self) -> List[str]:
+        """Get the subjects that have a profile."""
+        self.refresh()
+        return sorted(self._profiles)
+
+# Shared registry of the app
+subject_profiles = SubjectProfileRegistry()
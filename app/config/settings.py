@@ -22,11 +22,54 @@ ALLOWED_USER_AGENTS: List[str] = [
 
 # Vector database settings
 QDRANT_URL = "http://localhost:6333"
+STORAGE_PROFILE = os.environ.get("STORAGE_PROFILE", "memory")  # Storage profile of new collections, see app/utils/storage_profiles.py
+HYBRID_SEARCH_ENABLED = os.environ.get("HYBRID_SEARCH_ENABLED", "1") == "1"  # New collections store a sparse lexical vector and are searched dense + lexical with RRF fusion
+BUSINESS_STORAGE_MODE = os.environ.get("BUSINESS_STORAGE_MODE", "collection")  # "collection" gives each business user a collection, "shared" partitions one collection by tenant
+BUSINESS_SHARED_COLLECTION = os.environ.get("BUSINESS_SHARED_COLLECTION", "business_tenants")  # Collection of all business users in shared mode
+STORAGE_PROFILE_OVERRIDES = os.environ.get("STORAGE_PROFILE_OVERRIDES", "legal=scalar,base_knowledge=scalar")  # Per-collection profiles, "collection=profile" pairs separated by commas
 
 # Model settings
 MODEL_NAME = os.environ.get("MODEL_NAME", "vinallama")
 MODEL_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
 EMBEDDINGS_MODEL_PATH = os.environ.get("EMBEDDINGS_MODEL_PATH", './vietnamese-bi-encoder')
+REWRITE_MODEL_NAME = os.environ.get("REWRITE_MODEL_NAME", "")  # Optional small model for question rewriting, empty uses MODEL_NAME
+MODEL_NUM_CTX = 2048  # Context window of the chat model (num_ctx), shared by the prompt, history, retrieved context and answer
+MODEL_NUM_PREDICT = 1024  # Tokens the chat model may generate (num_predict), kept free in the context window for the answer
+OLLAMA_HEALTH_CHECK_INTERVAL = float(os.environ.get("OLLAMA_HEALTH_CHECK_INTERVAL", "10"))  # Seconds between background probes
+OLLAMA_HEALTH_CHECK_TIMEOUT = float(os.environ.get("OLLAMA_HEALTH_CHECK_TIMEOUT", "5"))  # Seconds before a probe gives up
+
+# Ingestion settings
+EMBED_BATCH_TOKEN_BUDGET = int(os.environ.get("EMBED_BATCH_TOKEN_BUDGET", "16384"))  # Padded tokens per embedding batch (batch size x longest chunk)
+EMBED_MAX_BATCH_SIZE = int(os.environ.get("EMBED_MAX_BATCH_SIZE", "128"))  # Upper bound on chunks per embedding batch
+SKIP_EXISTING_CHUNKS = os.environ.get("SKIP_EXISTING_CHUNKS", "1") == "1"  # Check Qdrant for chunk IDs before embedding and skip the stored ones
+CHUNKER_MODE = os.environ.get("CHUNKER_MODE", "tfidf")  # "tfidf" chunks on TF-IDF similarity, "embedding" chunks on sentence embeddings and pools them into chunk vectors
+EMBEDDING_CHUNKER_SIMILARITY_THRESHOLD = float(os.environ.get("EMBEDDING_CHUNKER_SIMILARITY_THRESHOLD", "0.5"))  # Cosine similarity below which the embedding chunker starts a new chunk
+POOLED_VECTOR_MIN_FIDELITY = float(os.environ.get("POOLED_VECTOR_MIN_FIDELITY", "0.7"))  # Chunks whose pooled vector scores lower are re-embedded whole, 0 never re-embeds
+BULK_LOAD_MAX_IN_FLIGHT = int(os.environ.get("BULK_LOAD_MAX_IN_FLIGHT", "4"))  # Unacknowledged upsert batches per bulk load session
+BULK_LOAD_INDEX_TIMEOUT = float(os.environ.get("BULK_LOAD_INDEX_TIMEOUT", "3600"))  # Seconds a bulk load commit waits for the collection to turn green
 
 # Chat settings
 CHAT_HISTORY_FOLDER = "chat_history/"
+CHAT_HISTORY_MAX_MESSAGES = int(os.environ.get("CHAT_HISTORY_MAX_MESSAGES", "0"))  # Messages kept per conversation log before compaction, 0 keeps everything
+
+# Response cache settings
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "1") == "1"  # Reuse answers to repeated questions
+RESPONSE_CACHE_FOLDER = "response_cache/"
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "86400"))  # Seconds before a cached answer expires, 0 keeps answers forever
+RESPONSE_CACHE_SIMILARITY_THRESHOLD = float(os.environ.get("RESPONSE_CACHE_SIMILARITY_THRESHOLD", "0.95"))  # Cosine similarity for a near-repeat hit
+RESPONSE_CACHE_MAX_COLLECTIONS = int(os.environ.get("RESPONSE_CACHE_MAX_COLLECTIONS", "64"))  # Collections kept in memory (LRU)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "5000"))  # Cached answers per collection
+
+# RAG chain settings
+ASYNC_RAG_ENABLED = os.environ.get("ASYNC_RAG_ENABLED", "1") == "1"  # Serve chat endpoints on the async RAG path, 0 falls back to the sync path
+REWRITE_CACHE_SIZE = int(os.environ.get("REWRITE_CACHE_SIZE", "2048"))  # Cached question rewrites (LRU)
+CHAIN_REGISTRY_MAX_SIZE = int(os.environ.get("CHAIN_REGISTRY_MAX_SIZE", "256"))  # Compiled chains kept in memory (LRU)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE", "4096"))  # Query embeddings kept in memory (LRU), 0 disables the cache
+QUERY_EMBEDDING_CACHE_DB = os.environ.get("QUERY_EMBEDDING_CACHE_DB", "")  # Optional SQLite file keeping query embeddings across restarts, empty keeps them in memory only
+QUERY_EMBEDDING_CACHE_DB_MAX_ENTRIES = int(os.environ.get("QUERY_EMBEDDING_CACHE_DB_MAX_ENTRIES", "100000"))  # Query embeddings kept in the SQLite file
+SUBJECT_PROFILES_FOLDER = "subject_profiles/"  # Prompt, retrieval and context settings of each subject, see app/chatbot/subject_profiles.py
+SUBJECT_PROFILES_RELOAD_INTERVAL = float(os.environ.get("SUBJECT_PROFILES_RELOAD_INTERVAL", "5"))  # Seconds between checks of the subject profile files for changes
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "768"))  # Most tokens of retrieved context per answer, less when the prompt, history and answer leave less of MODEL_NUM_CTX
+CONTEXT_TOKENIZER = os.environ.get("CONTEXT_TOKENIZER", "vilm/vinallama-7b-chat")  # Tokenizer of the chat model (Hugging Face name or local path) used to count context tokens
+CONTEXT_NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("CONTEXT_NEAR_DUPLICATE_THRESHOLD", "0.8"))  # Share of shared word 3-grams above which a retrieved chunk is dropped as a near-duplicate
+RETRIEVAL_SEARCH_TIMEOUT = float(os.environ.get("RETRIEVAL_SEARCH_TIMEOUT", "2.0"))  # Seconds a collection search may take before the fused retriever answers without it
@@ -6,18 +6,24 @@ import json
 import os
 import time
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException
-
-from app.chatbot.rag import answer_business, answer_user
-from app.config.settings import MODEL_BASE_URL
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.chatbot.chain_registry import chain_registry
+from app.chatbot.model import health_monitor
+from app.chatbot.rag import answer_business, answer_user, aanswer_business, aanswer_user, astream_business, astream_user
+from app.chatbot.retrieval import get_client, get_embeddings, invalidate_collection_info
+from app.config.settings import ASYNC_RAG_ENABLED
 from app.database.vector_db import add_documents
 from app.database.vector_db import create_collection
 from app.models.chatbot_models import AskData, AskBusiness
 from app.models.user_models import AddQABusiness, AddQA
 from app.routes.auth import validate_user_agent
 from app.utils.document_processing import load_qa
-from app.utils.text_processing import format_response
+from app.utils.response_cache import response_cache
+from app.utils.tenant_storage import add_tenant_documents, is_shared_mode
+from app.utils.text_processing import format_response, format_sse_event
 
 router = APIRouter(tags=["Chatbot"])
 
@@ -26,46 +32,26 @@ def check_ollama_health():
     """
     Check if the Ollama service is running and accessible.
 
+    The status comes from the background health monitor, so this endpoint does not
+    probe Ollama itself.
+
     Returns:
         dict: A dictionary with the status of the Ollama service
     """
-    try:
-        # Try to connect to Ollama
-        response = httpx.get(f"{MODEL_BASE_URL}/api/tags", timeout=5.0)
-        if response.status_code == 200:
-            return {
-                "status": "ok",
-                "message": f"Ollama service is running at {MODEL_BASE_URL}",
-                "models": response.json().get("models", [])
-            }
-        else:
-            return {
-                "status": "error",
-                "message": f"Ollama service returned status code {response.status_code}",
-                "url": MODEL_BASE_URL
-            }
-    except httpx.ConnectError:
-        return {
-            "status": "error",
-            "message": f"Could not connect to Ollama service at {MODEL_BASE_URL}. Is Ollama running?",
-            "url": MODEL_BASE_URL,
-            "help": "You can configure the Ollama URL using the OLLAMA_BASE_URL environment variable."
-        }
-    except Exception as e:
-        return {
-            "status": "error",
-            "message": f"An error occurred while checking Ollama health: {str(e)}",
-            "url": MODEL_BASE_URL
-        }
+    return health_monitor.get_status()
 
 @router.post("/ask_bot", dependencies=[Depends(validate_user_agent)])
-def ask_question(data: AskData):
+async def ask_question(data: AskData):
     """
     Ask a question to the bot.
     """
     start_time = time.time()
 
-    answer = answer_business(data.subject, data.question, data.username)
+    if ASYNC_RAG_ENABLED:
+        answer = await aanswer_business(data.subject, data.question, data.username)
+    else:
+        # Fallback to the sync RAG path on the threadpool
+        answer = await run_in_threadpool(answer_business, data.subject, data.question, data.username)
 
     # Calculate response time
     response_time = time.time() - start_time
@@ -73,14 +59,45 @@ def ask_question(data: AskData):
     return format_response(answer, response_time)
 
 @router.post("/ask_business", dependencies=[Depends(validate_user_agent)])
-def ask_business_question(data: AskBusiness):
+async def ask_business_question(data: AskBusiness):
     """
     Ask a business-related question.
     """
-    answer = answer_user(data.question, data.username)
+    if ASYNC_RAG_ENABLED:
+        answer = await aanswer_user(data.question, data.username)
+    else:
+        # Fallback to the sync RAG path on the threadpool
+        answer = await run_in_threadpool(answer_user, data.question, data.username)
 
     return format_response(answer)
 
+async def _sse_stream(events, start_time):
+    """
+    Encode RAG stream events as Server-Sent Events frames.
+    """
+    async for event in events:
+        if event["type"] == "done":
+            event["response_time_seconds"] = time.time() - start_time
+        yield format_sse_event(event.pop("type"), event)
+
+@router.post("/ask_bot/stream", dependencies=[Depends(validate_user_agent)])
+async def ask_question_stream(data: AskData):
+    """
+    Ask a question to the bot and stream the answer as Server-Sent Events.
+    """
+    start_time = time.time()
+    events = astream_business(data.subject, data.question, data.username)
+    return StreamingResponse(_sse_stream(events, start_time), media_type="text/event-stream")
+
+@router.post("/ask_business/stream", dependencies=[Depends(validate_user_agent)])
+async def ask_business_question_stream(data: AskBusiness):
+    """
+    Ask a business-related question and stream the answer as Server-Sent Events.
+    """
+    start_time = time.time()
+    events = astream_user(data.question, data.username)
+    return StreamingResponse(_sse_stream(events, start_time), media_type="text/event-stream")
+
 @router.post("/add_qa_for_business", dependencies=[Depends(validate_user_agent)])
 def add_qa_business(data: AddQABusiness):
     """
@@ -89,8 +106,14 @@ def add_qa_business(data: AddQABusiness):
     try:
         text = [f"{data.question}\n{data.answer}"]
         documents = load_qa(data.username, text)
-        create_collection(str(f"{data.username}"))
-        add_documents(documents, collection_name=str(f"{data.username}"), embeddings=None, subject=None)
+        if is_shared_mode():
+            add_tenant_documents(get_client(), get_embeddings(), str(f"{data.username}"), documents)
+        else:
+            create_collection(str(f"{data.username}"))
+            add_documents(documents, collection_name=str(f"{data.username}"), embeddings=None, subject=None)
+        chain_registry.invalidate(str(f"{data.username}"))
+        invalidate_collection_info(str(f"{data.username}"))
+        response_cache.invalidate(str(f"{data.username}"))
 
         qa_dict = {
             "question": data.question,
@@ -128,6 +151,9 @@ def add_qa_bot(data: AddQA):
         documents = load_qa(data.subject, text)
         create_collection(str(f"{data.subject}"))
         add_documents(documents, collection_name=str(f"{data.subject}"), embeddings=None, subject=data.subject)
+        chain_registry.invalidate(str(f"{data.subject}"))
+        invalidate_collection_info(str(f"{data.subject}"))
+        response_cache.invalidate(str(f"{data.subject}"))
 
         qa_dict = {
             "subject": data.subject,
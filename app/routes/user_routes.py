@@ -4,11 +4,15 @@ This module contains API routes for user-related operations.
 """
 from fastapi import APIRouter, Depends
 
+from app.chatbot.chain_registry import chain_registry
+from app.chatbot.retrieval import get_client, get_embeddings, invalidate_collection_info
 from app.database.vector_db import create_collection, add_documents
 from app.database.vector_db import delete_collection
 from app.models.user_models import UserRegister, TextData
 from app.routes.auth import validate_user_agent
 from app.utils.document_processing import load_text
+from app.utils.response_cache import response_cache
+from app.utils.tenant_storage import add_tenant_documents, delete_tenant, ensure_shared_collection, is_shared_mode
 
 router = APIRouter(tags=["User Management"])
 
@@ -17,7 +21,14 @@ def register(user: UserRegister):
     """
     Register a new user.
     """
-    create_collection(user.username)
+    if is_shared_mode():
+        # Users are tenants of the shared collection, nothing to create per user
+        ensure_shared_collection(get_client())
+    else:
+        create_collection(user.username)
+    chain_registry.invalidate(user.username)
+    invalidate_collection_info(user.username)
+    response_cache.invalidate(user.username)
     return {"message": "Data created successfully"}
 
 @router.post("/update_business", dependencies=[Depends(validate_user_agent)])
@@ -28,8 +39,14 @@ def update_text_data(text_data: TextData):
     metadata, text = text_data.title, text_data.text
 
     documents = load_text(metadata, text)
-    create_collection(str(text_data.username))
-    add_documents(documents, collection_name=str(text_data.username), embeddings=None, subject=None)  # embeddings will be filled in by the caller
+    if is_shared_mode():
+        add_tenant_documents(get_client(), get_embeddings(), str(text_data.username), documents)
+    else:
+        create_collection(str(text_data.username))
+        add_documents(documents, collection_name=str(text_data.username), embeddings=None, subject=None)  # embeddings will be filled in by the caller
+    chain_registry.invalidate(str(text_data.username))
+    invalidate_collection_info(str(text_data.username))
+    response_cache.invalidate(str(text_data.username))
     return {"message": "Data updated successfully"}
 
 @router.delete("/delete", dependencies=[Depends(validate_user_agent)])
@@ -37,5 +54,12 @@ def delete_data(user_name: str):
     """
     Delete user data.
     """
-    delete_collection(user_name)
+    if is_shared_mode():
+        # Only the user's points go, the shared collection stays
+        delete_tenant(get_client(), user_name)
+    else:
+        delete_collection(user_name)
+    chain_registry.invalidate(user_name)
+    invalidate_collection_info(user_name)
+    response_cache.invalidate(user_name)
     return {"message": "Data deleted successfully"}
@@ -0,0 +1,384 @@
+"""
+Batch embedding utility module.
+This module embeds documents in length-sorted, token-budgeted batches and overlaps embedding with the Qdrant upserts.
+It can also chunk on sentence embeddings and reuse them as pooled chunk vectors.
+"""
+import gc
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.schema import Document
+from qdrant_client.models import PointStruct
+
+from app.config.settings import EMBED_BATCH_TOKEN_BUDGET, EMBED_MAX_BATCH_SIZE, POOLED_VECTOR_MIN_FIDELITY
+from app.utils.lexical import LEXICAL_VECTOR_NAME, document_lexical_vector
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# Fallback when the model tokenizer is not reachable: Vietnamese syllables are roughly 1.4 tokens
+TOKENS_PER_WORD = 1.4
+
+# Point IDs per retrieve request when checking for chunks that are already stored
+EXISTING_IDS_BATCH_SIZE = 1000
+
+
+def document_point_id(content: str) -> int:
+    """
+    Get the deterministic point ID of a chunk.
+
+    Identical content gets the same ID, so re-ingesting a file updates its points instead of duplicating them.
+
+    Args:
+        content (str): The chunk text
+
+    Returns:
+        int: The first 64 bits of the MD5 hash of the content
+    """
+    content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+    return int(content_hash[:16], 16)
+
+def build_point(document, vector, lexical=False) -> PointStruct:
+    """
+    Build the Qdrant point of an embedded document.
+
+    Args:
+        document: The Document with a "source" metadata entry
+        vector (list): The embedding of the document content
+        lexical (bool): Add the sparse "lexical" vector, for collections created with one
+
+    Returns:
+        PointStruct: The point with the "content" named vector
+    """
+    point_id = document_point_id(document.page_content)
+    payload = {
+        "page_content": document.page_content,
+        "metadata": {
+            "id": point_id,
+            "source": document.metadata["source"],
+        }
+    }
+    vectors = {"content": vector}
+    if lexical:
+        vectors[LEXICAL_VECTOR_NAME] = document_lexical_vector(document.page_content)
+    return PointStruct(id=point_id, vector=vectors, payload=payload)
+
+def find_existing_ids(client, collection_name, point_ids, batch_size=EXISTING_IDS_BATCH_SIZE):
+    """
+    Look up which point IDs are already stored in a collection.
+
+    Points are retrieved by ID without payload or vectors, so the check costs a few
+    small requests instead of an embedding pass.
+
+    Args:
+        client: The QdrantClient
+        collection_name (str): The collection
+        point_ids (list): The candidate point IDs
+        batch_size (int): IDs per retrieve request
+
+    Returns:
+        set: The IDs that exist, empty if the collection cannot be read
+    """
+    existing = set()
+    unique_ids = list(dict.fromkeys(point_ids))
+    try:
+        for start in range(0, len(unique_ids), batch_size):
+            records = client.retrieve(
+                collection_name=collection_name,
+                ids=unique_ids[start:start + batch_size],
+                with_payload=False,
+                with_vectors=False,
+            )
+            existing.update(record.id for record in records)
+    except Exception as e:
+        # Embedding everything is slower but always correct
+        print(f"   ⚠️ Could not check existing chunks in {collection_name}, embedding all of them: {str(e)}")
+        return set()
+    return existing
+
+def missing_indexes(documents, client, collection_name):
+    """
+    Find the documents whose point is not in the collection yet, nor repeated earlier in the list.
+
+    Point IDs are content hashes, so a stored point with the same ID holds the same chunk.
+
+    Args:
+        documents (list): The Documents to ingest
+        client: The QdrantClient
+        collection_name (str): The collection
+
+    Returns:
+        list: The indexes of the documents still to ingest
+    """
+    point_ids = [document_point_id(document.page_content) for document in documents]
+    existing = find_existing_ids(client, collection_name, point_ids)
+    kept = []
+    for index, point_id in enumerate(point_ids):
+        if point_id in existing:
+            continue
+        # Repeated chunks would be embedded twice for the same point
+        existing.add(point_id)
+        kept.append(index)
+    return kept
+
+def skip_existing(documents, client, collection_name, vectors=None):
+    """
+    Drop the documents whose point is already in the collection, or repeated in the list.
+
+    Args:
+        documents (list): The Documents to ingest
+        client: The QdrantClient
+        collection_name (str): The collection
+        vectors (list, optional): Precomputed vectors of the documents, filtered alongside them
+
+    Returns:
+        tuple: The remaining documents, their vectors (None if none were given) and the number skipped
+    """
+    kept = missing_indexes(documents, client, collection_name)
+    remaining_vectors = [vectors[i] for i in kept] if vectors is not None else None
+    return [documents[i] for i in kept], remaining_vectors, len(documents) - len(kept)
+
+def release_memory():
+    """Free Python and CUDA memory before retrying a failed batch."""
+    gc.collect()
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.synchronize()
+        torch.cuda.empty_cache()
+        if hasattr(torch.cuda, 'reset_peak_memory_stats'):
+            torch.cuda.reset_peak_memory_stats()
+
+def token_lengths(embeddings, texts):
+    """
+    Count the tokens the model will see for each text.
+
+    Uses the tokenizer of the underlying SentenceTransformer when available and
+    truncates at its max_seq_length, otherwise estimates from the word count.
+
+    Args:
+        embeddings: The embedding model
+        texts (list): The texts
+
+    Returns:
+        list: One token count per text
+    """
+    model = getattr(embeddings, "_client", None)
+    tokenizer = getattr(model, "tokenizer", None)
+    max_length = getattr(model, "max_seq_length", None) or 512
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_length)
+            return [len(input_ids) for input_ids in encoded["input_ids"]]
+        except Exception:
+            pass
+    return [min(int(len(text.split()) * TOKENS_PER_WORD) + 2, max_length) for text in texts]
+
+def plan_batches(lengths, token_budget=EMBED_BATCH_TOKEN_BUDGET, max_batch_size=EMBED_MAX_BATCH_SIZE):
+    """
+    Group texts into batches of similar length that fit a padded token budget.
+
+    Texts are sorted longest first, so each batch is padded to a length close to
+    all of its members, and a batch grows while batch size times its longest text
+    stays within the budget. Short texts therefore get large batches and long texts
+    small ones.
+
+    Args:
+        lengths (list): Token count of each text
+        token_budget (int): Maximum padded tokens per batch
+        max_batch_size (int): Maximum texts per batch
+
+    Returns:
+        list: Batches as lists of indices into the input
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches = []
+    current = []
+    for index in order:
+        # The first text of a batch is its longest, so it sets the padded length
+        padded_length = lengths[current[0]] if current else lengths[index]
+        if current and (len(current) >= max_batch_size or (len(current) + 1) * padded_length > token_budget):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
+
+def embed_with_bisection(embeddings, texts):
+    """
+    Embed a batch, splitting it in halves when the model fails (usually a CUDA OOM).
+
+    A single text that still fails is retried once after freeing memory, like the
+    former per-item retry; if that fails too its vector is None.
+
+    Args:
+        embeddings: The embedding model
+        texts (list): The texts
+
+    Returns:
+        list: One vector per text, None for texts that could not be embedded
+    """
+    try:
+        if torch is not None:
+            with torch.no_grad():
+                return embeddings.embed_documents(texts)
+        return embeddings.embed_documents(texts)
+    except Exception as e:
+        release_memory()
+        if len(texts) == 1:
+            print(f"   ⚠️ Error embedding content: {str(e)}")
+            time.sleep(1)
+            try:
+                return embeddings.embed_documents(texts)
+            except Exception as retry_e:
+                print(f"   ❌ Failed to embed content after retry: {str(retry_e)}")
+                return [None]
+        print(f"   ⚠️ Error embedding batch of {len(texts)}, splitting it: {str(e)}")
+        middle = len(texts) // 2
+        return embed_with_bisection(embeddings, texts[:middle]) + embed_with_bisection(embeddings, texts[middle:])
+
+def embed_sentence_chunks(chunker, embeddings, pages, min_fidelity=POOLED_VECTOR_MIN_FIDELITY,
+                          token_budget=EMBED_BATCH_TOKEN_BUDGET, max_batch_size=EMBED_MAX_BATCH_SIZE,
+                          before_batch=None):
+    """
+    Chunk pages on sentence embeddings and reuse them as the chunk vectors.
+
+    The sentences of all pages are embedded once in token-budgeted batches, the
+    chunker places boundaries on those vectors and pools each chunk vector from its
+    sentences. Only multi-sentence chunks whose pooled vector has a fidelity below
+    min_fidelity are embedded again as a whole.
+
+    Args:
+        chunker: The SemanticChunker, its similarity_threshold applies to embedding cosine similarity
+        embeddings: The embedding model
+        pages (list): (source, sentences) tuples
+        min_fidelity (float): Pooled vectors below this fidelity are replaced by a chunk embedding,
+            0 never re-embeds
+        token_budget (int): Maximum padded tokens per embedding batch
+        max_batch_size (int): Maximum texts per embedding batch
+        before_batch (callable, optional): Called before embedding each batch, e.g. a resource check
+
+    Returns:
+        tuple: The chunk Documents, their vectors and the number of chunks that were re-embedded
+    """
+    sentences = [sentence for _, page_sentences in pages for sentence in page_sentences]
+    lengths = token_lengths(embeddings, sentences)
+    sentence_vectors = [None] * len(sentences)
+    for batch in plan_batches(lengths, token_budget, max_batch_size):
+        if before_batch is not None:
+            before_batch()
+        for index, vector in zip(batch, embed_with_bisection(embeddings, [sentences[i] for i in batch])):
+            sentence_vectors[index] = vector
+
+    failed = sum(vector is None for vector in sentence_vectors)
+    if failed:
+        print(f"   ❌ Skipped {failed} sentences that could not be embedded")
+
+    documents = []
+    chunks = []
+    offset = 0
+    for source, page_sentences in pages:
+        # Sentences that could not be embedded are left out of the chunks
+        kept = [i for i in range(offset, offset + len(page_sentences)) if sentence_vectors[i] is not None]
+        offset += len(page_sentences)
+        if not kept:
+            continue
+        for chunk in chunker.create_chunks_from_vectors(
+                [sentences[i] for i in kept], [sentence_vectors[i] for i in kept], [lengths[i] for i in kept]):
+            documents.append(Document(metadata={"source": source}, page_content=chunk.text))
+            chunks.append(chunk)
+    vectors = [chunk.vector.tolist() for chunk in chunks]
+
+    low_fidelity = [i for i, chunk in enumerate(chunks) if len(chunk.sentences) > 1 and chunk.fidelity < min_fidelity]
+    reembedded = 0
+    if low_fidelity:
+        texts = [documents[i].page_content for i in low_fidelity]
+        for batch in plan_batches(token_lengths(embeddings, texts), token_budget, max_batch_size):
+            if before_batch is not None:
+                before_batch()
+            for index, vector in zip(batch, embed_with_bisection(embeddings, [texts[i] for i in batch])):
+                # Keep the pooled vector if the chunk itself cannot be embedded
+                if vector is not None:
+                    vectors[low_fidelity[index]] = vector
+                    reembedded += 1
+
+    return documents, vectors, reembedded
+
+def embed_and_upsert(documents, embeddings, upsert, token_budget=EMBED_BATCH_TOKEN_BUDGET,
+                     max_batch_size=EMBED_MAX_BATCH_SIZE, before_batch=None, after_batch=None, vectors=None,
+                     lexical=False, on_failed=None):
+    """
+    Embed documents in batches and upsert them, overlapping each upsert with the next embedding.
+
+    Upserts run on a single background thread so batch N is written to Qdrant while
+    batch N+1 is embedded, and at most one upsert is pending at a time.
+
+    Args:
+        documents (list): The Documents to ingest
+        embeddings: The embedding model
+        upsert (callable): Called with the list of points of one batch
+        token_budget (int): Maximum padded tokens per embedding batch
+        max_batch_size (int): Maximum documents per embedding batch
+        before_batch (callable, optional): Called before embedding each batch, e.g. a resource check
+        after_batch (callable, optional): Called with the number of documents done after each upsert
+        vectors (list, optional): Precomputed vectors of the documents, e.g. from embed_sentence_chunks;
+            the documents are then only batched and upserted
+        lexical (bool): Add the sparse "lexical" vector to the points
+        on_failed (callable, optional): Called with the index of each document that could not be embedded
+
+    Returns:
+        tuple: Number of points upserted and number of documents that could not be embedded
+    """
+    texts = [document.page_content for document in documents]
+    if vectors is not None:
+        batches = [list(range(start, min(start + max_batch_size, len(documents))))
+                   for start in range(0, len(documents), max_batch_size)]
+    else:
+        batches = plan_batches(token_lengths(embeddings, texts), token_budget, max_batch_size)
+
+    upserted = 0
+    failed = 0
+    done = 0
+    pending = None
+
+    def finish(future, batch_count):
+        nonlocal upserted, done
+        upserted += future.result()
+        done += batch_count
+        if after_batch is not None:
+            after_batch(done)
+
+    def write(points):
+        if points:
+            upsert(points)
+        return len(points)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="qdrant-upsert") as executor:
+        for batch in batches:
+            if before_batch is not None:
+                before_batch()
+
+            if vectors is not None:
+                batch_vectors = [vectors[i] for i in batch]
+            else:
+                batch_vectors = embed_with_bisection(embeddings, [texts[i] for i in batch])
+            points = []
+            for index, vector in zip(batch, batch_vectors):
+                if vector is None:
+                    failed += 1
+                    if on_failed is not None:
+                        on_failed(index)
+                    continue
+                points.append(build_point(documents[index], vector, lexical))
+
+            # Wait for the previous upsert before queueing this one, so at most one batch is in flight
+            if pending is not None:
+                finish(*pending)
+            pending = (executor.submit(write, points), len(batch))
+
+        if pending is not None:
+            finish(*pending)
+
+    return upserted, failed
@@ -0,0 +1,253 @@
+"""
+Bulk load utility module.
+This module loads many points into a Qdrant collection with HNSW indexing deferred until the load is committed.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from qdrant_client.models import CollectionStatus, OptimizersConfigDiff
+
+from app.config.settings import BULK_LOAD_INDEX_TIMEOUT, BULK_LOAD_MAX_IN_FLIGHT
+
+# Indexing threshold restored when the collection has none set, the Qdrant default (KB of vectors)
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+# Seconds between collection status checks while the index is built
+INDEX_POLL_INTERVAL = 2.0
+
+# Attempts per batch, with exponential backoff in between
+UPSERT_RETRIES = 3
+
+# Sessions that have begun and not yet restored their indexing threshold
+_open_sessions = set()
+_open_sessions_lock = threading.Lock()
+
+
+def wait_for_green(client, collection_name, timeout=BULK_LOAD_INDEX_TIMEOUT):
+    """
+    Poll a collection until its optimizers are done.
+
+    Args:
+        client: The QdrantClient
+        collection_name (str): The collection
+        timeout (float): Seconds to wait at most
+
+    Returns:
+        bool: True if the collection turned green within the timeout
+    """
+    deadline = time.time() + timeout
+    while True:
+        status = client.get_collection(collection_name).status
+        if status == CollectionStatus.GREEN:
+            return True
+        if status == CollectionStatus.RED:
+            print(f"⚠️ Collection '{collection_name}' is red")
+            return False
+        if time.time() >= deadline:
+            print(f"⚠️ Collection '{collection_name}' is still {status} after {timeout}s, "
+                  f"optimization continues in the background")
+            return False
+        time.sleep(INDEX_POLL_INTERVAL)
+
+
+def restore_open_sessions():
+    """
+    Restore the indexing threshold of every open session without waiting for their batches.
+
+    For a process about to exit without committing its sessions, e.g. with os._exit,
+    so the collections are not left with HNSW indexing turned off.
+
+    Returns:
+        int: The number of collections whose threshold was restored
+    """
+    with _open_sessions_lock:
+        sessions = list(_open_sessions)
+    restored = 0
+    for session in sessions:
+        try:
+            restored += session._restore_indexing_threshold()
+        except Exception as e:
+            print(f"⚠️ Could not restore the indexing threshold of '{session.collection_name}': {str(e)}")
+    return restored
+
+
+class BulkLoadSession:
+    """
+    A bulk load into one collection, in three steps.
+
+    begin() sets the indexing threshold of the collection to 0, which stops Qdrant from
+    building HNSW segments while points arrive. upsert() sends batches with wait=False
+    from a small thread pool and blocks while max_in_flight batches are unacknowledged.
+    commit() waits for the batches, restores the indexing threshold so the index is
+    built once over all the points, and polls until the collection is green.
+
+    Used as a context manager the session begins on entry and commits on a clean exit;
+    after an error it still restores the threshold but does not wait for the index. A
+    process that exits without closing its sessions calls restore_open_sessions() first.
+    Small online writes should not use a session: they stay under the threshold and
+    never trigger re-indexing on their own.
+
+    Usage:
+        with BulkLoadSession(client, "base_knowledge") as session:
+            for points in batches:
+                session.upsert(points)
+    """
+    def __init__(self, client, collection_name, max_in_flight=BULK_LOAD_MAX_IN_FLIGHT,
+                 index_timeout=BULK_LOAD_INDEX_TIMEOUT):
+        self.client = client
+        self.collection_name = collection_name
+        self.max_in_flight = max(1, max_in_flight)
+        self.index_timeout = index_timeout
+        self.indexing_threshold = None
+        self.upserted = 0
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._errors = []
+        self._executor = None
+
+    def __enter__(self):
+        return self.begin()
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+    def begin(self):
+        """
+        Stop HNSW index building on the collection.
+
+        Returns:
+            BulkLoadSession: The session itself
+        """
+        info = self.client.get_collection(self.collection_name)
+        # A session that never committed leaves the threshold at 0, fall back to the default then
+        self.indexing_threshold = info.config.optimizer_config.indexing_threshold or DEFAULT_INDEXING_THRESHOLD
+        self._set_indexing_threshold(0)
+        with _open_sessions_lock:
+            _open_sessions.add(self)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="bulk-upsert")
+        return self
+
+    def upsert(self, points):
+        """
+        Send a batch of points without waiting for Qdrant to apply it.
+
+        Blocks while max_in_flight batches are unacknowledged. Failures are raised by flush().
+
+        Args:
+            points (list): The PointStructs of the batch
+
+        Returns:
+            Future: Resolves to the number of points once Qdrant has acknowledged the batch
+        """
+        if self._executor is None:
+            raise RuntimeError(f"Bulk load session on '{self.collection_name}' has not begun")
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._send, points)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def flush(self):
+        """
+        Wait for every batch in flight.
+
+        Raises:
+            RuntimeError: If a batch sent since the last flush failed after its retries
+        """
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise RuntimeError(f"{len(errors)} batches failed to upsert into '{self.collection_name}': {errors[0]}") \
+                from errors[0]
+
+    def commit(self):
+        """
+        Wait for the batches in flight, then build the index once and wait until the collection is green.
+
+        Returns:
+            bool: True if the collection turned green within index_timeout
+        """
+        try:
+            self.flush()
+        finally:
+            self._close()
+        return self.wait_until_green()
+
+    def abort(self):
+        """Wait for the batches in flight, ignoring their failures, and restore index building."""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+        self._errors = []
+        self._close()
+
+    def wait_until_green(self):
+        """
+        Poll the collection until its optimizers are done.
+
+        Returns:
+            bool: True if the collection turned green within index_timeout
+        """
+        return wait_for_green(self.client, self.collection_name, self.index_timeout)
+
+    def _send(self, points):
+        retry_delay = 2
+        for retry in range(UPSERT_RETRIES):
+            try:
+                self.client.upsert(collection_name=self.collection_name, points=points, wait=False)
+                break
+            except Exception as e:
+                if retry == UPSERT_RETRIES - 1:
+                    raise
+                print(f"⚠️ Error upserting batch (retry {retry+1}/{UPSERT_RETRIES}): {str(e)}")
+                time.sleep(retry_delay)
+                retry_delay *= 2  # Exponential backoff
+        with self._lock:
+            self.upserted += len(points)
+        return len(points)
+
+    def _on_done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+            if future.exception() is not None:
+                self._errors.append(future.exception())
+        self._slots.release()
+
+    def _close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._restore_indexing_threshold()
+
+    def _restore_indexing_threshold(self):
+        # Also called by restore_open_sessions from another thread, only one of them restores it
+        with self._lock:
+            threshold, self.indexing_threshold = self.indexing_threshold, None
+        if threshold is None:
+            return False
+        try:
+            self._set_indexing_threshold(threshold)
+        finally:
+            with _open_sessions_lock:
+                _open_sessions.discard(self)
+        return True
+
+    def _set_indexing_threshold(self, threshold):
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=threshold),
+        )
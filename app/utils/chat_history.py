@@ -8,7 +8,11 @@ import os
 from langchain_core.messages.ai import AIMessage
 from langchain_core.messages.human import HumanMessage
 
-from app.config.settings import CHAT_HISTORY_FOLDER
+from app.config.settings import CHAT_HISTORY_FOLDER, CHAT_HISTORY_MAX_MESSAGES
+from app.utils.chat_log import ChatLog, safe_path_component
+
+# Number of most recent messages loaded into a session
+RECENT_MESSAGES = 5
 
 
 def message_to_dict(message):
@@ -43,78 +47,102 @@ def dict_to_message(message_dict):
         return AIMessage(content=message_dict['content'], additional_kwargs=message_dict.get('additional_kwargs', {}))
     return None
 
+def get_chat_log(user_id, category):
+    """
+    Get the append-only log of a user's conversation in a category.
+
+    Args:
+        user_id (str): The user ID
+        category (str): The category of the conversation
+
+    Returns:
+        ChatLog: The conversation log, stored under chat_history/<user_id>/<category>.log
+    """
+    folder = os.path.join(CHAT_HISTORY_FOLDER, safe_path_component(user_id))
+    return ChatLog(folder, safe_path_component(category))
+
+def migrate_legacy_file(file_path):
+    """
+    Move a legacy JSON history file into per-conversation logs.
+
+    Conversations that already have messages in their log are left untouched. The legacy file is
+    renamed with a .migrated suffix once every conversation has been copied.
+
+    Args:
+        file_path (str): The path to the legacy JSON file
+
+    Returns:
+        int: The number of messages migrated
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            legacy_data = json.load(file)
+    except FileNotFoundError:
+        # Another request migrated it first
+        return 0
+
+    migrated = 0
+    for user_id, categories in legacy_data.items():
+        for category, messages in categories.items():
+            # Checked under the log lock, so a request that already wrote to the log or a
+            # concurrent migration of the same file does not get the history twice
+            migrated += get_chat_log(user_id, category).append(messages, only_if_empty=True)
+
+    try:
+        os.replace(file_path, f"{file_path}.migrated")
+    except FileNotFoundError:
+        pass
+    return migrated
+
 def update_conversation(store, category, file_path="conversation_data.json"):
     """
-    Update conversation history in a JSON file by category.
-    
+    Append the new messages of a conversation to its log.
+
+    Messages that are already in the loaded window (the first message and the recent
+    messages) are not written again, so only the new turn is appended.
+
     Args:
         store: The store containing chat history
         category (str): The category of the conversation
-        file_path (str): The path to the JSON file
+        file_path (str): The legacy JSON file of the user, migrated on first use
     """
-    conversation = {}
+    legacy_path = os.path.join(CHAT_HISTORY_FOLDER, file_path)
+    if os.path.exists(legacy_path):
+        migrate_legacy_file(legacy_path)
 
-    os.makedirs(CHAT_HISTORY_FOLDER, exist_ok=True)
-    file_path = os.path.join(CHAT_HISTORY_FOLDER, file_path)
-
-    # Convert `store` to a dictionary to save
     for user_id, chat_history in store.items():
-        conversation[user_id] = {
-            category: [message_to_dict(msg) for msg in chat_history.messages]
-        }
+        messages = [message_to_dict(msg) for msg in chat_history.messages]
+        messages = [message for message in messages if message]
+        chat_log = get_chat_log(user_id, category)
+        chat_log.append(messages, skip_existing_window=max(RECENT_MESSAGES, len(messages)))
 
-    if os.path.exists(file_path):
-        with open(file_path, 'r', encoding='utf-8') as file:
-            existing_data = json.load(file)
-
-        # Merge new data with existing data
-        for user_id, new_data in conversation.items():
-            if user_id not in existing_data:
-                existing_data[user_id] = new_data
-            else:
-                if category not in existing_data[user_id]:
-                    existing_data[user_id][category] = new_data[category]
-                else:
-                    # Add new messages without duplicates
-                    for message in new_data[category]:
-                        if message not in existing_data[user_id][category]:
-                            existing_data[user_id][category].append(message)
-    else:
-        existing_data = conversation
-
-    with open(file_path, 'w', encoding='utf-8') as file:
-        json.dump(existing_data, file, ensure_ascii=False, indent=4)
+        if CHAT_HISTORY_MAX_MESSAGES and len(chat_log) > CHAT_HISTORY_MAX_MESSAGES:
+            chat_log.compact(CHAT_HISTORY_MAX_MESSAGES)
 
 def load_previous_conversation(user_id, category, file_path="conversation_data.json"):
     """
-    Load conversation history from a JSON file for a specific user and category.
-    
+    Load the first message and the recent messages of a user's conversation in a category.
+
+    Only the needed records are read from the conversation log, through its offset index.
+
     Args:
         user_id (str): The user ID
         category (str): The category of the conversation
-        file_path (str): The path to the JSON file
-        
+        file_path (str): The legacy JSON file of the user, migrated on first use
+
     Returns:
         tuple: A tuple containing the first message and recent messages
     """
-    os.makedirs(CHAT_HISTORY_FOLDER, exist_ok=True)
-    file_path = os.path.join(CHAT_HISTORY_FOLDER, file_path)
-
-    if not os.path.exists(file_path):
-        return None, None
-
-    with open(file_path, 'r', encoding='utf-8') as file:
-        conversation_data = json.load(file)
-
-    if user_id not in conversation_data or category not in conversation_data[user_id]:
-        return None, None
+    legacy_path = os.path.join(CHAT_HISTORY_FOLDER, file_path)
+    if os.path.exists(legacy_path):
+        migrate_legacy_file(legacy_path)
 
-    user_messages = conversation_data[user_id][category]
-    if not user_messages:
+    first_messages, recent_messages = get_chat_log(user_id, category).read_window(first=1, last=RECENT_MESSAGES)
+    if not first_messages:
         return None, None
 
-    first_message = dict_to_message(user_messages[0])
-    recent_messages = [dict_to_message(msg) for msg in user_messages[-5:]]
+    first_message = dict_to_message(first_messages[0])
+    recent_messages = [dict_to_message(msg) for msg in recent_messages]
     return first_message, recent_messages
 
 def initialize_session_from_history(chat_history, first_message, recent_messages):
@@ -0,0 +1,222 @@
+"""
+Chat log utility module.
+This module stores one conversation as an append-only JSONL log with a fixed-width offset index.
+"""
+import json
+import os
+import struct
+from urllib.parse import quote
+
+import portalocker
+
+# Each index entry is the end offset of one record in the log
+INDEX_ENTRY = struct.Struct("<Q")
+
+
+def safe_path_component(name: str) -> str:
+    """
+    Turn a user ID or category into a reversible, path-safe file name.
+
+    Args:
+        name (str): The name
+
+    Returns:
+        str: The percent-encoded name, dots included so "." and ".." cannot escape the folder
+    """
+    return quote(str(name), safe="").replace(".", "%2E")
+
+
+class ChatLog:
+    """
+    Append-only message log of one (user, category) conversation.
+
+    Messages are stored one JSON object per line in `<name>.log`. The companion
+    `<name>.idx` holds the end offset of every record as a little-endian uint64,
+    so the message count, the first message and the last N messages are read with
+    a couple of seeks instead of parsing the whole conversation.
+
+    The index is written after the log, so it only ever covers complete records:
+    a torn write at the end of the log is truncated by the next append, and an
+    index that points past the end of the log is rebuilt by scanning it.
+    """
+    def __init__(self, folder, name):
+        self.log_path = os.path.join(folder, f"{name}.log")
+        self.index_path = os.path.join(folder, f"{name}.idx")
+        self.lock_path = os.path.join(folder, f"{name}.lock")
+
+    def exists(self):
+        """Return True if the log has been created."""
+        return os.path.exists(self.log_path)
+
+    def _lock(self, shared=False):
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        # Non-blocking flags let portalocker retry until the timeout instead of waiting forever
+        flags = (portalocker.LOCK_SH if shared else portalocker.LOCK_EX) | portalocker.LOCK_NB
+        return portalocker.Lock(self.lock_path, mode="a", flags=flags, timeout=30)
+
+    def _read_offsets(self, start, stop):
+        """Read index entries [start, stop)."""
+        if stop <= start:
+            return []
+        with open(self.index_path, "rb") as index_file:
+            index_file.seek(start * INDEX_ENTRY.size)
+            data = index_file.read((stop - start) * INDEX_ENTRY.size)
+        return [entry[0] for entry in INDEX_ENTRY.iter_unpack(data)]
+
+    def _count(self):
+        if not os.path.exists(self.index_path):
+            return 0
+        return os.path.getsize(self.index_path) // INDEX_ENTRY.size
+
+    def _committed_size(self, count):
+        return self._read_offsets(count - 1, count)[0] if count else 0
+
+    def _rebuild_index(self):
+        """Rebuild the index from the complete lines of the log."""
+        offsets = []
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as log_file:
+                position = 0
+                for line in log_file:
+                    if not line.endswith(b"\n"):
+                        break
+                    position += len(line)
+                    offsets.append(position)
+        self._write_index(offsets, self.index_path)
+
+    @staticmethod
+    def _write_index(offsets, path):
+        with open(path, "wb") as index_file:
+            index_file.write(b"".join(INDEX_ENTRY.pack(offset) for offset in offsets))
+            index_file.flush()
+            os.fsync(index_file.fileno())
+
+    def _repair(self):
+        """Bring the log and index back in line after a crash. Must hold the exclusive lock."""
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path) % INDEX_ENTRY.size:
+            with open(self.index_path, "r+b") as index_file:
+                index_file.truncate(self._count() * INDEX_ENTRY.size)
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        committed = self._committed_size(self._count())
+        if committed > log_size or (log_size and not os.path.exists(self.index_path)):
+            self._rebuild_index()
+        elif committed < log_size:
+            with open(self.log_path, "r+b") as log_file:
+                log_file.truncate(committed)
+
+    def _read_range(self, start, stop):
+        """Read records [start, stop) in one read. Must hold a lock."""
+        if stop <= start:
+            return []
+        begin = self._read_offsets(start - 1, start)[0] if start else 0
+        end = self._read_offsets(stop - 1, stop)[0]
+        with open(self.log_path, "rb") as log_file:
+            log_file.seek(begin)
+            data = log_file.read(end - begin)
+        return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+    def __len__(self):
+        with self._lock(shared=True):
+            return self._count()
+
+    def read_window(self, first=1, last=5):
+        """
+        Read the first and the last messages of the conversation.
+
+        Args:
+            first (int): Number of messages from the start
+            last (int): Number of messages from the end
+
+        Returns:
+            tuple: The first messages and the last messages as dictionaries
+        """
+        if not self.exists():
+            return [], []
+        with self._lock(shared=True):
+            count = self._count()
+            log_size = os.path.getsize(self.log_path)
+            if self._committed_size(count) <= log_size and (count or not log_size):
+                return self._read_range(0, min(first, count)), self._read_range(max(count - last, 0), count)
+        # The index is stale or missing after an interrupted write, repair it before reading
+        with self._lock():
+            self._repair()
+            count = self._count()
+            return self._read_range(0, min(first, count)), self._read_range(max(count - last, 0), count)
+
+    def append(self, messages, skip_existing_window=0, only_if_empty=False):
+        """
+        Append messages to the log.
+
+        Args:
+            messages (list): The messages as dictionaries
+            skip_existing_window (int): If set, messages equal to the first message or to one of
+                this many last messages are not appended again
+            only_if_empty (bool): If set, nothing is appended when the log already has messages
+
+        Returns:
+            int: The number of messages appended
+        """
+        with self._lock():
+            self._repair()
+            count = self._count()
+            if only_if_empty and count:
+                return 0
+            if skip_existing_window and count:
+                window = self._read_range(0, 1) + self._read_range(max(count - skip_existing_window, 0), count)
+                messages = [message for message in messages if message not in window]
+            if not messages:
+                return 0
+
+            position = self._committed_size(count)
+            offsets = []
+            with open(self.log_path, "ab") as log_file:
+                for message in messages:
+                    record = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+                    log_file.write(record)
+                    position += len(record)
+                    offsets.append(position)
+                log_file.flush()
+                os.fsync(log_file.fileno())
+            with open(self.index_path, "ab") as index_file:
+                index_file.write(b"".join(INDEX_ENTRY.pack(offset) for offset in offsets))
+                index_file.flush()
+                os.fsync(index_file.fileno())
+            return len(messages)
+
+    def compact(self, max_messages):
+        """
+        Keep the first message and the most recent ones, dropping the middle of the conversation.
+
+        The new log and index are written to temporary files and swapped in with os.replace.
+
+        Args:
+            max_messages (int): The number of messages to keep
+
+        Returns:
+            int: The number of messages dropped
+        """
+        with self._lock():
+            self._repair()
+            count = self._count()
+            if max_messages <= 1 or count <= max_messages:
+                return 0
+            messages = self._read_range(0, 1) + self._read_range(count - max_messages + 1, count)
+
+            temp_log_path = f"{self.log_path}.tmp"
+            temp_index_path = f"{self.index_path}.tmp"
+            offsets = []
+            position = 0
+            with open(temp_log_path, "wb") as log_file:
+                for message in messages:
+                    record = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+                    log_file.write(record)
+                    position += len(record)
+                    offsets.append(position)
+                log_file.flush()
+                os.fsync(log_file.fileno())
+            self._write_index(offsets, temp_index_path)
+
+            # If we stop between the two replaces the old index points past the new log and is rebuilt
+            os.replace(temp_log_path, self.log_path)
+            os.replace(temp_index_path, self.index_path)
+            return count - len(messages)
@@ -0,0 +1,223 @@
+"""
+Checkpoint store module.
+This module records ingestion progress per file and per chunk in a SQLite database in WAL mode.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Set
+
+# Bytes read at a time when hashing a file
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Columns added after the first release, added to older databases when they are opened
+ADDED_FILE_COLUMNS = {"chunking": "TEXT"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    collection TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    chunking TEXT,
+    status TEXT NOT NULL,
+    total_chunks INTEGER,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (collection, file_path)
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    collection TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    committed_at REAL NOT NULL,
+    PRIMARY KEY (collection, file_path, chunk_index)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    details TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def file_content_hash(file_path: str) -> str:
+    """
+    Hash the content of a file.
+
+    Args:
+        file_path (str): The file
+
+    Returns:
+        str: The SHA-256 hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """
+    Ingestion progress of every file, shared by the threads and processes of a run.
+
+    A file is registered with the hash of its content when its ingestion starts, and
+    the index of every chunk is committed once the batch holding it is upserted. A
+    restarted run skips files that are done and resumes the others at their first
+    uncommitted chunk. A file whose content or chunking changed since its checkpoint
+    starts over, its chunk indexes then refer to different chunks.
+
+    Each thread opens its own connection. WAL mode lets readers run alongside the single
+    writer, and writes are short IMMEDIATE transactions that wait on a busy timeout, so
+    concurrent workers can share the database safely.
+    """
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        # A forked worker must not reuse the connection of its parent
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(files)")}
+            for column, column_type in ADDED_FILE_COLUMNS.items():
+                if column not in columns:
+                    connection.execute(f"ALTER TABLE files ADD COLUMN {column} {column_type}")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        # IMMEDIATE takes the write lock up front, so two writers never deadlock on an upgrade
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def is_done(self, collection, file_path, content_hash):
+        """
+        Check whether a file with this content has been fully ingested into a collection.
+
+        Args:
+            collection (str): The collection
+            file_path (str): The file
+            content_hash (str): The hash of the current file content
+
+        Returns:
+            bool: True if the file is done and has not changed since
+        """
+        row = self._connection().execute(
+            "SELECT content_hash, status FROM files WHERE collection = ? AND file_path = ?",
+            (collection, file_path),
+        ).fetchone()
+        return row is not None and row[0] == content_hash and row[1] == "done"
+
+    def start_file(self, collection, file_path, content_hash, chunking=None) -> Set[int]:
+        """
+        Register a file whose ingestion starts or resumes.
+
+        Args:
+            collection (str): The collection
+            file_path (str): The file
+            content_hash (str): The hash of the current file content
+            chunking (str, optional): How the file is split into chunks, e.g. the chunker mode
+                and whether the file is streamed; chunk indexes only match for the same chunking
+
+        Returns:
+            set: The indexes of the chunks already committed, empty if the file is new or
+                changed or is now chunked differently
+        """
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT content_hash, chunking FROM files WHERE collection = ? AND file_path = ?",
+                (collection, file_path),
+            ).fetchone()
+            if row is not None and row[0] == content_hash and row[1] == chunking:
+                connection.execute(
+                    "UPDATE files SET status = 'in_progress', updated_at = ? WHERE collection = ? AND file_path = ?",
+                    (time.time(), collection, file_path),
+                )
+                committed = connection.execute(
+                    "SELECT chunk_index FROM chunks WHERE collection = ? AND file_path = ?",
+                    (collection, file_path),
+                ).fetchall()
+                return {chunk_index for (chunk_index,) in committed}
+
+            # New, changed or differently chunked file, the chunk indexes of the checkpoint mean nothing
+            connection.execute("DELETE FROM chunks WHERE collection = ? AND file_path = ?", (collection, file_path))
+            connection.execute(
+                "INSERT OR REPLACE INTO files (collection, file_path, content_hash, chunking, status, total_chunks, updated_at) "
+                "VALUES (?, ?, ?, ?, 'in_progress', NULL, ?)",
+                (collection, file_path, content_hash, chunking, time.time()),
+            )
+            return set()
+
+    def commit_chunks(self, collection, file_path, chunk_indexes: Iterable[int]):
+        """
+        Record chunks whose points have been upserted.
+
+        Args:
+            collection (str): The collection
+            file_path (str): The file
+            chunk_indexes (iterable): The indexes of the chunks in the file
+        """
+        now = time.time()
+        rows = [(collection, file_path, int(chunk_index), now) for chunk_index in chunk_indexes]
+        if not rows:
+            return
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO chunks (collection, file_path, chunk_index, committed_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            connection.execute(
+                "UPDATE files SET updated_at = ? WHERE collection = ? AND file_path = ?",
+                (now, collection, file_path),
+            )
+
+    def finish_file(self, collection, file_path, total_chunks):
+        """
+        Mark a file as fully ingested and drop its chunk records.
+
+        Args:
+            collection (str): The collection
+            file_path (str): The file
+            total_chunks (int): The number of chunks of the file
+        """
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE files SET status = 'done', total_chunks = ?, updated_at = ? WHERE collection = ? AND file_path = ?",
+                (total_chunks, time.time(), collection, file_path),
+            )
+            connection.execute("DELETE FROM chunks WHERE collection = ? AND file_path = ?", (collection, file_path))
+
+    def record_event(self, kind, details):
+        """
+        Record a run event, such as a forced exit, for later inspection.
+
+        Args:
+            kind (str): The event type
+            details (dict): JSON-serializable details
+        """
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO events (kind, details, created_at) VALUES (?, ?, ?)",
+                (kind, json.dumps(details, ensure_ascii=False), time.time()),
+            )
@@ -0,0 +1,232 @@
+"""
+Embedding cache utility module.
+This module caches query embeddings per embedding model, in memory (LRU) with an optional SQLite tier that survives restarts.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.config.settings import QUERY_EMBEDDING_CACHE_DB, QUERY_EMBEDDING_CACHE_DB_MAX_ENTRIES, \
+    QUERY_EMBEDDING_CACHE_SIZE
+
+# Rows written to the disk tier between two prunings
+DISK_PRUNE_INTERVAL = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_embeddings (
+    model TEXT NOT NULL,
+    query_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, query_hash)
+);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query for embedding cache lookups.
+
+    Vietnamese text reaches us both precomposed and with combining diacritics, NFC maps
+    both to the same string. Case and punctuation are kept, the model sees them.
+
+    Args:
+        query (str): The query
+
+    Returns:
+        str: The NFC-normalized query with collapsed whitespace
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", query)).strip()
+
+def model_identity(embeddings: Embeddings) -> str:
+    """
+    Get a stable name for an embedding model.
+
+    Args:
+        embeddings (Embeddings): The embedding model
+
+    Returns:
+        str: The model class and name or path, e.g. "HuggingFaceEmbeddings:./vietnamese-bi-encoder"
+    """
+    name = getattr(embeddings, "model_name", None) or getattr(embeddings, "model", None)
+    # Without a name, the vectors cannot be shared with other instances or processes
+    return f"{type(embeddings).__name__}:{name if name else id(embeddings)}"
+
+
+class QueryEmbeddingCache:
+    """
+    Process-wide cache of query embeddings keyed by (model, normalized query).
+
+    The memory tier is an LRU bounded to max_entries. The optional disk tier is a
+    SQLite database keeping the most recent max_disk_entries vectors across restarts;
+    a disk hit is promoted to memory. All methods are thread-safe.
+    """
+    def __init__(self, max_entries=QUERY_EMBEDDING_CACHE_SIZE, db_path=QUERY_EMBEDDING_CACHE_DB,
+                 max_disk_entries=QUERY_EMBEDDING_CACHE_DB_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._connection = None
+        self._disk_writes = 0
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _disk(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    @staticmethod
+    def _query_hash(query: str) -> str:
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+    def _read_disk(self, model: str, query: str) -> Optional[np.ndarray]:
+        if not self.db_path:
+            return None
+        with self._disk_lock:
+            row = self._disk().execute(
+                "SELECT vector FROM query_embeddings WHERE model = ? AND query_hash = ?",
+                (model, self._query_hash(query)),
+            ).fetchone()
+        return np.frombuffer(row[0], dtype=np.float32) if row else None
+
+    def _write_disk(self, model: str, query: str, vector: np.ndarray):
+        if not self.db_path:
+            return
+        with self._disk_lock:
+            connection = self._disk()
+            connection.execute(
+                "INSERT OR REPLACE INTO query_embeddings (model, query_hash, vector) VALUES (?, ?, ?)",
+                (model, self._query_hash(query), vector.tobytes()),
+            )
+            self._disk_writes += 1
+            if self._disk_writes % DISK_PRUNE_INTERVAL == 0:
+                # Rowids grow with every write, the lowest ones are the oldest vectors
+                connection.execute(
+                    "DELETE FROM query_embeddings WHERE rowid <= (SELECT MAX(rowid) FROM query_embeddings) - ?",
+                    (self.max_disk_entries,),
+                )
+
+    def get(self, model: str, query: str) -> Optional[List[float]]:
+        """
+        Look up the embedding of a query.
+
+        Args:
+            model (str): The model identity
+            query (str): The normalized query
+
+        Returns:
+            List[float]: The cached embedding or None on a miss
+        """
+        key = (model, query)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return vector.tolist()
+
+        vector = self._read_disk(model, query)
+        with self._lock:
+            if vector is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._store(key, vector)
+        return vector.tolist()
+
+    def put(self, model: str, query: str, embedding: List[float]):
+        """
+        Store the embedding of a query.
+
+        Args:
+            model (str): The model identity
+            query (str): The normalized query
+            embedding (List[float]): The embedding
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._store((model, query), vector)
+        self._write_disk(model, query, vector)
+
+    def _store(self, key, vector):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached embedding, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+        if self.db_path and os.path.exists(self.db_path):
+            with self._disk_lock:
+                self._disk().execute("DELETE FROM query_embeddings")
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Memory hits, disk hits and misses since start, and the entries in memory
+        """
+        with self._lock:
+            return {**self._counters, "size": len(self._entries)}
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Embedding model wrapper that serves embed_query from the shared query cache.
+
+    Document embeddings pass through uncached, they are computed once at ingestion.
+    """
+    def __init__(self, embeddings: Embeddings, cache: Optional[QueryEmbeddingCache] = None):
+        self.embeddings = embeddings
+        self.cache = cache or query_embedding_cache
+        self.model = model_identity(embeddings)
+
+    def __getattr__(self, name):
+        # Expose the wrapped model, e.g. its tokenizer for batch planning
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        query = normalize_query(text)
+        embedding = self.cache.get(self.model, query)
+        if embedding is None:
+            embedding = self.embeddings.embed_query(query)
+            self.cache.put(self.model, query, embedding)
+        return embedding
+
+    async def aembed_query(self, text: str) -> List[float]:
+        query = normalize_query(text)
+        embedding = self.cache.get(self.model, query)
+        if embedding is None:
+            embedding = await self.embeddings.aembed_query(query)
+            self.cache.put(self.model, query, embedding)
+        return embedding
+
+
+# Shared cache of every registered embedding model
+query_embedding_cache = QueryEmbeddingCache()
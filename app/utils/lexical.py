@@ -0,0 +1,152 @@
+"""
+Lexical vector utility module.
+This module builds the sparse "lexical" vectors that let hybrid search match exact terms and legal identifiers such as 146/2018/NĐ-CP.
+"""
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+from typing import List
+
+from qdrant_client.models import Modifier, PointStruct, SparseIndexParams, SparseVector, SparseVectorParams
+
+from app.config.settings import HYBRID_SEARCH_ENABLED
+
+# Name of the sparse vector stored next to the "content" dense vector
+LEXICAL_VECTOR_NAME = "lexical"
+
+# Words, and identifiers whose parts are joined by "/", "-" or "." (146/2018/nđ-cp, 10.5)
+TOKEN_PATTERN = re.compile(r"\w+(?:[/\-.]\w+)*")
+IDENTIFIER_SEPARATORS = re.compile(r"[/\-.]")
+
+# Term frequency saturation, as in BM25; document length is not normalized
+TF_SATURATION = 1.2
+
+
+def lexical_tokens(text: str) -> List[str]:
+    """
+    Split a text into lexical terms.
+
+    A compound identifier is kept whole, for exact matches, and also split into its
+    parts. Pairs of adjacent words are added too: most Vietnamese words have two
+    syllables ("nghị định"), so single syllables alone match too loosely.
+
+    Args:
+        text (str): The text
+
+    Returns:
+        List[str]: The terms, lowercased and NFC-normalized, with repeats
+    """
+    text = unicodedata.normalize("NFC", text).lower()
+    terms = []
+    words = []
+    for match in TOKEN_PATTERN.finditer(text):
+        token = match.group()
+        parts = IDENTIFIER_SEPARATORS.split(token)
+        if len(parts) > 1:
+            terms.append(token)
+        words.extend(parts)
+    terms.extend(words)
+    terms.extend(f"{first} {second}" for first, second in zip(words, words[1:]))
+    return terms
+
+def term_index(term: str) -> int:
+    """
+    Get the sparse vector dimension of a term.
+
+    Args:
+        term (str): The term
+
+    Returns:
+        int: A stable 32-bit hash of the term, identical across processes
+    """
+    return int(hashlib.md5(term.encode("utf-8")).hexdigest()[:8], 16)
+
+def _sparse_vector(weights: Counter) -> SparseVector:
+    # Terms whose hashes collide share a dimension
+    dimensions = Counter()
+    for term, weight in weights.items():
+        dimensions[term_index(term)] += weight
+    indices = sorted(dimensions)
+    return SparseVector(indices=indices, values=[float(dimensions[index]) for index in indices])
+
+def document_lexical_vector(text: str) -> SparseVector:
+    """
+    Build the lexical vector of a chunk.
+
+    Values are saturated term frequencies; Qdrant applies the IDF of each term at query time.
+
+    Args:
+        text (str): The chunk text
+
+    Returns:
+        SparseVector: The lexical vector
+    """
+    counts = Counter(lexical_tokens(text))
+    return _sparse_vector(Counter({
+        term: count * (TF_SATURATION + 1) / (count + TF_SATURATION) for term, count in counts.items()
+    }))
+
+def query_lexical_vector(text: str) -> SparseVector:
+    """
+    Build the lexical vector of a query, each distinct term weighing 1.
+
+    Args:
+        text (str): The query
+
+    Returns:
+        SparseVector: The lexical vector
+    """
+    return _sparse_vector(Counter(set(lexical_tokens(text))))
+
+def with_lexical_vector(point) -> PointStruct:
+    """
+    Copy a stored point, adding the lexical vector of its page content.
+
+    Args:
+        point: A PointStruct or a Record with its payload and dense vector
+
+    Returns:
+        PointStruct: The point with both vectors
+    """
+    payload = point.payload or {}
+    vectors = dict(point.vector or {})
+    vectors[LEXICAL_VECTOR_NAME] = document_lexical_vector(payload.get("page_content", ""))
+    return PointStruct(id=point.id, vector=vectors, payload=payload)
+
+def sparse_vectors_config(on_disk: bool = False):
+    """
+    Build the sparse vectors config of a new collection.
+
+    Args:
+        on_disk (bool): Keep the sparse index on disk
+
+    Returns:
+        dict: The lexical vector with the IDF modifier, None if hybrid search is disabled
+    """
+    if not HYBRID_SEARCH_ENABLED:
+        return None
+    return {LEXICAL_VECTOR_NAME: SparseVectorParams(index=SparseIndexParams(on_disk=on_disk), modifier=Modifier.IDF)}
+
+def has_lexical_vectors(client, collection_name: str) -> bool:
+    """
+    Check whether a collection stores lexical vectors.
+
+    Collections created before hybrid search have none until migrate_lexical.py rebuilds them.
+
+    Args:
+        client: The QdrantClient
+        collection_name (str): The collection
+
+    Returns:
+        bool: True if points of the collection can carry a lexical vector
+    """
+    return _stores_lexical(client.get_collection(collection_name))
+
+async def ahas_lexical_vectors(async_client, collection_name: str) -> bool:
+    """Async counterpart of has_lexical_vectors, with an AsyncQdrantClient."""
+    return _stores_lexical(await async_client.get_collection(collection_name))
+
+def _stores_lexical(collection_info) -> bool:
+    sparse_vectors = collection_info.config.params.sparse_vectors or {}
+    return LEXICAL_VECTOR_NAME in sparse_vectors
@@ -1,17 +1,22 @@
+import heapq
 import re
-from typing import List
+from typing import List, NamedTuple
 
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from underthesea import sent_tokenize  # Thư viện NLP tiếng Việt
-import re
-from typing import List
 
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from underthesea import sent_tokenize  # Thư viện NLP tiếng Việt
+# Số câu được tính độ tương đồng cùng lúc trong banded_similarities
+SIMILARITY_BLOCK_SIZE = 512
+
+
+class PooledChunk(NamedTuple):
+    """Chunk tạo từ embedding của câu, kèm vector gộp và độ tin cậy của vector đó"""
+    text: str
+    sentences: List[int]
+    vector: np.ndarray
+    fidelity: float
 
 
 class SemanticChunker:
@@ -64,6 +69,75 @@ class SemanticChunker:
 
         return boundaries
 
+    def banded_similarities(self, vectors) -> np.ndarray:
+        """
+        Tính độ tương đồng của mỗi câu với tối đa max_sentences câu đứng ngay trước nó.
+
+        Chỉ tính dải cần cho việc tìm ranh giới, theo từng khối câu, nên bộ nhớ là
+        O(n * max_sentences) thay vì ma trận n x n.
+
+        Args:
+            vectors: Ma trận vector của các câu (TF-IDF hoặc embedding), mỗi hàng một câu
+
+        Returns:
+            Ma trận n x max_sentences, ô [i, k] là độ tương đồng giữa câu i và câu
+            i - max_sentences + k (bằng 0 nếu câu đó không tồn tại)
+        """
+        n_sentences = vectors.shape[0]
+        width = max(self.max_sentences, 1)
+        band = np.zeros((n_sentences, width))
+        offsets = np.arange(width) - width
+        for block_start in range(0, n_sentences, SIMILARITY_BLOCK_SIZE):
+            block_end = min(block_start + SIMILARITY_BLOCK_SIZE, n_sentences)
+            context_start = max(block_start - width, 0)
+            block = cosine_similarity(vectors[block_start:block_end], vectors[context_start:block_end])
+
+            rows = np.arange(block_start, block_end)
+            columns = rows[:, None] + offsets[None, :]
+            valid = columns >= 0
+            values = block[(rows - block_start)[:, None], np.maximum(columns, context_start) - context_start]
+            band[block_start:block_end] = np.where(valid, values, 0.0)
+        return band
+
+    def calculate_banded_similarities(self, sentences: List[str]) -> np.ndarray:
+        """Tính dải độ tương đồng TF-IDF giữa mỗi câu và các câu đứng trước nó"""
+        sentence_vectors = self.vectorizer.fit_transform(sentences)# Vectorize các câu
+        return self.banded_similarities(sentence_vectors)
+
+    def find_banded_boundaries(self, band: np.ndarray) -> List[int]:
+        """
+        Tìm ranh giới ngữ nghĩa từ dải độ tương đồng, cho kết quả như find_semantic_boundaries.
+
+        Độ tương đồng trung bình của câu i với k câu trước nó được lấy sẵn từ tổng tích lũy
+        của dải. Khi chunk hiện tại đã dài hơn max_sentences thì không thể tạo thêm ranh
+        giới nào nữa nên dừng sớm.
+
+        Args:
+            band: Dải độ tương đồng từ banded_similarities
+
+        Returns:
+            Danh sách vị trí kết thúc của các chunk
+        """
+        n_sentences, width = band.shape
+        # averages[i, k - 1] là độ tương đồng trung bình của câu i với k câu ngay trước nó
+        averages = np.cumsum(band[:, ::-1], axis=1) / np.arange(1, width + 1)
+        boundaries = []
+        current_start = 0
+
+        for i in range(1, n_sentences):
+            window = i - current_start
+            if window > self.max_sentences:
+                break
+            if window >= self.min_sentences and averages[i, window - 1] < self.similarity_threshold:
+                boundaries.append(i)
+                current_start = i
+
+        # Xử lý phần còn lại
+        if current_start < n_sentences:
+            boundaries.append(n_sentences)
+
+        return boundaries
+
     def merge_small_chunks(self, chunks: List[str]) -> List[str]:
         """Gộp các chunk nhỏ với chunk lân cận có độ tương đồng cao nhất"""
         if len(chunks) <= 1:
@@ -104,29 +178,274 @@ class SemanticChunker:
 
         return chunks
 
-    def create_semantic_chunks(self, text: str) -> List[str]:
-        """Tạo các chunk dựa trên ngữ nghĩa"""
-        sentences = self.split_into_sentences(text) # Tách câu
+    def merge_small_sentence_groups(self, sentences: List[str], groups: List[List[int]]) -> List[List[int]]:
+        """
+        Gộp các nhóm câu nhỏ với nhóm lân cận có độ tương đồng cao nhất.
+
+        Cho kết quả như merge_small_chunks nhưng không tách câu lại và không fit lại
+        TF-IDF ở mỗi vòng: câu được vector hóa một lần, vector của nhóm là tổng vector
+        các câu (cộng bigram nối giữa hai câu liền nhau), df/idf được cập nhật tăng dần
+        và nhóm nhỏ nhất được lấy ra từ heap theo (số câu, vị trí).
+
+        Từ vựng được chọn một lần theo max_features trên các nhóm ban đầu, giống lần fit
+        đầu tiên của merge_small_chunks.
+
+        Args:
+            sentences: Các câu của văn bản
+            groups: Chỉ số câu của từng nhóm, theo thứ tự trong văn bản
+
+        Returns:
+            Chỉ số câu của các nhóm sau khi gộp, theo thứ tự nội dung của chunk
+        """
+        if len(groups) <= 1 or min(len(group) for group in groups) >= self.min_sentences:
+            return groups
+
+        counter = CountVectorizer(
+            ngram_range=self.vectorizer.ngram_range,
+            max_features=self.vectorizer.max_features,
+            strip_accents=self.vectorizer.strip_accents
+        )
+        counter.fit([' '.join(sentences[i] for i in group) for group in groups])
+        vocabulary = dict(counter.vocabulary_)
+        max_features = counter.max_features or float("inf")
+        # Khi từ vựng chưa bị cắt bởi max_features, bigram mới sinh ra khi gộp cũng được thêm vào như khi fit lại
+        can_grow = len(vocabulary) < max_features
+        sentence_counts = counter.transform(sentences).tocsr()
+        preprocess = counter.build_preprocessor()
+        tokenize = counter.build_tokenizer()
+        tokens = [tokenize(preprocess(sentence)) for sentence in sentences]
+
+        df = np.zeros(len(vocabulary), dtype=np.int64)
+
+        def term_id(term):
+            nonlocal df
+            if term in vocabulary:
+                return vocabulary[term]
+            if not can_grow or len(vocabulary) >= max_features:
+                return None
+            vocabulary[term] = len(vocabulary)
+            df = np.append(df, 0)
+            return vocabulary[term]
+
+        def junction(last_token, first_token):
+            # Bigram nối token cuối của phần trước với token đầu của phần sau
+            if last_token is None or first_token is None or self.vectorizer.ngram_range[1] < 2:
+                return None
+            return term_id(f"{last_token} {first_token}")
+
+        def add_terms(ids, counts, extra_ids):
+            if extra_ids:
+                ids = np.concatenate([ids, np.asarray(extra_ids, dtype=ids.dtype)])
+                counts = np.concatenate([counts, np.ones(len(extra_ids))])
+            ids, inverse = np.unique(ids, return_inverse=True)
+            return ids, np.bincount(inverse, weights=counts)
+
+        # Trạng thái của từng nhóm, đánh chỉ số theo vị trí ban đầu
+        orders, sizes, term_ids, term_counts, first_tokens, last_tokens = [], [], [], [], [], []
+        for group in groups:
+            rows = sentence_counts[group]
+            extra_ids = []
+            first_token = last_token = None
+            for i in group:
+                if not tokens[i]:
+                    continue
+                extra_id = junction(last_token, tokens[i][0])
+                if extra_id is not None:
+                    extra_ids.append(extra_id)
+                first_token = tokens[i][0] if first_token is None else first_token
+                last_token = tokens[i][-1]
+            ids, counts = add_terms(rows.indices.astype(np.int64), rows.data.astype(np.float64), extra_ids)
+            orders.append(list(group))
+            sizes.append(len(group))
+            term_ids.append(ids)
+            term_counts.append(counts)
+            first_tokens.append(first_token)
+            last_tokens.append(last_token)
+        for ids in term_ids:
+            df[ids] += 1
+
+        n_chunks = len(groups)
+
+        def similarity(a, b):
+            idf_a = np.log((1 + n_chunks) / (1 + df[term_ids[a]])) + 1
+            idf_b = np.log((1 + n_chunks) / (1 + df[term_ids[b]])) + 1
+            weights_a = term_counts[a] * idf_a
+            weights_b = term_counts[b] * idf_b
+            norm = np.sqrt(np.dot(weights_a, weights_a)) * np.sqrt(np.dot(weights_b, weights_b))
+            if norm == 0:
+                return 0.0
+            _, index_a, index_b = np.intersect1d(term_ids[a], term_ids[b], assume_unique=True, return_indices=True)
+            return float(np.dot(weights_a[index_a], weights_b[index_b]) / norm)
+
+        def merge(small, best, keep):
+            nonlocal n_chunks
+            common = np.intersect1d(term_ids[small], term_ids[best], assume_unique=True)
+            df[common] -= 1
+            extra_id = junction(last_tokens[small], first_tokens[best])
+            ids, counts = add_terms(
+                np.concatenate([term_ids[small], term_ids[best]]),
+                np.concatenate([term_counts[small], term_counts[best]]),
+                [extra_id] if extra_id is not None else []
+            )
+            if extra_id is not None and not (np.isin(extra_id, term_ids[small]) or np.isin(extra_id, term_ids[best])):
+                df[extra_id] += 1
+
+            orders[keep] = orders[small] + orders[best]
+            term_ids[keep], term_counts[keep] = ids, counts
+            first_tokens[keep] = first_tokens[small] if first_tokens[small] is not None else first_tokens[best]
+            last_tokens[keep] = last_tokens[best] if last_tokens[best] is not None else last_tokens[small]
+            n_chunks -= 1
+
+        return [orders[position] for position in self._merge_smallest(sizes, similarity, merge)]
+
+    def _merge_smallest(self, sizes: List[int], similarity, merge) -> List[int]:
+        """
+        Gộp nhóm nhỏ nhất với nhóm lân cận giống nó nhất cho tới khi mọi nhóm đủ min_sentences câu.
+
+        Thứ tự gộp như merge_small_chunks: nhóm nhỏ nhất đứng trước được chọn trước, khi hai
+        nhóm lân cận giống như nhau thì chọn nhóm bên trái, nhóm gộp nằm ở vị trí bên trái.
+
+        Args:
+            sizes: Số câu của từng nhóm, được cập nhật khi gộp
+            similarity: Hàm (small, neighbor) trả về độ tương đồng giữa hai nhóm
+            merge: Hàm (small, neighbor, keep) gộp nội dung của nhóm nhỏ rồi đến nhóm lân cận vào vị trí keep
+
+        Returns:
+            Vị trí ban đầu của các nhóm còn lại, theo thứ tự trong văn bản
+        """
+        n_groups = len(sizes)
+        previous = list(range(-1, n_groups - 1))
+        following = list(range(1, n_groups + 1))
+        following[-1] = -1
+        alive = [True] * n_groups
+        heap = [(size, position) for position, size in enumerate(sizes)]
+        heapq.heapify(heap)
+
+        while heap:
+            size, small = heapq.heappop(heap)
+            # Bỏ qua mục cũ của nhóm đã bị gộp hoặc đã lớn lên
+            if not alive[small] or size != sizes[small]:
+                continue
+            if size >= self.min_sentences:
+                break
+
+            neighbor_similarities = []
+            if previous[small] != -1:
+                neighbor_similarities.append((previous[small], similarity(small, previous[small])))
+            if following[small] != -1:
+                neighbor_similarities.append((following[small], similarity(small, following[small])))
+            if not neighbor_similarities:
+                break
+            best = max(neighbor_similarities, key=lambda x: x[1])[0]
+
+            # Nội dung gộp luôn là nhóm nhỏ rồi đến nhóm lân cận, đặt ở vị trí bên trái
+            keep, drop = min(small, best), max(small, best)
+            merge(small, best, keep)
+            sizes[keep] = sizes[small] + sizes[best]
+
+            alive[drop] = False
+            following[keep] = following[drop]
+            if following[drop] != -1:
+                previous[following[drop]] = keep
+            heapq.heappush(heap, (sizes[keep], keep))
+
+        return [position for position in range(n_groups) if alive[position]]
+
+    def create_sentence_groups(self, sentences: List[str]) -> List[List[int]]:
+        """Chia các câu đã tách thành các nhóm câu theo ngữ nghĩa, trả về chỉ số câu của từng nhóm"""
         if len(sentences) <= self.min_sentences:
-            return [text]
+            return [list(range(len(sentences)))] if sentences else []
 
-        # Tính ma trận độ tương đồng
-        similarity_matrix = self.calculate_sentence_similarities(sentences)
+        # Tính dải độ tương đồng giữa mỗi câu và các câu đứng trước
+        band = self.calculate_banded_similarities(sentences)
         
         # Tìm ranh giới ngữ nghĩa
-        boundaries = self.find_semantic_boundaries(similarity_matrix)
+        boundaries = self.find_banded_boundaries(band)
         
-        # Tạo chunks từ boundaries
-        chunks = []
+        # Tạo các nhóm câu từ boundaries
+        groups = []
         start = 0
         for boundary in boundaries:
-            chunk = ' '.join(sentences[start:boundary])
-            chunks.append(chunk)
+            groups.append(list(range(start, boundary)))
             start = boundary
             
-        # Gộp các chunk nhỏ
-        chunks = self.merge_small_chunks(chunks)
-        
+        # Gộp các nhóm nhỏ, câu đã tách được dùng lại theo chỉ số
+        return self.merge_small_sentence_groups(sentences, groups)
+
+    def create_semantic_chunks(self, text: str) -> List[str]:
+        """Tạo các chunk dựa trên ngữ nghĩa"""
+        sentences = self.split_into_sentences(text) # Tách câu
+        if len(sentences) <= self.min_sentences:
+            return [text]
+
+        groups = self.create_sentence_groups(sentences)
+        return [' '.join(sentences[i] for i in group) for group in groups]
+
+    def create_chunks_from_vectors(self, sentences: List[str], vectors, weights=None) -> List[PooledChunk]:
+        """
+        Tạo các chunk từ vector embedding có sẵn của từng câu, không cần embed lại chunk.
+
+        Ranh giới và việc gộp nhóm nhỏ giống create_semantic_chunks nhưng dùng độ tương
+        đồng cosine của embedding. Vector của chunk là trung bình các vector câu, có trọng
+        số theo số token (gần với mean pooling của mô hình trên cả chunk).
+
+        Args:
+            sentences: Các câu của văn bản
+            vectors: Embedding của từng câu
+            weights: Trọng số của từng câu khi gộp vector, thường là số token (mặc định bằng nhau)
+
+        Returns:
+            Danh sách PooledChunk theo thứ tự trong văn bản
+        """
+        if not sentences:
+            return []
+        vectors = np.asarray(vectors, dtype=np.float64)
+        weights = np.ones(len(sentences)) if weights is None else np.asarray(weights, dtype=np.float64)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        unit_vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+        if len(sentences) <= self.min_sentences:
+            groups = [list(range(len(sentences)))]
+        else:
+            # Tìm ranh giới ngữ nghĩa trên dải độ tương đồng của embedding
+            boundaries = self.find_banded_boundaries(self.banded_similarities(unit_vectors))
+            groups = []
+            start = 0
+            for boundary in boundaries:
+                groups.append(list(range(start, boundary)))
+                start = boundary
+
+        # Tổng có trọng số của vector câu trong mỗi nhóm, đủ để gộp nhóm mà không tính lại
+        pooled = [weights[group] @ vectors[group] for group in groups]
+        pooled_units = [weights[group] @ unit_vectors[group] for group in groups]
+        total_weights = [weights[group].sum() for group in groups]
+
+        def similarity(a, b):
+            norm = np.linalg.norm(pooled[a]) * np.linalg.norm(pooled[b])
+            return float(pooled[a] @ pooled[b] / norm) if norm > 0 else 0.0
+
+        def merge(small, best, keep):
+            groups[keep] = groups[small] + groups[best]
+            pooled[keep] = pooled[small] + pooled[best]
+            pooled_units[keep] = pooled_units[small] + pooled_units[best]
+            total_weights[keep] = total_weights[small] + total_weights[best]
+
+        if len(groups) > 1 and min(len(group) for group in groups) < self.min_sentences:
+            positions = self._merge_smallest([len(group) for group in groups], similarity, merge)
+        else:
+            positions = range(len(groups))
+
+        chunks = []
+        for position in positions:
+            total = total_weights[position] or 1.0
+            # Độ dài của trung bình các vector đơn vị: 1 khi các câu cùng hướng, nhỏ khi chúng khác nhau
+            fidelity = float(np.linalg.norm(pooled_units[position]) / total)
+            chunks.append(PooledChunk(
+                text=' '.join(sentences[i] for i in groups[position]),
+                sentences=groups[position],
+                vector=pooled[position] / total,
+                fidelity=fidelity
+            ))
         return chunks
 
     def analyze_chunk_coherence(self, chunk: str) -> float:
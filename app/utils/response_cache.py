@@ -0,0 +1,298 @@
+"""
+Response cache utility module.
+This module caches answers per collection with an exact tier and an embedding-similarity tier, persisted under response_cache/.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.config.settings import RESPONSE_CACHE_FOLDER, RESPONSE_CACHE_TTL, RESPONSE_CACHE_SIMILARITY_THRESHOLD, \
+    RESPONSE_CACHE_MAX_COLLECTIONS, RESPONSE_CACHE_MAX_ENTRIES
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize a question for cache lookups.
+
+    Args:
+        question (str): The question
+
+    Returns:
+        str: The lowercased question with collapsed whitespace and no trailing punctuation
+    """
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.rstrip(" ?.!…")
+
+def _question_key(normalized_question: str) -> str:
+    return hashlib.sha256(normalized_question.encode("utf-8")).hexdigest()
+
+def _collection_file_name(collection_name: str) -> str:
+    # Keep the name readable but safe, the hash suffix avoids collisions after sanitizing
+    safe_name = re.sub(r"[^\w\-]", "_", collection_name)[:64]
+    digest = hashlib.md5(collection_name.encode("utf-8")).hexdigest()[:8]
+    return f"{safe_name}-{digest}.jsonl"
+
+
+class _CollectionCache:
+    """
+    Cached answers of one collection, mirrored by an append-only JSONL file.
+
+    The file is read on first use under the lock of the collection, so a cold load
+    only holds up the requests of this collection. Callers hold the lock around every
+    other method too.
+    """
+    def __init__(self, file_path, ttl, max_entries):
+        self.file_path = file_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.dropped = False  # Set when invalidated, the file must not be written again
+        self._loaded = False
+        self._matrix = None
+        self._matrix_keys = []
+        self._matrix_created_at = None
+
+    def load(self):
+        if not self._loaded:
+            self._loaded = True
+            self._load()
+
+    def _is_expired(self, entry, now=None):
+        return self.ttl > 0 and (now or time.time()) - entry["created_at"] > self.ttl
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        now = time.time()
+        line_count = 0
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            for line in file:
+                line_count += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash, skip it
+                    continue
+                if self._is_expired(entry, now):
+                    continue
+                self.entries[entry["key"]] = entry
+                self.entries.move_to_end(entry["key"])
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        # Rewrite the file once most of it is stale or superseded
+        if line_count > 2 * len(self.entries):
+            self._compact()
+
+    def _compact(self):
+        temp_path = f"{self.file_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            for entry in self.entries.values():
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(temp_path, self.file_path)
+
+    def _semantic_matrix(self):
+        if self._matrix is None:
+            self._matrix_keys = [key for key, entry in self.entries.items() if entry.get("embedding")]
+            if self._matrix_keys:
+                self._matrix = np.array([self.entries[key]["embedding"] for key in self._matrix_keys], dtype=np.float32)
+            else:
+                self._matrix = np.zeros((0, 0), dtype=np.float32)
+            self._matrix_created_at = np.array([self.entries[key]["created_at"] for key in self._matrix_keys],
+                                               dtype=np.float64)
+        return self._matrix
+
+    def get_exact(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if self._is_expired(entry):
+            del self.entries[key]
+            self._matrix = None
+            return None
+        return entry
+
+    def get_similar(self, embedding, threshold):
+        matrix = self._semantic_matrix()
+        if matrix.shape[0] == 0:
+            return None, 0.0
+        # Stored embeddings are unit length, so the dot product is the cosine similarity
+        similarities = matrix @ embedding
+        if self.ttl > 0:
+            # An expired best match must not hide a valid one below it
+            similarities[time.time() - self._matrix_created_at > self.ttl] = -np.inf
+        best = int(np.argmax(similarities))
+        score = float(similarities[best])
+        if score < threshold:
+            return None, score
+        entry = self.get_exact(self._matrix_keys[best])
+        return entry, score
+
+    def put(self, entry):
+        self.entries[entry["key"]] = entry
+        self.entries.move_to_end(entry["key"])
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self._matrix = None
+        if self.dropped:
+            return
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class ResponseCache:
+    """
+    Two-tier answer cache keyed by (collection, normalized question).
+
+    The exact tier matches the hash of the normalized question. The semantic tier
+    matches the embedding of the question against cached questions of the same
+    collection with a cosine similarity threshold. Entries expire after the TTL and
+    are persisted on disk, with the most recently used collections kept in memory.
+
+    Collections listed in shared_collections back every answer, so changing one of
+    them clears the whole cache.
+
+    The registry lock only guards the collection list and counters, each collection
+    has its own lock for its entries and file.
+    """
+    def __init__(self, folder=RESPONSE_CACHE_FOLDER, ttl=RESPONSE_CACHE_TTL,
+                 similarity_threshold=RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+                 max_collections=RESPONSE_CACHE_MAX_COLLECTIONS, max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+                 shared_collections=("base_knowledge",)):
+        self.folder = folder
+        self.shared_collections = frozenset(shared_collections)
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.max_collections = max_collections
+        self.max_entries = max_entries
+        self._collections = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def _get_collection(self, collection_name):
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            file_path = os.path.join(self.folder, _collection_file_name(collection_name))
+            collection = _CollectionCache(file_path, self.ttl, self.max_entries)
+            self._collections[collection_name] = collection
+            while len(self._collections) > self.max_collections:
+                self._collections.popitem(last=False)
+        self._collections.move_to_end(collection_name)
+        return collection
+
+    @staticmethod
+    def _drop(collection):
+        # Wait for a request using the collection, so it cannot write the file once deleted
+        if collection is not None:
+            with collection.lock:
+                collection.dropped = True
+
+    @staticmethod
+    def _unit_vector(embedding):
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def get(self, collection_name, question, embedding=None):
+        """
+        Look up a cached answer.
+
+        Args:
+            collection_name (str): The collection the answer was retrieved from
+            question (str): The question
+            embedding (list, optional): The question embedding, enables the semantic tier
+
+        Returns:
+            str: The cached answer or None on a miss
+        """
+        normalized = normalize_question(question)
+        key = _question_key(normalized)
+        vector = self._unit_vector(embedding)
+        with self._lock:
+            collection = self._get_collection(collection_name)
+        with collection.lock:
+            collection.load()
+            outcome = "exact_hits"
+            entry = collection.get_exact(key)
+            if entry is None and vector is not None:
+                outcome = "semantic_hits"
+                entry, _ = collection.get_similar(vector, self.similarity_threshold)
+        with self._lock:
+            self._counters[outcome if entry is not None else "misses"] += 1
+        return entry["answer"] if entry is not None else None
+
+    def put(self, collection_name, question, answer, embedding=None):
+        """
+        Store an answer.
+
+        Args:
+            collection_name (str): The collection the answer was retrieved from
+            question (str): The question
+            answer (str): The answer
+            embedding (list, optional): The question embedding for the semantic tier
+        """
+        normalized = normalize_question(question)
+        vector = self._unit_vector(embedding)
+        entry = {
+            "key": _question_key(normalized),
+            "question": normalized,
+            "answer": answer,
+            "embedding": vector.tolist() if vector is not None else None,
+            "created_at": time.time(),
+        }
+        with self._lock:
+            collection = self._get_collection(collection_name)
+        with collection.lock:
+            collection.load()
+            collection.put(entry)
+
+    def invalidate(self, collection_name):
+        """
+        Drop every cached answer of a collection, in memory and on disk.
+
+        Args:
+            collection_name (str): The collection whose content changed
+        """
+        if collection_name in self.shared_collections:
+            self.clear()
+            return
+        with self._lock:
+            self._drop(self._collections.pop(collection_name, None))
+            file_path = os.path.join(self.folder, _collection_file_name(collection_name))
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def clear(self):
+        """Drop every cached answer, in memory and on disk."""
+        with self._lock:
+            for collection in self._collections.values():
+                self._drop(collection)
+            self._collections.clear()
+            if not os.path.isdir(self.folder):
+                return
+            for file_name in os.listdir(self.folder):
+                if file_name.endswith(".jsonl"):
+                    os.remove(os.path.join(self.folder, file_name))
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        Returns:
+            dict: Exact hits, semantic hits and misses since start
+        """
+        with self._lock:
+            return dict(self._counters)
+
+
+# Shared cache used by the RAG module and invalidated by the routes
+response_cache = ResponseCache()
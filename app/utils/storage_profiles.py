@@ -0,0 +1,203 @@
+"""
+Storage profiles utility module.
+This module defines how a collection stores its vectors (quantization, on-disk originals, on-disk HNSW) and how it is searched.
+"""
+from typing import Dict, NamedTuple, Optional
+
+from qdrant_client.models import BinaryQuantization, BinaryQuantizationConfig, Disabled, Distance, HnswConfigDiff, \
+    QuantizationSearchParams, ScalarQuantization, ScalarQuantizationConfig, ScalarType, SearchParams, VectorParams, \
+    VectorParamsDiff
+
+from app.config.settings import STORAGE_PROFILE, STORAGE_PROFILE_OVERRIDES
+
+# Every collection holds one named vector from the Vietnamese bi-encoder
+VECTOR_NAME = "content"
+VECTOR_SIZE = 768
+
+# Scalar quantization ignores the most extreme 1% of values when fitting the int8 range
+SCALAR_QUANTILE = 0.99
+
+
+class StorageProfile(NamedTuple):
+    """How a collection stores and searches its vectors."""
+    name: str
+    quantization: Optional[str]  # None, "int8" or "binary"
+    vectors_on_disk: bool  # Keep the float32 originals on disk (memmap) instead of in RAM
+    hnsw_on_disk: bool  # Keep the HNSW graph on disk
+    oversampling: float = 1.0  # Candidates fetched from the quantized index per requested result
+    rescore: bool = False  # Re-rank the candidates with the original vectors
+
+
+STORAGE_PROFILES: Dict[str, StorageProfile] = {
+    # Everything in RAM, the layout collections had before profiles existed
+    "memory": StorageProfile("memory", None, False, False),
+    # int8 vectors in RAM (4x smaller), originals on disk for rescoring
+    "scalar": StorageProfile("scalar", "int8", True, False, oversampling=2.0, rescore=True),
+    # As scalar with the HNSW graph on disk too
+    "scalar_on_disk": StorageProfile("scalar_on_disk", "int8", True, True, oversampling=2.0, rescore=True),
+    # 1 bit per dimension in RAM (32x smaller), needs more oversampling to keep recall
+    "binary": StorageProfile("binary", "binary", True, False, oversampling=3.0, rescore=True),
+    # No quantization, originals and HNSW graph on disk, the page cache decides what stays in RAM
+    "on_disk": StorageProfile("on_disk", None, True, True),
+}
+
+
+def _parse_overrides(overrides: str) -> Dict[str, str]:
+    # "legal=scalar,base_knowledge=scalar" -> {"legal": "scalar", "base_knowledge": "scalar"}
+    parsed = {}
+    for item in overrides.split(","):
+        if "=" in item:
+            collection_name, profile_name = item.split("=", 1)
+            parsed[collection_name.strip()] = profile_name.strip()
+    return parsed
+
+_overrides = _parse_overrides(STORAGE_PROFILE_OVERRIDES)
+
+
+def get_profile(name: str) -> StorageProfile:
+    """
+    Get a storage profile by name.
+
+    Args:
+        name (str): The profile name
+
+    Returns:
+        StorageProfile: The profile
+
+    Raises:
+        ValueError: If no profile has this name
+    """
+    try:
+        return STORAGE_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown storage profile '{name}', expected one of {', '.join(STORAGE_PROFILES)}") from None
+
+def collection_profile(collection_name: str) -> StorageProfile:
+    """
+    Get the storage profile configured for a collection.
+
+    Args:
+        collection_name (str): The collection
+
+    Returns:
+        StorageProfile: The profile from STORAGE_PROFILE_OVERRIDES, else STORAGE_PROFILE
+    """
+    return get_profile(_overrides.get(collection_name, STORAGE_PROFILE))
+
+def vector_params(profile: StorageProfile, hnsw_config: Optional[dict] = None) -> VectorParams:
+    """
+    Build the parameters of the content vector for a new collection.
+
+    Quantization is not part of them, it is set on the collection with quantization_config
+    so apply_profile can change it; a per-vector setting would take precedence over it.
+
+    Args:
+        profile (StorageProfile): The storage profile
+        hnsw_config (dict, optional): HNSW parameters of the caller, on_disk is set by the profile
+
+    Returns:
+        VectorParams: The vector parameters
+    """
+    return VectorParams(
+        size=VECTOR_SIZE,
+        distance=Distance.COSINE,
+        hnsw_config=HnswConfigDiff(**{**(hnsw_config or {}), "on_disk": profile.hnsw_on_disk}),
+        on_disk=profile.vectors_on_disk,
+    )
+
+def quantization_config(profile: StorageProfile):
+    """
+    Build the quantization config of a profile.
+
+    Args:
+        profile (StorageProfile): The storage profile
+
+    Returns:
+        ScalarQuantization, BinaryQuantization or None: The config, None without quantization
+    """
+    # The quantized vectors are what the search walks, so they always stay in RAM
+    if profile.quantization == "int8":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=SCALAR_QUANTILE, always_ram=True)
+        )
+    if profile.quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+def search_params(profile: StorageProfile) -> Optional[SearchParams]:
+    """
+    Build the query-time search parameters of a profile.
+
+    Args:
+        profile (StorageProfile): The storage profile
+
+    Returns:
+        SearchParams: Oversampling and rescoring for quantized profiles, None otherwise
+    """
+    if profile.quantization is None:
+        return None
+    return SearchParams(
+        quantization=QuantizationSearchParams(ignore=False, rescore=profile.rescore, oversampling=profile.oversampling)
+    )
+
+def collection_search_params(collection_name: str) -> Optional[SearchParams]:
+    """
+    Get the search parameters for a collection from its configured profile.
+
+    Args:
+        collection_name (str): The collection
+
+    Returns:
+        SearchParams: The search parameters, None if the profile is not quantized
+    """
+    return search_params(collection_profile(collection_name))
+
+def apply_profile(client, collection_name: str, profile: StorageProfile):
+    """
+    Convert an existing collection to a profile in place.
+
+    Qdrant rebuilds the affected segments in the background, the collection stays
+    searchable meanwhile and turns green once the conversion is done.
+
+    Args:
+        client: The QdrantClient
+        collection_name (str): The collection
+        profile (StorageProfile): The target profile
+    """
+    quantization = quantization_config(profile)
+    client.update_collection(
+        collection_name=collection_name,
+        vectors_config={
+            VECTOR_NAME: VectorParamsDiff(
+                hnsw_config=HnswConfigDiff(on_disk=profile.hnsw_on_disk),
+                on_disk=profile.vectors_on_disk,
+                # Collections created with quantization on the vector keep it over the
+                # collection setting, clear it so the setting below applies
+                quantization_config=Disabled.DISABLED,
+            )
+        },
+        quantization_config=quantization if quantization is not None else Disabled.DISABLED,
+    )
+
+def estimate_ram_bytes(profile: StorageProfile, points: int, hnsw_m: int = 16) -> int:
+    """
+    Estimate the RAM a collection needs for its vectors and HNSW graph, payload excluded.
+
+    Args:
+        profile (StorageProfile): The storage profile
+        points (int): The number of points
+        hnsw_m (int): The HNSW m parameter
+
+    Returns:
+        int: The estimated bytes kept in RAM
+    """
+    ram = 0
+    if not profile.vectors_on_disk:
+        ram += points * VECTOR_SIZE * 4  # float32 originals
+    if profile.quantization == "int8":
+        ram += points * VECTOR_SIZE
+    elif profile.quantization == "binary":
+        ram += points * VECTOR_SIZE // 8
+    if not profile.hnsw_on_disk:
+        ram += points * hnsw_m * 2 * 4  # Links of layer 0, upper layers are negligible
+    return ram
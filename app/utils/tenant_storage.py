@@ -0,0 +1,165 @@
+"""
+Tenant storage utility module.
+This module keeps the knowledge of every business user in one shared Qdrant collection, partitioned by a tenant payload key.
+"""
+from typing import Optional, Tuple
+
+from qdrant_client.models import FieldCondition, Filter, FilterSelector, HnswConfigDiff, KeywordIndexParams, \
+    KeywordIndexType, MatchValue, PointStruct
+
+from app.config.settings import BUSINESS_SHARED_COLLECTION, BUSINESS_STORAGE_MODE
+from app.utils.batch_embedding import document_point_id, embed_and_upsert
+from app.utils.lexical import has_lexical_vectors, sparse_vectors_config
+from app.utils.storage_profiles import VECTOR_NAME, collection_profile, quantization_config, vector_params
+
+# Payload key holding the username a point belongs to
+TENANT_KEY = "tenant_id"
+
+# Every search is filtered by tenant, so only per-tenant HNSW graphs are built (m=0 skips the global graph)
+TENANT_HNSW_CONFIG = {"m": 0, "payload_m": 16}
+
+
+def is_shared_mode() -> bool:
+    """Check whether business users share one collection (BUSINESS_STORAGE_MODE=shared)."""
+    return BUSINESS_STORAGE_MODE == "shared"
+
+def tenant_filter(tenant_id: str) -> Filter:
+    """
+    Build the filter matching the points of one tenant.
+
+    Args:
+        tenant_id (str): The username
+
+    Returns:
+        Filter: The filter on the tenant payload key
+    """
+    return Filter(must=[FieldCondition(key=TENANT_KEY, match=MatchValue(value=tenant_id))])
+
+def business_search_target(user_id: str) -> Tuple[str, Optional[Filter]]:
+    """
+    Get where the knowledge of a business user is searched.
+
+    Args:
+        user_id (str): The username
+
+    Returns:
+        tuple: The collection name and the filter to apply, None in per-user collection mode
+    """
+    if is_shared_mode():
+        return BUSINESS_SHARED_COLLECTION, tenant_filter(user_id)
+    return user_id, None
+
+def tenant_point_id(tenant_id: str, content: str) -> int:
+    """
+    Get the deterministic point ID of a chunk of a tenant.
+
+    The tenant is part of the hash, so two users adding the same text get separate points.
+
+    Args:
+        tenant_id (str): The username
+        content (str): The chunk text
+
+    Returns:
+        int: The point ID
+    """
+    return document_point_id(f"{tenant_id}\x00{content}")
+
+def to_tenant_point(point, tenant_id: str) -> PointStruct:
+    """
+    Re-key a point built for a per-user collection for the shared collection.
+
+    Args:
+        point: A PointStruct or a Record with its payload and vector
+        tenant_id (str): The username
+
+    Returns:
+        PointStruct: The point with a tenant-scoped ID and the tenant payload key
+    """
+    payload = dict(point.payload or {})
+    point_id = tenant_point_id(tenant_id, payload.get("page_content", ""))
+    payload["metadata"] = {**(payload.get("metadata") or {}), "id": point_id}
+    payload[TENANT_KEY] = tenant_id
+    return PointStruct(id=point_id, vector=point.vector, payload=payload)
+
+def ensure_shared_collection(client):
+    """
+    Create the shared business collection and its tenant index if they do not exist.
+
+    Args:
+        client: The QdrantClient
+    """
+    if client.collection_exists(BUSINESS_SHARED_COLLECTION):
+        return
+    profile = collection_profile(BUSINESS_SHARED_COLLECTION)
+    client.create_collection(
+        collection_name=BUSINESS_SHARED_COLLECTION,
+        vectors_config={VECTOR_NAME: vector_params(profile)},
+        sparse_vectors_config=sparse_vectors_config(profile.vectors_on_disk),
+        hnsw_config=HnswConfigDiff(**TENANT_HNSW_CONFIG),
+        quantization_config=quantization_config(profile),
+    )
+    # is_tenant lays the points of each tenant out together on disk
+    client.create_payload_index(
+        collection_name=BUSINESS_SHARED_COLLECTION,
+        field_name=TENANT_KEY,
+        field_schema=KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True),
+    )
+
+def add_tenant_documents(client, embeddings, tenant_id: str, documents) -> int:
+    """
+    Embed documents and add them to the shared collection under a tenant.
+
+    Args:
+        client: The QdrantClient
+        embeddings: The embedding model
+        tenant_id (str): The username
+        documents (list): The Documents to add
+
+    Returns:
+        int: The number of points upserted
+    """
+    ensure_shared_collection(client)
+
+    def upsert(points):
+        # Online writes are small, wait so the next question already sees them
+        client.upsert(
+            collection_name=BUSINESS_SHARED_COLLECTION,
+            points=[to_tenant_point(point, tenant_id) for point in points],
+            wait=True,
+        )
+
+    upserted, _ = embed_and_upsert(
+        documents, embeddings, upsert, lexical=has_lexical_vectors(client, BUSINESS_SHARED_COLLECTION)
+    )
+    return upserted
+
+def delete_tenant(client, tenant_id: str):
+    """
+    Delete every point of a tenant from the shared collection.
+
+    Args:
+        client: The QdrantClient
+        tenant_id (str): The username
+    """
+    if not client.collection_exists(BUSINESS_SHARED_COLLECTION):
+        return
+    client.delete(
+        collection_name=BUSINESS_SHARED_COLLECTION,
+        points_selector=FilterSelector(filter=tenant_filter(tenant_id)),
+        wait=True,
+    )
+
+def count_tenant_points(client, tenant_id: str) -> int:
+    """
+    Count the points of a tenant in the shared collection.
+
+    Args:
+        client: The QdrantClient
+        tenant_id (str): The username
+
+    Returns:
+        int: The exact number of points
+    """
+    return client.count(
+        collection_name=BUSINESS_SHARED_COLLECTION, count_filter=tenant_filter(tenant_id), exact=True
+    ).count
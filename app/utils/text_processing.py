@@ -118,5 +118,120 @@ def format_response(answer: Union[str, Dict[str, Any]], response_time: float = N
     # Add response time if provided
     if response_time is not None:
         response["response_time_seconds"] = response_time
+
+    # Add how the question was rewritten, as the stream's done event reports it
+    if isinstance(answer, dict) and "rewrite_stats" in answer:
+        response["rewrite"] = answer.get("rewrite")
+        response["rewrite_stats"] = answer["rewrite_stats"]
         
-    return response
\ No newline at end of file
+    return response
+
+class StreamingAnswerFormatter:
+    """
+    Incremental counterpart of format_response for token streams.
+
+    Tokens are fed as they arrive and the returned text is safe to send to the client:
+    the concatenated output is what format_response returns for the whole answer, however
+    the answer is split into tokens. Leading and trailing whitespace is stripped, then the
+    <start> and <end> markers are removed one after the other; text that might still
+    become a marker, or trailing whitespace, is held back until the next tokens resolve it.
+
+    From the first "{" or "[" on, the output is buffered and the whole answer is passed
+    through process_json_response at the end, like format_response does. Its fallbacks can
+    extract a value from JSON that follows a preamble; the text already emitted is then not
+    part of the answer, and replaced is set so the caller can send message instead.
+    """
+    MARKERS = ("<start>\n", "<end>\n")  # Removed in this order, as format_response does
+
+    def __init__(self):
+        self._started = False
+        self._emitted = ""
+        self._json_text = ""  # Output held back from the first "{" or "["
+        self.message = ""  # The whole formatted answer, set by finish
+        self.replaced = False  # Whether message does not continue the emitted text
+        # Text each marker removal has not resolved yet
+        self._buffers = [""] * len(self.MARKERS)
+
+    @staticmethod
+    def _partial_marker_length(text: str, marker: str) -> int:
+        """Length of the longest suffix of text that starts the marker without completing it."""
+        for length in range(len(marker) - 1, 0, -1):
+            if text.endswith(marker[:length]):
+                return length
+        return 0
+
+    def _remove_markers(self, text: str, final: bool) -> str:
+        """Run text through the marker removals, returning the output they have settled."""
+        for stage, marker in enumerate(self.MARKERS):
+            buffer = self._buffers[stage] + text
+            # Only the first removal sees trailing whitespace, it is stripped if the answer ends there
+            resolved = buffer.rstrip() if stage == 0 else buffer
+            if final:
+                settled, rest = resolved, ""
+            else:
+                # The markers never overlap themselves, so a match can only start in the held-back suffix
+                cut = len(resolved) - self._partial_marker_length(resolved, marker)
+                settled, rest = buffer[:cut], buffer[cut:]
+            self._buffers[stage] = rest
+            text = settled.replace(marker, "")
+        return text
+
+    def _emit(self, text: str) -> str:
+        # JSON can only be post-processed once complete
+        if not self._json_text:
+            start = min((index for index in (text.find("{"), text.find("[")) if index >= 0), default=len(text))
+            text, self._json_text = text[:start], text[start:]
+            self._emitted += text
+            return text
+        self._json_text += text
+        return ""
+
+    def feed(self, token: str) -> str:
+        """
+        Feed one token of the answer.
+
+        Args:
+            token (str): The next token
+
+        Returns:
+            str: The text that can be emitted now, possibly empty
+        """
+        if not self._started:
+            token = token.lstrip()
+            if not token:
+                return ""
+            self._started = True
+        return self._emit(self._remove_markers(token, final=False))
+
+    def finish(self) -> str:
+        """
+        Flush the rest of the answer once the stream has ended.
+
+        Returns:
+            str: The remaining text to emit, empty if replaced is set
+        """
+        sent = len(self._emitted)
+        self._emit(self._remove_markers("", final=True))
+        answer = self._emitted + self._json_text
+        self._json_text = ""
+        message = process_json_response(answer) if answer else answer
+        if not isinstance(message, str):
+            message = str(message)
+        self.message = message
+        if message.startswith(self._emitted[:sent]):
+            return message[sent:]
+        self.replaced = True
+        return ""
+
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    """
+    Format one Server-Sent Events frame.
+
+    Args:
+        event (str): The event name
+        data (Dict[str, Any]): The event payload
+
+    Returns:
+        str: The encoded frame
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,187 @@
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+from app.utils.merge_meaning import SemanticChunker
+
+# Benchmark configuration
+QA_DATA_FILE = "qa_data_fixed.json"
+KNOWLEDGE_GLOB = "database/**/*.txt"
+CHUNKER_SETTINGS = [(2, 20, 0.3), (5, 20, 0.3)]  # Settings used by add_knowledge.py and data_insert.py
+SYNTHETIC_DOCUMENTS = 20
+LONG_DOCUMENT_ANSWERS = 1500  # Answers concatenated into one long synthetic document
+FRAGMENTED_MAX_SENTENCES = 400  # The legacy merge is quadratic, keep the worst case affordable
+RANDOM_SEED = 42
+
+
+def load_texts(paths):
+    """
+    Load the benchmark documents.
+
+    Uses the files given on the command line, otherwise the knowledge files under database/,
+    plus synthetic documents built by concatenating answers of the QA data set.
+
+    Args:
+        paths: Text files to chunk
+
+    Returns:
+        List of (name, text) tuples
+    """
+    if not paths:
+        paths = [path for path in glob.glob(KNOWLEDGE_GLOB, recursive=True)
+                 if os.path.basename(path) != "what_is_this_for.txt"]
+    texts = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file:
+            texts.append((path, file.read()))
+
+    if os.path.exists(QA_DATA_FILE):
+        with open(QA_DATA_FILE, "r", encoding="utf-8") as file:
+            answers = [item["answer"] for item in json.load(file) if item.get("answer")]
+        rng = random.Random(RANDOM_SEED)
+        for i in range(SYNTHETIC_DOCUMENTS):
+            sample = rng.sample(answers, min(len(answers), rng.randint(2, 12)))
+            texts.append((f"synthetic-{i + 1}", " ".join(sample)))
+        texts.append(("synthetic-long", " ".join(answers[:LONG_DOCUMENT_ANSWERS])))
+    return texts
+
+def sentence_groups(chunker, text):
+    """Split a text and cut it at the semantic boundaries, as create_semantic_chunks does."""
+    sentences = chunker.split_into_sentences(text)
+    if len(sentences) <= chunker.min_sentences:
+        return sentences, []
+    boundaries = chunker.find_banded_boundaries(chunker.calculate_banded_similarities(sentences))
+    groups = []
+    start = 0
+    for boundary in boundaries:
+        groups.append(list(range(start, boundary)))
+        start = boundary
+    return sentences, groups
+
+def fragmented_groups(sentences, rng):
+    """Cut sentences into groups of 1-2 sentences, the worst case for merging."""
+    groups = []
+    start = 0
+    while start < len(sentences):
+        size = rng.randint(1, 2)
+        groups.append(list(range(start, min(start + size, len(sentences)))))
+        start += size
+    return groups
+
+def compare(chunker, sentences, groups):
+    """
+    Run the legacy merge and the incremental merge on the same groups and time them.
+
+    The results can differ when re-splitting a joined chunk gives another sentence count
+    than the groups it was built from, which only the legacy merge does.
+    """
+    chunks = [" ".join(sentences[i] for i in group) for group in groups]
+
+    start_time = time.time()
+    legacy = chunker.merge_small_chunks(chunks)
+    legacy_time = time.time() - start_time
+
+    start_time = time.time()
+    merged = chunker.merge_small_sentence_groups(sentences, groups)
+    incremental = [" ".join(sentences[i] for i in group) for group in merged]
+    incremental_time = time.time() - start_time
+
+    return legacy == incremental, legacy_time, incremental_time
+
+def compare_boundaries(chunker, sentences):
+    """Run the dense and the banded boundary detection on the same sentences, with timings and matrix sizes."""
+    start_time = time.time()
+    similarity_matrix = chunker.calculate_sentence_similarities(sentences)
+    dense = chunker.find_semantic_boundaries(similarity_matrix)
+    dense_time = time.time() - start_time
+    dense_bytes = similarity_matrix.nbytes
+    del similarity_matrix
+
+    start_time = time.time()
+    band = chunker.calculate_banded_similarities(sentences)
+    banded = chunker.find_banded_boundaries(band)
+    banded_time = time.time() - start_time
+
+    return dense == banded, dense_time, banded_time, dense_bytes, band.nbytes
+
+def run_boundary_benchmark(texts):
+    """Print match rate, timings and peak matrix size of the dense and banded boundary detection."""
+    for min_sentences, max_sentences, threshold in CHUNKER_SETTINGS:
+        chunker = SemanticChunker(min_sentences, max_sentences, threshold)
+        print(f"\n📐 Boundaries, SemanticChunker(min_sentences={min_sentences}, max_sentences={max_sentences}, "
+              f"similarity_threshold={threshold})")
+
+        matches = 0
+        documents = 0
+        dense_total = 0.0
+        banded_total = 0.0
+        dense_peak = 0
+        banded_peak = 0
+        for name, text in texts:
+            sentences = chunker.split_into_sentences(text)
+            if len(sentences) <= chunker.min_sentences:
+                continue
+            same, dense_time, banded_time, dense_bytes, band_bytes = compare_boundaries(chunker, sentences)
+            documents += 1
+            matches += same
+            dense_total += dense_time
+            banded_total += banded_time
+            dense_peak = max(dense_peak, dense_bytes)
+            banded_peak = max(banded_peak, band_bytes)
+            if not same:
+                print(f"   ⚠️ {name}: boundaries differ ({len(sentences)} sentences)")
+
+        if not documents:
+            print("   no documents to split")
+            continue
+        print(f"   {matches}/{documents} identical, dense {dense_total:.3f}s, banded {banded_total:.3f}s")
+        print(f"   largest similarity matrix: dense {dense_peak / 1024**2:.1f}MB, banded {banded_peak / 1024**2:.1f}MB")
+
+def run_benchmark(texts):
+    """Print match rate and timings of the legacy and incremental merges for every setting."""
+    rng = random.Random(RANDOM_SEED)
+    for min_sentences, max_sentences, threshold in CHUNKER_SETTINGS:
+        chunker = SemanticChunker(min_sentences, max_sentences, threshold)
+        print(f"\n📊 SemanticChunker(min_sentences={min_sentences}, max_sentences={max_sentences}, "
+              f"similarity_threshold={threshold})")
+
+        for label, make_groups in (("semantic boundaries", None), ("fragmented groups", fragmented_groups)):
+            matches = 0
+            documents = 0
+            legacy_total = 0.0
+            incremental_total = 0.0
+            for name, text in texts:
+                sentences, groups = sentence_groups(chunker, text)
+                if make_groups is not None:
+                    if len(sentences) > FRAGMENTED_MAX_SENTENCES:
+                        continue
+                    groups = make_groups(sentences, rng)
+                if not groups:
+                    continue
+                same, legacy_time, incremental_time = compare(chunker, sentences, groups)
+                documents += 1
+                matches += same
+                legacy_total += legacy_time
+                incremental_total += incremental_time
+                if not same:
+                    print(f"   ⚠️ {name}: merged chunks differ ({len(sentences)} sentences, {len(groups)} groups)")
+
+            if not documents:
+                print(f"   {label}: no documents to merge")
+                continue
+            speedup = legacy_total / incremental_total if incremental_total else float("inf")
+            print(f"   {label}: {matches}/{documents} identical, legacy {legacy_total:.3f}s, "
+                  f"incremental {incremental_total:.3f}s ({speedup:.1f}x)")
+
+# Execute the benchmark if this script is run directly
+if __name__ == "__main__":
+    documents = load_texts(sys.argv[1:])
+    if not documents:
+        print("❌ No documents to benchmark, pass text files as arguments")
+        sys.exit(1)
+    print(f"🔍 Benchmarking semantic chunking on {len(documents)} documents")
+    run_boundary_benchmark(documents)
+    run_benchmark(documents)
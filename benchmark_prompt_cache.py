@@ -0,0 +1,141 @@
+import datetime
+import json
+import os
+import random
+import re
+import sys
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.chatbot.prompts import CURRENT_TIME_PROMPT, get_qa_prompt, get_user_qa_prompt
+from app.config.settings import CONTEXT_TOKENIZER
+
+# Benchmark configuration
+QA_DATA_FILE = "qa_data_fixed.json"
+SUBJECTS = ["legal", "history", "business", "political", "user"]  # "user" is the prompt of business users
+REQUESTS_PER_SUBJECT = 20
+CONTEXT_ANSWERS = 3  # Answers of the QA data set used as retrieved context of a request
+HISTORY_PROBABILITY = 0.5  # Share of requests that are follow-ups with one earlier turn
+RANDOM_SEED = 42
+
+# Stand-in for the vinallama chat template (ChatML) that Ollama applies to the messages
+ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+def load_tokenizer():
+    """Load the chat model tokenizer, None falls back to splitting words and punctuation."""
+    try:
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(CONTEXT_TOKENIZER)
+    except Exception as e:
+        print(f"⚠️ Could not load tokenizer '{CONTEXT_TOKENIZER}', counting words and punctuation: {e}")
+        return None
+
+def tokenize(tokenizer, text):
+    """Split a text into the tokens the model sees."""
+    if tokenizer is not None:
+        return tokenizer.encode(text, add_special_tokens=False)
+    return re.findall(r"\w+|[^\w\s]|\s+", text)
+
+def render(messages):
+    """Serialize chat messages as the model sees them."""
+    return "".join(f"<|im_start|>{ROLES.get(message.type, message.type)}\n{message.content}<|im_end|>\n"
+                   for message in messages) + "<|im_start|>assistant\n"
+
+def common_prefix(first, second):
+    """Count the leading tokens two prompts share."""
+    length = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        length += 1
+    return length
+
+
+class PrefixCacheStandIn:
+    """
+    Local stand-in for the prompt KV cache of an Ollama runner slot.
+
+    Like llama.cpp, the slot keeps the tokens of the previous prompt and only evaluates
+    the tokens after the longest prefix shared with the new prompt.
+    """
+    def __init__(self):
+        self.cached = []
+        self.prompt_tokens = 0
+        self.reused_tokens = 0
+
+    def evaluate(self, tokens):
+        reused = common_prefix(self.cached, tokens)
+        self.prompt_tokens += len(tokens)
+        self.reused_tokens += reused
+        self.cached = tokens
+        return reused
+
+
+def load_requests(rng):
+    """Build the requests of each subject: question, context, optional history and time of arrival."""
+    with open(QA_DATA_FILE, "r", encoding="utf-8") as file:
+        items = [item for item in json.load(file) if item.get("question") and item.get("answer")]
+    requests = {}
+    now = datetime.datetime(2025, 1, 1, 8, 0, 0)
+    for subject in SUBJECTS:
+        requests[subject] = []
+        for _ in range(REQUESTS_PER_SUBJECT):
+            item = rng.choice(items)
+            context = "\n\n".join(other["answer"] for other in rng.sample(items, CONTEXT_ANSWERS))
+            history = []
+            if rng.random() < HISTORY_PROBABILITY:
+                earlier = rng.choice(items)
+                history = [HumanMessage(content=earlier["question"]), AIMessage(content=earlier["answer"])]
+            now += datetime.timedelta(seconds=rng.randint(1, 30))
+            requests[subject].append((item["question"], context, history, now.strftime("%Y-%m-%d %H:%M:%S")))
+    return requests
+
+def format_request(prompt, request, time_first):
+    """Format a request with the prompt, optionally moving the time to the top as the previous layout did."""
+    question, context, history, current_time = request
+    messages = prompt.format_messages(input=question, context=context, chat_history=history,
+                                      current_time=current_time)
+    if time_first:
+        time_line = CURRENT_TIME_PROMPT.format(current_time=current_time)
+        messages[0] = messages[0].__class__(content=f"{time_line}\n\n{messages[0].content}")
+    return messages
+
+def run_benchmark(requests, tokenizer):
+    """Print the prompt tokens reused from the stand-in cache with the stable layout and with the time first."""
+    for subject, subject_requests in requests.items():
+        prompt = get_user_qa_prompt() if subject == "user" else get_qa_prompt(subject)
+        static_text = render(prompt.format_messages(
+            input="", context="", chat_history=[], current_time=""
+        )[:1]).rsplit("<|im_end|>", 1)[0]
+        # The last token may merge with the text that follows it
+        static_prefix = tokenize(tokenizer, static_text)[:-1]
+
+        print(f"\n📊 {subject}: static prefix of {len(static_prefix)} tokens")
+        for label, time_first in (("stable layout", False), ("time at the top (previous layout)", True)):
+            cache = PrefixCacheStandIn()
+            stable = 0
+            for request in subject_requests:
+                tokens = tokenize(tokenizer, render(format_request(prompt, request, time_first)))
+                cache.evaluate(tokens)
+                stable += tokens[:len(static_prefix)] == static_prefix
+            share = cache.reused_tokens / cache.prompt_tokens if cache.prompt_tokens else 0.0
+            print(f"   {label}: static prefix identical in {stable}/{len(subject_requests)} prompts, "
+                  f"{cache.reused_tokens}/{cache.prompt_tokens} prompt tokens reused ({share:.0%}), "
+                  f"{cache.prompt_tokens - cache.reused_tokens} evaluated")
+
+    # The prompts are built once per subject
+    for subject in requests:
+        if subject != "user" and get_qa_prompt(subject) is not get_qa_prompt(subject):
+            print(f"   ⚠️ the prompt of {subject} is rebuilt on every call")
+
+# Execute the benchmark if this script is run directly
+if __name__ == "__main__":
+    # Usage: python benchmark_prompt_cache.py [subject ...]
+    if sys.argv[1:]:
+        SUBJECTS = sys.argv[1:]
+    if not os.path.exists(QA_DATA_FILE):
+        print(f"❌ {QA_DATA_FILE} is needed to build the benchmark requests")
+        sys.exit(1)
+    print(f"🔍 Benchmarking prompt prefix reuse on {REQUESTS_PER_SUBJECT} requests per subject")
+    run_benchmark(load_requests(random.Random(RANDOM_SEED)), load_tokenizer())
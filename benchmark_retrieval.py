@@ -0,0 +1,236 @@
+import json
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+
+import numpy as np
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from app.chatbot.context_packer import pack_context, token_counter
+from app.chatbot.retrieval import get_retriever, is_hybrid_collection, register_embeddings, weighted_reciprocal_rank
+from app.chatbot.subject_profiles import subject_profiles
+from app.config.settings import CONTEXT_TOKEN_BUDGET, EMBEDDINGS_MODEL_PATH, SUBJECT_PROFILES_FOLDER
+from app.utils.lexical import query_lexical_vector
+
+# Benchmark configuration
+QA_DATA_FILE = "qa_data_fixed.json"  # Questions replayed, their answer is the chunk that should be retrieved
+QUERIES_PER_SUBJECT = 100
+MIN_QUESTIONS = 30  # Subjects with fewer questions are skipped, their recall would not tell settings apart
+RECALL_K = 5  # Fused results checked for recall@k
+BASE_COLLECTION = "base_knowledge"
+OUTPUT_FOLDER = "subject_profiles_recommended/"  # --apply writes into SUBJECT_PROFILES_FOLDER instead
+RANDOM_SEED = 42
+
+# Parameters swept for each collection of a subject, the current profile values are always added
+SEARCH_LIMITS = [3, 5, 8, 10, 15, 20]
+SCORE_THRESHOLDS = [0.6, 0.65, 0.7, 0.75, 0.8, 0.85]
+SUBJECT_WEIGHTS = [0.5, 0.6, 0.7, 0.8, 0.9, 0.95]  # Weight of the subject collection, base_knowledge gets the rest
+
+# A setting is recommended if its context recall is within this of the best one; the cheapest of those wins
+RECALL_TOLERANCE = 0.01
+
+
+def normalize(text):
+    """Normalize a text for matching answers against chunks."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip().lower()
+
+def load_questions(subjects, count=QUERIES_PER_SUBJECT):
+    """Sample the QA questions of each subject with their normalized answer."""
+    with open(QA_DATA_FILE, "r", encoding="utf-8") as file:
+        items = [item for item in json.load(file) if item.get("question") and item.get("answer")]
+    rng = random.Random(RANDOM_SEED)
+    questions = {}
+    for subject in subjects:
+        subject_items = [(item["question"], normalize(item["answer"])) for item in items if item.get("subject") == subject]
+        questions[subject] = rng.sample(subject_items, min(count, len(subject_items)))
+    return questions
+
+def is_answer(document, answer):
+    """Check whether a retrieved chunk is the known answer chunk of a question."""
+    content = normalize(document.page_content)
+    # QA pairs are stored as "Câu hỏi: ...\nCâu trả lời: ...", long answers may be split into several chunks
+    return answer in content or (len(content) >= len(answer) // 2 and content in answer)
+
+def hit_rank(documents, answer):
+    """Position of the answer chunk in the results, None if it was not retrieved."""
+    return next((rank for rank, document in enumerate(documents) if is_answer(document, answer)), None)
+
+
+def limit_key(collection_name):
+    """The retriever setting that bounds the results of a collection, the hybrid one for dense + lexical search."""
+    return "hybrid_search_limit" if is_hybrid_collection(collection_name) else "search_limit"
+
+def sweep_collection(collection_name, subject, current, queries):
+    """
+    Search a collection with every swept limit and threshold.
+
+    Returns:
+        Dict mapping (limit, threshold) to the results and the latency of each query
+    """
+    key = limit_key(collection_name)
+    limits = sorted(set(SEARCH_LIMITS) | {current.get(key) or current.get("search_limit") or 10})
+    thresholds = sorted(set(SCORE_THRESHOLDS) | {current.get("score_threshold")}, key=lambda value: value or 0.0)
+    results = {}
+    for limit in limits:
+        for threshold in thresholds:
+            retriever = get_retriever(collection_name, subject=subject, **{**current, key: limit, "score_threshold": threshold})
+            # Warm the caches before timing
+            for query_vector, lexical_vector in queries[:5]:
+                retriever.search(query_vector, lexical_vector=lexical_vector)
+            documents = []
+            latencies = []
+            for query_vector, lexical_vector in queries:
+                start_time = time.perf_counter()
+                documents.append(retriever.search(query_vector, lexical_vector=lexical_vector))
+                latencies.append(time.perf_counter() - start_time)
+            results[(limit, threshold)] = (documents, latencies)
+    return results
+
+def evaluate(profile, subject_runs, base_runs, weights, answers):
+    """
+    Measure a setting of both collections and the weights as the chain would see it.
+
+    The two searches run concurrently in the chain, a query takes as long as the slower one.
+
+    Returns:
+        Dict with recall@k, context recall, p50/p95 latency in ms and mean context tokens
+    """
+    subject_documents, subject_latencies = subject_runs
+    base_documents, base_latencies = base_runs
+    hits = 0
+    context_hits = 0
+    tokens = []
+    for subject_results, base_results, answer in zip(subject_documents, base_documents, answers):
+        fused = weighted_reciprocal_rank([subject_results, base_results], weights)
+        rank = hit_rank(fused, answer)
+        hits += rank is not None and rank < RECALL_K
+        context = pack_context(fused, profile.context_token_budget or CONTEXT_TOKEN_BUDGET,
+                               max_documents=profile.max_documents, max_document_tokens=profile.max_document_tokens)
+        context_hits += hit_rank(context, answer) is not None
+        tokens.append(sum(token_counter.count(document.page_content) for document in context))
+    latencies = np.maximum(subject_latencies, base_latencies) * 1000
+    return {
+        "recall": hits / len(answers),
+        "context_recall": context_hits / len(answers),
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "tokens": float(np.mean(tokens)),
+    }
+
+def best_setting(measured):
+    """Pick the cheapest setting whose context recall is within RECALL_TOLERANCE of the best one."""
+    best_recall = max(metrics["context_recall"] for metrics in measured.values())
+    candidates = [setting for setting, metrics in measured.items() if metrics["context_recall"] >= best_recall - RECALL_TOLERANCE]
+    return min(candidates, key=lambda setting: (measured[setting]["tokens"], measured[setting]["p95"]))
+
+def tune_subject(subject, questions, embeddings):
+    """
+    Sweep the retrieval parameters of a subject.
+
+    Every (limit, threshold) of each collection is searched once per question, the
+    weights only change the fusion. The collections are tuned one after the other,
+    then the weights, each step keeping the best setting of the previous ones.
+
+    Returns:
+        Tuple of (metrics of the current profile, recommended settings, their metrics)
+    """
+    profile = subject_profiles.get(subject)
+    queries = [(vector, query_lexical_vector(question))
+               for vector, (question, _) in zip(embeddings.embed_documents([question for question, _ in questions]), questions)]
+    answers = [answer for _, answer in questions]
+
+    subject_key = limit_key(subject)
+    base_key = limit_key(BASE_COLLECTION)
+    subject_runs = sweep_collection(subject, subject, profile.subject_retrieval, queries)
+    base_runs = sweep_collection(BASE_COLLECTION, subject, profile.base_retrieval, queries)
+
+    def setting_of(current, key):
+        return current.get(key) or current.get("search_limit") or 10, current.get("score_threshold")
+
+    subject_setting = setting_of(profile.subject_retrieval, subject_key)
+    base_setting = setting_of(profile.base_retrieval, base_key)
+    weights = tuple(profile.weights)
+    baseline = evaluate(profile, subject_runs[subject_setting], base_runs[base_setting], weights, answers)
+
+    measured = {setting: evaluate(profile, runs, base_runs[base_setting], weights, answers)
+                for setting, runs in subject_runs.items()}
+    subject_setting = best_setting(measured)
+    measured = {setting: evaluate(profile, subject_runs[subject_setting], runs, weights, answers)
+                for setting, runs in base_runs.items()}
+    base_setting = best_setting(measured)
+    measured = {}
+    for subject_weight in sorted(set(SUBJECT_WEIGHTS) | {weights[0]}):
+        candidate = (subject_weight, round(1 - subject_weight, 4))
+        measured[candidate] = evaluate(profile, subject_runs[subject_setting], base_runs[base_setting], candidate, answers)
+    weights = best_setting(measured)
+
+    recommended = {
+        "subject": {**profile.subject_retrieval, subject_key: subject_setting[0], "score_threshold": subject_setting[1]},
+        BASE_COLLECTION: {**profile.base_retrieval, base_key: base_setting[0], "score_threshold": base_setting[1]},
+        "weights": list(weights),
+    }
+    return baseline, recommended, measured[weights]
+
+
+def write_profile(subject, retrieval, folder):
+    """Write the subject file with the recommended retrieval settings, keeping its other settings."""
+    data = {}
+    current_file = os.path.join(SUBJECT_PROFILES_FOLDER, f"{subject}.json")
+    if os.path.exists(current_file):
+        with open(current_file, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    data["retrieval"] = retrieval
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, f"{subject}.json"), "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+        file.write("\n")
+
+def print_metrics(label, metrics):
+    print(f"   {label:<12} recall@{RECALL_K} {metrics['recall']:.3f}  context recall {metrics['context_recall']:.3f}  "
+          f"p50 {metrics['p50']:.1f}ms  p95 {metrics['p95']:.1f}ms  context {metrics['tokens']:.0f} tokens")
+
+def run_benchmark(subjects, output_folder):
+    """Tune every subject with questions and write its recommended profile."""
+    questions = load_questions(subjects)
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDINGS_MODEL_PATH)
+    register_embeddings(embeddings)
+
+    for subject in subjects:
+        if len(questions[subject]) < MIN_QUESTIONS:
+            print(f"⚠️ Only {len(questions[subject])} questions of {subject} in {QA_DATA_FILE}, "
+                  f"{MIN_QUESTIONS} are needed to recommend a profile, skipped")
+            continue
+        print(f"\n🔍 Tuning {subject} on {len(questions[subject])} questions")
+        try:
+            baseline, recommended, metrics = tune_subject(subject, questions[subject], embeddings)
+        except Exception as e:
+            print(f"❌ Could not tune {subject}: {e}")
+            continue
+        print_metrics("current", baseline)
+        print_metrics("recommended", metrics)
+        print(f"   {json.dumps(recommended, ensure_ascii=False)}")
+        write_profile(subject, recommended, output_folder)
+
+    print(f"\n📊 Recommended profiles written to {output_folder}")
+
+# Execute the benchmark if this script is run directly
+if __name__ == "__main__":
+    # Usage: python benchmark_retrieval.py [--apply] [subject ...]
+    args = sys.argv[1:]
+    apply = "--apply" in args
+    subjects = [arg for arg in args if arg != "--apply"]
+    if not os.path.exists(QA_DATA_FILE):
+        print(f"❌ {QA_DATA_FILE} is needed to replay the questions")
+        sys.exit(1)
+    if not subjects:
+        with open(QA_DATA_FILE, "r", encoding="utf-8") as file:
+            subjects = sorted({item["subject"] for item in json.load(file) if item.get("subject")})
+    unknown = [subject for subject in subjects if subject not in subject_profiles.subjects()]
+    if unknown:
+        print(f"❌ Unknown subjects {', '.join(unknown)}, no profile in {SUBJECT_PROFILES_FOLDER}")
+        sys.exit(1)
+    # With --apply the running API picks the profiles up through the hot reload
+    run_benchmark(subjects, SUBJECT_PROFILES_FOLDER if apply else OUTPUT_FOLDER)
@@ -0,0 +1,130 @@
+import json
+import random
+import sys
+import time
+
+import numpy as np
+from langchain_huggingface import HuggingFaceEmbeddings
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, SearchParams
+
+from app.config.settings import EMBEDDINGS_MODEL_PATH, QDRANT_URL
+from app.utils.bulk_load import BulkLoadSession
+from app.utils.storage_profiles import STORAGE_PROFILES, VECTOR_NAME, estimate_ram_bytes, quantization_config, \
+    search_params, vector_params
+
+# Benchmark configuration
+SOURCE_COLLECTION = "base_knowledge"  # Collection whose points are copied into one collection per profile
+QA_DATA_FILE = "qa_data_fixed.json"  # Questions used as queries
+MAX_POINTS = 20000  # Points copied from the source collection
+QUERY_COUNT = 200
+SEARCH_LIMIT = 10  # Results compared with the exact search for recall@k
+SCROLL_BATCH_SIZE = 256
+BENCHMARK_PREFIX = "storage_benchmark_"
+RANDOM_SEED = 42
+
+
+def load_points(client, collection_name, max_points=MAX_POINTS):
+    """Copy up to max_points points with their vectors and payload from a collection."""
+    points = []
+    offset = None
+    while len(points) < max_points:
+        records, offset = client.scroll(
+            collection_name=collection_name, limit=min(SCROLL_BATCH_SIZE, max_points - len(points)),
+            offset=offset, with_payload=True, with_vectors=[VECTOR_NAME],
+        )
+        points.extend(PointStruct(id=record.id, vector=record.vector, payload=record.payload) for record in records)
+        if offset is None:
+            break
+    return points
+
+def load_queries(count=QUERY_COUNT):
+    """Embed a random sample of the QA questions."""
+    with open(QA_DATA_FILE, "r", encoding="utf-8") as file:
+        questions = [item["question"] for item in json.load(file) if item.get("question")]
+    sample = random.Random(RANDOM_SEED).sample(questions, min(count, len(questions)))
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDINGS_MODEL_PATH)
+    return embeddings.embed_documents(sample)
+
+def create_profile_collection(client, collection_name, profile, points):
+    """Create a collection with a storage profile and bulk load the points into it."""
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config={VECTOR_NAME: vector_params(profile)},
+        quantization_config=quantization_config(profile),
+    )
+    with BulkLoadSession(client, collection_name) as session:
+        for start in range(0, len(points), SCROLL_BATCH_SIZE):
+            session.upsert(points[start:start + SCROLL_BATCH_SIZE])
+
+def run_queries(client, collection_name, queries, params):
+    """Run every query, returning the IDs of the results and the latency of each query."""
+    results = []
+    latencies = []
+    for query in queries:
+        start_time = time.perf_counter()
+        response = client.query_points(
+            collection_name=collection_name, query=query, using=VECTOR_NAME,
+            limit=SEARCH_LIMIT, search_params=params, with_payload=False,
+        )
+        latencies.append(time.perf_counter() - start_time)
+        results.append([point.id for point in response.points])
+    return results, latencies
+
+def recall(results, truth):
+    """Mean share of the exact top-k found by each query."""
+    scores = [len(set(found) & set(expected)) / len(expected) for found, expected in zip(results, truth) if expected]
+    return float(np.mean(scores)) if scores else 0.0
+
+def run_benchmark(client, source_collection, profile_names):
+    """Print estimated RAM, p95 latency and recall@k of every profile, with the deltas to the memory profile."""
+    points = load_points(client, source_collection)
+    if not points:
+        print(f"❌ Collection {source_collection} has no points")
+        return
+    queries = load_queries()
+    print(f"🔍 Benchmarking {len(profile_names)} storage profiles on {len(points)} points of "
+          f"{source_collection} with {len(queries)} queries")
+
+    rows = []
+    truth = None
+    for profile_name in profile_names:
+        profile = STORAGE_PROFILES[profile_name]
+        collection_name = f"{BENCHMARK_PREFIX}{profile_name}"
+        try:
+            start_time = time.time()
+            create_profile_collection(client, collection_name, profile, points)
+            build_time = time.time() - start_time
+            if truth is None:
+                # Exact search over the first collection is the reference for every profile
+                truth, _ = run_queries(client, collection_name, queries, SearchParams(exact=True))
+            # Warm the caches before timing
+            run_queries(client, collection_name, queries[:10], search_params(profile))
+            results, latencies = run_queries(client, collection_name, queries, search_params(profile))
+        finally:
+            client.delete_collection(collection_name)
+        rows.append((profile_name, estimate_ram_bytes(profile, len(points)), float(np.percentile(latencies, 95)) * 1000,
+                     recall(results, truth), build_time))
+
+    baseline = next((row for row in rows if row[0] == "memory"), rows[0])
+    print(f"\n{'profile':<16}{'RAM (est.)':>12}{'p95 ms':>10}{'recall@' + str(SEARCH_LIMIT):>11}{'build s':>10}"
+          f"{'RAM Δ':>10}{'p95 Δ':>10}{'recall Δ':>10}")
+    for name, ram, p95, recall_at_k, build_time in rows:
+        ram_delta = (ram - baseline[1]) / baseline[1] * 100 if baseline[1] else 0.0
+        print(f"{name:<16}{ram / 1024**2:>10.1f}MB{p95:>10.2f}{recall_at_k:>11.3f}{build_time:>10.1f}"
+              f"{ram_delta:>9.0f}%{p95 - baseline[2]:>+10.2f}{recall_at_k - baseline[3]:>+10.3f}")
+
+# Execute the benchmark if this script is run directly
+if __name__ == "__main__":
+    # Usage: python benchmark_storage.py [source_collection] [profile ...]
+    source = sys.argv[1] if len(sys.argv) > 1 else SOURCE_COLLECTION
+    profiles = sys.argv[2:] or list(STORAGE_PROFILES)
+    unknown = [name for name in profiles if name not in STORAGE_PROFILES]
+    if unknown:
+        print(f"❌ Unknown storage profiles {', '.join(unknown)}, expected: {', '.join(STORAGE_PROFILES)}")
+        sys.exit(1)
+    # The memory profile goes first, it gives the exact reference results and the baseline
+    profiles.sort(key=lambda name: name != "memory")
+    run_benchmark(QdrantClient(url=QDRANT_URL), source, profiles)
@@ -1,14 +1,16 @@
 import gc
-import hashlib
 import time
 
 from langchain.schema import Document
 from langchain_community.document_loaders import TextLoader
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
-from qdrant_client.models import PointStruct
 
+from app.config.settings import SKIP_EXISTING_CHUNKS
+from app.utils.batch_embedding import embed_and_upsert, skip_existing
+from app.utils.bulk_load import BulkLoadSession
+from app.utils.lexical import has_lexical_vectors, sparse_vectors_config
 from app.utils.merge_meaning import SemanticChunker
+from app.utils.storage_profiles import VECTOR_NAME, collection_profile, quantization_config, vector_params
 
 client = QdrantClient(url="http://localhost:6333")  # (":memory:")
 
@@ -111,12 +113,13 @@ def create_collections(uuid, custom_client=None):
     c = custom_client if custom_client is not None else client
 
     if not c.collection_exists(uuid):
+            # Quantization and on-disk storage come from the storage profile of the collection
+            profile = collection_profile(uuid)
             c.create_collection(
                 collection_name=uuid,
                 vectors_config={
-                    "content": VectorParams(
-                        size=768, 
-                        distance=Distance.COSINE,
+                    VECTOR_NAME: vector_params(
+                        profile,
                         # Optimized HNSW index parameters
                         hnsw_config={
                             "m": 16,  # Number of bidirectional links created for each new element (higher = better recall, more memory)
@@ -125,6 +128,8 @@ def create_collections(uuid, custom_client=None):
                         }
                     )
                 },
+                sparse_vectors_config=sparse_vectors_config(profile.vectors_on_disk),
+                quantization_config=quantization_config(profile),
                 # Add optimized options for collection
                 optimizers_config={
                     "default_segment_number": 2,  # Optimal number of segments for this collection size
@@ -169,7 +174,7 @@ def load_data(file_name):
 
     return document
 
-def chunked_metadata(data, collection_name = "", custom_client=None, batch_size=100): #collection_name = uuid
+def chunked_metadata(data, collection_name = "", custom_client=None, batch_size=100, bulk=False): #collection_name = uuid
     """
     Add documents to a Qdrant collection with content-based IDs to prevent conflicts.
 
@@ -182,7 +187,9 @@ def chunked_metadata(data, collection_name = "", custom_client=None, batch_size=
         data: List of Document objects to add to the collection
         collection_name: Name of the collection to add the data to
         custom_client: Optional QdrantClient instance to use
-        batch_size: Number of points to insert in a single batch (default: 100)
+        batch_size: Maximum number of points embedded and inserted in a single batch (default: 100)
+        bulk: Load the data in a BulkLoadSession, which defers HNSW indexing until all of it
+            is inserted (default: False). Small online inserts leave indexing alone.
     """
     # Use the provided client or fall back to the global client
     c = custom_client if custom_client is not None else client
@@ -203,91 +210,55 @@ def chunked_metadata(data, collection_name = "", custom_client=None, batch_size=
             # Index might already exist, which is fine
             pass
 
-    chunked_metadata = []
-    total_points = len(data)
-    points_processed = 0
-
-    for item in data:
-        content = item.page_content
-        source = item.metadata["source"]
-
-        # Generate a deterministic ID based on the content
-        # This ensures that identical content will have the same ID
-        # and prevents conflicts when adding new data
-        content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
-        # Convert the hash to an integer (Qdrant requires integer IDs)
-        # We use the first 16 characters of the hash (64 bits)
-        point_id = int(content_hash[:16], 16)
-
-        # Tesla P40 optimized embedding generation
-        try:
-            # Use torch.no_grad() for better memory efficiency on Tesla P40
-            with torch.no_grad():
-                # Optimize embedding by using embed_query which is faster for single documents
-                content_vector = embeddings.embed_query(content)
-        except Exception as e:
-            print(f"Error during embedding generation: {str(e)}")
-            # Tesla P40 optimized recovery procedure
-            # Try to clean up memory and retry with more aggressive cleanup
-            gc.collect()
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-                # Reset peak memory stats for Tesla P40
-                if hasattr(torch.cuda, 'reset_peak_memory_stats'):
-                    torch.cuda.reset_peak_memory_stats()
-
-            # Wait a bit for Tesla P40 to stabilize
-            time.sleep(1)
-
-            # Retry with explicit CUDA synchronization for Tesla P40
-            with torch.no_grad():
-                if torch.cuda.is_available():
-                    torch.cuda.synchronize()
-                content_vector = embeddings.embed_query(content)
-
-        vector_dict = {"content": content_vector}
-
-        payload = {
-            "page_content": content,
-            "metadata": {
-                        "id": point_id,
-                        "source": source,
-                        }
-            }
-
-        metadata = PointStruct(id=point_id, vector=vector_dict, payload=payload)
-        chunked_metadata.append(metadata)
-
-        # Process in batches for better performance
-        if len(chunked_metadata) >= batch_size or points_processed == total_points - 1:
-            # Use upsert to add or update points
-            # If a point with the same ID already exists, it will be updated
-            c.upsert(
-                collection_name=collection_name,
-                points=chunked_metadata,
-                wait=False,  # Don't wait for immediate indexing (faster)
-            )
-            print(f"Inserted batch of {len(chunked_metadata)} points ({points_processed + 1}/{total_points})")
-            chunked_metadata = []  # Reset for next batch
-
-        points_processed += 1
-
-    # Final wait to ensure all data is indexed
-    if points_processed > 0:
-        c.update_collection(
+    # Chunks whose content hash is already stored need no embedding
+    skipped = 0
+    if SKIP_EXISTING_CHUNKS:
+        data, _, skipped = skip_existing(data, c, collection_name)
+
+    session = BulkLoadSession(c, collection_name).begin() if bulk and data else None
+
+    # Embed in length-sorted batches with embed_documents; the upsert of one batch
+    # overlaps the embedding of the next
+    def upsert(points):
+        if session is not None:
+            session.upsert(points)
+            return
+        # Use upsert to add or update points
+        # If a point with the same ID already exists, it will be updated
+        c.upsert(
             collection_name=collection_name,
-            optimizers_config={
-                "indexing_threshold": 0  # Force immediate indexing of all data
-            }
+            points=points,
+            # Online writes are small, wait so the routes invalidate the response cache only
+            # once the next question can see them
+            wait=True,
         )
-        print(f"Completed insertion of {points_processed} points into collection {collection_name}")
-        # Reset optimizer config to normal values
-        c.update_collection(
-            collection_name=collection_name,
-            optimizers_config={
-                "indexing_threshold": 20000  # Reset to normal value
-            }
+
+    total_points = len(data)
+    start_time = time.time()
+    try:
+        points_processed, failed = embed_and_upsert(
+            data, embeddings, upsert,
+            max_batch_size=batch_size,
+            after_batch=lambda done: print(f"Inserted batch ({done}/{total_points})"),
+            lexical=has_lexical_vectors(c, collection_name),
         )
+    except BaseException:
+        if session is not None:
+            session.abort()
+        raise
+    if session is not None:
+        # Build the index once over everything inserted
+        print(f"Building the index of collection {collection_name}...")
+        session.commit()
+    elapsed = time.time() - start_time
+    if failed:
+        print(f"Skipped {failed} documents that could not be embedded")
+    if skipped:
+        # Estimated from this run's time per chunk
+        saved = elapsed / total_points * skipped if total_points else 0.0
+        print(f"Skipped {skipped} chunks already in collection {collection_name} (about {saved:.1f}s of embedding saved)")
+    if points_processed > 0:
+        print(f"Completed insertion of {points_processed} points into collection {collection_name}")
 
 def delete_collection(uuid, custom_client=None):
     # Use the provided client or fall back to the global client
@@ -6,6 +6,8 @@ import uvicorn
 from fastapi import FastAPI
 from langchain.globals import set_verbose
 
+from app.chatbot.model import health_monitor
+from app.chatbot.retrieval import register_embeddings
 from app.config.gpu_config import configure_gpu
 from app.database.vector_db import initialize_embeddings
 from app.routes import user_routes, chatbot_routes
@@ -21,6 +23,16 @@ gpu_info = configure_gpu()
 
 # Initialize embeddings
 embeddings = initialize_embeddings(gpu_info)
+register_embeddings(embeddings)
+
+# Probe Ollama in the background instead of on every request
+@app.on_event("startup")
+def start_health_monitor():
+    health_monitor.start()
+
+@app.on_event("shutdown")
+def stop_health_monitor():
+    health_monitor.stop()
 
 # Include routers
 app.include_router(user_routes.router)
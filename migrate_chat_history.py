@@ -0,0 +1,49 @@
+import glob
+import json
+import os
+import time
+
+from app.config.settings import CHAT_HISTORY_FOLDER
+from app.utils.chat_history import migrate_legacy_file
+
+
+def migrate_chat_history(folder=CHAT_HISTORY_FOLDER):
+    """
+    Convert every legacy JSON history file of the folder into append-only conversation logs.
+
+    Legacy files are renamed with a .migrated suffix, so the script can be run again safely.
+
+    Args:
+        folder: The chat history folder
+
+    Returns:
+        Tuple of (files migrated, messages migrated, files that failed)
+    """
+    files_migrated = 0
+    messages_migrated = 0
+    failed = []
+
+    for file_path in sorted(glob.glob(os.path.join(folder, "*.txt"))):
+        if os.path.basename(file_path) == "what_is_this_for.txt":
+            continue
+        try:
+            messages = migrate_legacy_file(file_path)
+        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError) as e:
+            print(f"Skipping {file_path}: not a legacy chat history file ({e})")
+            failed.append(file_path)
+            continue
+        files_migrated += 1
+        messages_migrated += messages
+        print(f"Migrated {messages} messages from {file_path}")
+
+    return files_migrated, messages_migrated, failed
+
+# Execute the migration if this script is run directly
+if __name__ == "__main__":
+    start_time = time.time()
+    files, messages, failed = migrate_chat_history()
+    print(f"\nMigrated {messages} messages from {files} files in {time.time() - start_time:.2f} seconds")
+    if failed:
+        print(f"{len(failed)} files were left untouched:")
+        for file_path in failed:
+            print(f"  - {file_path}")
@@ -0,0 +1,156 @@
+import sys
+import time
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import HnswConfigDiff, PointStruct
+
+from app.chatbot.retrieval import invalidate_collection_info
+from app.config.settings import HYBRID_SEARCH_ENABLED, QDRANT_URL
+from app.utils.bulk_load import BulkLoadSession
+from app.utils.lexical import has_lexical_vectors, sparse_vectors_config, with_lexical_vector
+from app.utils.storage_profiles import VECTOR_NAME
+
+SCROLL_BATCH_SIZE = 256
+STAGING_SUFFIX = "__lexical"  # The copy of a collection while it is rebuilt
+
+
+def copy_points(client, source, target, add_lexical):
+    """
+    Copy every point of a collection into another one in a bulk load session.
+
+    Returns:
+        The number of points copied
+    """
+    copied = 0
+    offset = None
+    with BulkLoadSession(client, target) as session:
+        while True:
+            records, offset = client.scroll(
+                collection_name=source, limit=SCROLL_BATCH_SIZE, offset=offset,
+                with_payload=True, with_vectors=True,
+            )
+            if records:
+                if add_lexical:
+                    points = [with_lexical_vector(record) for record in records]
+                else:
+                    points = [PointStruct(id=record.id, vector=record.vector, payload=record.payload) for record in records]
+                session.upsert(points)
+                copied += len(records)
+            if offset is None:
+                return copied
+
+def create_like(client, collection_name, source_info):
+    """Create a collection with the layout of another one plus the lexical vector."""
+    params = source_info.config.params
+    content_params = params.vectors[VECTOR_NAME]
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=params.vectors,
+        sparse_vectors_config=sparse_vectors_config(bool(content_params.on_disk)),
+        hnsw_config=HnswConfigDiff(**source_info.config.hnsw_config.model_dump()),
+        quantization_config=source_info.config.quantization_config,
+    )
+    # Payload indexes, e.g. the tenant index of the shared business collection
+    for field_name, schema in (source_info.payload_schema or {}).items():
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=schema.params or schema.data_type,
+        )
+
+def migrate_collection(client, collection_name):
+    """
+    Rebuild a collection with lexical vectors.
+
+    Qdrant cannot add a sparse vector to an existing collection, so the points are copied
+    with their lexical vector into a staging collection, the collection is created again
+    with the lexical vector and the points are copied back. Dense vectors are copied as
+    stored, nothing is embedded again. Once the collection has been deleted, the staging
+    collection is kept until the copy back succeeds, running the script again resumes from it.
+
+    Returns:
+        The number of points in the rebuilt collection
+    """
+    staging_name = f"{collection_name}{STAGING_SUFFIX}"
+    if not client.collection_exists(staging_name):
+        info = client.get_collection(collection_name)
+        create_like(client, staging_name, info)
+        try:
+            expected = client.count(collection_name, exact=True).count
+            copied = copy_points(client, collection_name, staging_name, add_lexical=True)
+            stored = client.count(staging_name, exact=True).count
+            if stored < expected:
+                raise RuntimeError(f"only {stored} of the {expected} points were copied to {staging_name}")
+        except BaseException:
+            # The collection is untouched, an incomplete staging copy must not be resumed from
+            client.delete_collection(staging_name)
+            raise
+        print(f"Copied {copied} points of {collection_name} with lexical vectors to {staging_name}")
+        client.delete_collection(collection_name)
+
+    if not client.collection_exists(collection_name):
+        create_like(client, collection_name, client.get_collection(staging_name))
+    copied = copy_points(client, staging_name, collection_name, add_lexical=False)
+    stored = client.count(collection_name, exact=True).count
+    if stored < copied:
+        raise RuntimeError(f"only {stored} of the {copied} points were copied back, keeping {staging_name}")
+    client.delete_collection(staging_name)
+    return stored
+
+def migrate_lexical(collection_names, client=None):
+    """
+    Add lexical vectors to existing collections for hybrid search.
+
+    Collections that already have lexical vectors are skipped, so the script can be run
+    again safely. Collections are unavailable while they are rebuilt.
+
+    Args:
+        collection_names: The collections to rebuild, every collection if empty
+        client: Optional QdrantClient instance to use
+
+    Returns:
+        Tuple of (collections rebuilt, collections that failed)
+    """
+    client = client or QdrantClient(url=QDRANT_URL)
+    if not collection_names:
+        collection_names = sorted(
+            collection.name for collection in client.get_collections().collections
+            if not collection.name.endswith(STAGING_SUFFIX)
+        )
+
+    rebuilt = 0
+    failed = []
+    for collection_name in collection_names:
+        staging_name = f"{collection_name}{STAGING_SUFFIX}"
+        try:
+            if not client.collection_exists(staging_name) and has_lexical_vectors(client, collection_name):
+                print(f"{collection_name} already has lexical vectors")
+                continue
+            start_time = time.time()
+            points = migrate_collection(client, collection_name)
+            # For callers in the API process, the retrievers look the lexical vectors up again
+            invalidate_collection_info(collection_name)
+            print(f"Rebuilt {collection_name} ({points} points) in {time.time() - start_time:.1f} seconds")
+            rebuilt += 1
+        except Exception as e:
+            print(f"Error rebuilding {collection_name}: {e}")
+            invalidate_collection_info(collection_name)
+            failed.append(collection_name)
+
+    return rebuilt, failed
+
+# Execute the migration if this script is run directly
+if __name__ == "__main__":
+    # Usage: python migrate_lexical.py [collection ...]
+    if not HYBRID_SEARCH_ENABLED:
+        print("HYBRID_SEARCH_ENABLED is off, collections would be rebuilt without lexical vectors")
+        sys.exit(1)
+
+    start_time = time.time()
+    rebuilt, failed = migrate_lexical(sys.argv[1:])
+    print(f"\nRebuilt {rebuilt} collections in {time.time() - start_time:.2f} seconds")
+    if failed:
+        print(f"{len(failed)} collections were not rebuilt:")
+        for collection_name in failed:
+            print(f"  - {collection_name}")
+    print("Restart the API so the rebuilt collections are searched dense + lexical")
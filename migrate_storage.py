@@ -0,0 +1,72 @@
+import sys
+import time
+
+from qdrant_client import QdrantClient
+
+from app.config.settings import QDRANT_URL
+from app.utils.bulk_load import wait_for_green
+from app.utils.storage_profiles import STORAGE_PROFILES, apply_profile, collection_profile, estimate_ram_bytes, \
+    get_profile
+
+MIGRATION_TIMEOUT = 3600  # Seconds to wait for a converted collection to turn green
+
+
+def migrate_storage(collection_names, profile_name=None, client=None):
+    """
+    Convert existing collections to their storage profile in place.
+
+    Each collection is converted to the given profile, or to the one configured for it
+    by STORAGE_PROFILE / STORAGE_PROFILE_OVERRIDES. Qdrant rebuilds the segments in the
+    background and the collections stay searchable, so the script can be run on a live
+    server and run again safely.
+
+    Args:
+        collection_names: The collections to convert, every collection if empty
+        profile_name: The profile to apply to all of them, None uses the configured profiles
+        client: Optional QdrantClient instance to use
+
+    Returns:
+        Tuple of (collections converted, collections that failed)
+    """
+    client = client or QdrantClient(url=QDRANT_URL)
+    if not collection_names:
+        collection_names = sorted(collection.name for collection in client.get_collections().collections)
+
+    converted = 0
+    failed = []
+    for collection_name in collection_names:
+        profile = get_profile(profile_name) if profile_name else collection_profile(collection_name)
+        try:
+            points = client.count(collection_name, exact=False).count
+            print(f"Converting {collection_name} ({points} points) to storage profile '{profile.name}', "
+                  f"about {estimate_ram_bytes(profile, points) / 1024**2:.1f}MB of vectors and graph in RAM")
+            start_time = time.time()
+            apply_profile(client, collection_name, profile)
+            if wait_for_green(client, collection_name, MIGRATION_TIMEOUT):
+                print(f"Converted {collection_name} in {time.time() - start_time:.1f} seconds")
+            converted += 1
+        except Exception as e:
+            print(f"Error converting {collection_name}: {e}")
+            failed.append(collection_name)
+
+    return converted, failed
+
+# Execute the migration if this script is run directly
+if __name__ == "__main__":
+    # Usage: python migrate_storage.py [--profile NAME] [collection ...]
+    args = sys.argv[1:]
+    profile_name = None
+    if args[:1] == ["--profile"]:
+        if len(args) < 2 or args[1] not in STORAGE_PROFILES:
+            print(f"Expected a profile after --profile, one of: {', '.join(STORAGE_PROFILES)}")
+            sys.exit(1)
+        profile_name = args[1]
+        args = args[2:]
+
+    start_time = time.time()
+    converted, failed = migrate_storage(args, profile_name)
+    print(f"\nConverted {converted} collections in {time.time() - start_time:.2f} seconds")
+    if failed:
+        print(f"{len(failed)} collections were left untouched:")
+        for collection_name in failed:
+            print(f"  - {collection_name}")
@@ -0,0 +1,112 @@
+import glob
+import os
+import sys
+import time
+
+from qdrant_client import QdrantClient
+
+from app.config.settings import BUSINESS_SHARED_COLLECTION, QDRANT_URL
+from app.utils.bulk_load import BulkLoadSession
+from app.utils.lexical import has_lexical_vectors, with_lexical_vector
+from app.utils.storage_profiles import VECTOR_NAME
+from app.utils.tenant_storage import count_tenant_points, delete_tenant, ensure_shared_collection, to_tenant_point
+
+USERS_FOLDER = "users"  # Business users have a <username>.json file of their QA pairs here
+SCROLL_BATCH_SIZE = 256
+
+
+def business_users(client, folder=USERS_FOLDER):
+    """List the business users that still have their own collection."""
+    names = {os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(folder, "*.json"))}
+    return sorted(name for name in names if client.collection_exists(name))
+
+def migrate_user(client, session, user_name, lexical=False):
+    """
+    Copy the points of a per-user collection into the shared collection.
+
+    Dense vectors are copied as stored, nothing is embedded again. Lexical vectors are
+    computed from the text when the shared collection has them.
+
+    Returns:
+        The IDs of the points in the shared collection
+    """
+    point_ids = set()
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=user_name, limit=SCROLL_BATCH_SIZE, offset=offset,
+            with_payload=True, with_vectors=[VECTOR_NAME],
+        )
+        if records:
+            points = [to_tenant_point(record, user_name) for record in records]
+            if lexical:
+                points = [with_lexical_vector(point) for point in points]
+            session.upsert(points)
+            point_ids.update(point.id for point in points)
+        if offset is None:
+            return point_ids
+
+def migrate_tenants(user_names, keep_collections=False, client=None):
+    """
+    Move per-user business collections into the shared tenant collection.
+
+    The points of each user are copied with the user as tenant. Once the whole load is
+    committed, a user's collection is deleted if the shared collection holds all of the
+    user's points. Earlier points of a user in the shared collection are removed first,
+    so the script can be run again safely.
+
+    Args:
+        user_names: The users to migrate, every user of the users/ folder with a collection if empty
+        keep_collections: Keep the per-user collections after copying them
+        client: Optional QdrantClient instance to use
+
+    Returns:
+        Tuple of (users migrated, points copied, users that failed)
+    """
+    client = client or QdrantClient(url=QDRANT_URL)
+    user_names = user_names or business_users(client)
+    ensure_shared_collection(client)
+    lexical = has_lexical_vectors(client, BUSINESS_SHARED_COLLECTION)
+
+    copied = {}
+    failed = []
+    with BulkLoadSession(client, BUSINESS_SHARED_COLLECTION) as session:
+        for user_name in user_names:
+            try:
+                delete_tenant(client, user_name)
+                copied[user_name] = migrate_user(client, session, user_name, lexical)
+                print(f"Copied {len(copied[user_name])} points of {user_name}")
+            except Exception as e:
+                print(f"Error copying {user_name}: {e}")
+                failed.append(user_name)
+
+    migrated = 0
+    for user_name, point_ids in copied.items():
+        stored = count_tenant_points(client, user_name)
+        if stored < len(point_ids):
+            print(f"Only {stored} of the {len(point_ids)} points of {user_name} are in {BUSINESS_SHARED_COLLECTION}, "
+                  f"keeping its collection")
+            failed.append(user_name)
+            continue
+        if not keep_collections:
+            client.delete_collection(user_name)
+        migrated += 1
+
+    return migrated, sum(len(point_ids) for point_ids in copied.values()), failed
+
+# Execute the migration if this script is run directly
+if __name__ == "__main__":
+    # Usage: python migrate_tenants.py [--keep] [username ...]
+    args = sys.argv[1:]
+    keep = "--keep" in args
+    users = [arg for arg in args if arg != "--keep"]
+
+    start_time = time.time()
+    migrated, points, failed = migrate_tenants(users, keep_collections=keep)
+    print(f"\nMigrated {migrated} users ({points} points) into {BUSINESS_SHARED_COLLECTION} "
+          f"in {time.time() - start_time:.2f} seconds")
+    if failed:
+        print(f"{len(failed)} users were left in their own collection:")
+        for user_name in failed:
+            print(f"  - {user_name}")
+    print("Set BUSINESS_STORAGE_MODE=shared and restart the API to serve the migrated users from the shared collection")
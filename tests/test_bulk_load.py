@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from qdrant_client.models import CollectionStatus
+
+from app.utils import bulk_load
+from app.utils.bulk_load import BulkLoadSession, restore_open_sessions
+
+
+class FakeClient:
+    """Records the indexing thresholds set on a collection."""
+    def __init__(self, indexing_threshold=10000):
+        self.indexing_threshold = indexing_threshold
+        self.thresholds = []
+
+    def get_collection(self, collection_name):
+        optimizer_config = SimpleNamespace(indexing_threshold=self.indexing_threshold)
+        return SimpleNamespace(status=CollectionStatus.GREEN, config=SimpleNamespace(optimizer_config=optimizer_config))
+
+    def update_collection(self, collection_name, optimizers_config):
+        self.indexing_threshold = optimizers_config.indexing_threshold
+        self.thresholds.append(optimizers_config.indexing_threshold)
+
+    def upsert(self, collection_name, points, wait):
+        pass
+
+
+def test_restore_open_sessions_turns_indexing_back_on():
+    client = FakeClient()
+    session = BulkLoadSession(client, "legal").begin()
+    assert client.indexing_threshold == 0
+
+    assert restore_open_sessions() == 1
+    assert client.indexing_threshold == 10000
+    assert not bulk_load._open_sessions
+    # The session itself does not restore it a second time
+    session.abort()
+    assert client.thresholds == [0, 10000]
+
+
+def test_closed_session_is_not_restored_again():
+    client = FakeClient()
+    with BulkLoadSession(client, "legal") as session:
+        session.upsert([object()])
+
+    assert restore_open_sessions() == 0
+    assert client.thresholds == [0, 10000]
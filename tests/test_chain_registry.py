@@ -0,0 +1,108 @@
+import threading
+import time
+
+from app.chatbot.chain_registry import ChainRegistry
+
+
+class FakeChain:
+    """Stands in for a CompiledRagChain, the registry only reads its collections."""
+    def __init__(self, collections, build):
+        self.collections = frozenset(collections)
+        self.build = build
+
+
+def counting_builder(collections, delay=0.0):
+    calls = []
+    lock = threading.Lock()
+
+    def build():
+        with lock:
+            calls.append(None)
+            build_number = len(calls)
+        time.sleep(delay)
+        return FakeChain(collections, build_number)
+
+    return build, calls
+
+
+def test_concurrent_get_or_build_of_one_key_builds_once():
+    registry = ChainRegistry(max_size=4)
+    build, calls = counting_builder(["legal"], delay=0.1)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get_or_build(("business", "legal"), build)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(chain) for chain in results}) == 1
+    assert registry._key_locks == {}
+
+
+def test_build_overtaken_by_invalidate_is_built_again():
+    registry = ChainRegistry(max_size=4)
+    build, calls = counting_builder(["legal", "base_knowledge"], delay=0.2)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(registry.get_or_build(("business", "legal"), build)))
+    thread.start()
+    time.sleep(0.05)
+    registry.invalidate("base_knowledge")
+    thread.join()
+
+    assert len(calls) == 2
+    assert results[0].build == 2
+    assert registry.get_or_build(("business", "legal"), build) is results[0]
+
+
+def test_invalidate_of_another_collection_keeps_the_build():
+    registry = ChainRegistry(max_size=4)
+    build, calls = counting_builder(["legal"], delay=0.2)
+    thread = threading.Thread(target=registry.get_or_build, args=(("business", "legal"), build))
+    thread.start()
+    time.sleep(0.05)
+    registry.invalidate("history")
+    thread.join()
+
+    assert len(calls) == 1
+    assert len(registry) == 1
+
+
+def test_build_overtaken_by_clear_is_built_again():
+    registry = ChainRegistry(max_size=4)
+    build, calls = counting_builder(["legal"], delay=0.2)
+    thread = threading.Thread(target=registry.get_or_build, args=(("business", "legal"), build))
+    thread.start()
+    time.sleep(0.05)
+    registry.clear()
+    thread.join()
+
+    assert len(calls) == 2
+    assert len(registry) == 1
+
+
+def test_invalidate_drops_the_chains_of_a_collection():
+    registry = ChainRegistry(max_size=4)
+    registry.get_or_build(("business", "legal"), counting_builder(["legal", "base_knowledge"])[0])
+    registry.get_or_build(("user", "alice"), counting_builder(["alice"])[0])
+
+    assert registry.invalidate("base_knowledge") == 1
+    assert len(registry) == 1
+    assert registry.invalidate("base_knowledge") == 0
+
+
+def test_least_recently_used_chain_is_evicted():
+    registry = ChainRegistry(max_size=2)
+    builds = {name: counting_builder([name]) for name in ("a", "b", "c")}
+    registry.get_or_build("a", builds["a"][0])
+    registry.get_or_build("b", builds["b"][0])
+    # Using "a" again makes "b" the least recently used
+    registry.get_or_build("a", builds["a"][0])
+    registry.get_or_build("c", builds["c"][0])
+
+    assert len(registry) == 2
+    registry.get_or_build("a", builds["a"][0])
+    registry.get_or_build("b", builds["b"][0])
+    assert len(builds["a"][1]) == 1
+    assert len(builds["b"][1]) == 2
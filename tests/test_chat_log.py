@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+
+from app.utils import chat_history
+from app.utils.chat_log import INDEX_ENTRY, ChatLog
+
+
+def messages(count, start=0):
+    return [{"type": "human", "content": f"câu hỏi {number}"} for number in range(start, start + count)]
+
+
+def test_append_and_read_window(tmp_path):
+    chat_log = ChatLog(str(tmp_path), "alice")
+    assert not chat_log.exists()
+    assert chat_log.read_window() == ([], [])
+
+    assert chat_log.append(messages(8)) == 8
+    first, last = chat_log.read_window(first=1, last=3)
+
+    assert len(chat_log) == 8
+    assert first == messages(1)
+    assert last == messages(3, start=5)
+
+
+def test_append_skips_messages_of_the_existing_window(tmp_path):
+    chat_log = ChatLog(str(tmp_path), "alice")
+    chat_log.append(messages(4))
+
+    assert chat_log.append(messages(6), skip_existing_window=4) == 2
+    assert chat_log.read_window(first=1, last=6)[1] == messages(6)
+
+
+def test_append_only_if_empty(tmp_path):
+    chat_log = ChatLog(str(tmp_path), "alice")
+    assert chat_log.append(messages(2), only_if_empty=True) == 2
+    assert chat_log.append(messages(3, start=2), only_if_empty=True) == 0
+    assert len(chat_log) == 2
+
+
+def test_compact_keeps_the_first_and_the_most_recent_messages(tmp_path):
+    chat_log = ChatLog(str(tmp_path), "alice")
+    chat_log.append(messages(10))
+
+    assert chat_log.compact(4) == 6
+    assert len(chat_log) == 4
+    assert chat_log.read_window(first=1, last=3) == (messages(1), messages(3, start=7))
+    assert chat_log.compact(4) == 0
+
+
+def test_torn_record_is_truncated_by_the_next_append(tmp_path):
+    chat_log = ChatLog(str(tmp_path), "alice")
+    chat_log.append(messages(3))
+    with open(chat_log.log_path, "ab") as log_file:
+        log_file.write(b'{"type": "human", "cont')
+
+    assert chat_log.read_window(first=0, last=5)[1] == messages(3)
+    chat_log.append(messages(1, start=3))
+    assert chat_log.read_window(first=0, last=5)[1] == messages(4)
+
+
+def test_repair_rebuilds_an_index_that_points_past_the_log(tmp_path):
+    chat_log = ChatLog(str(tmp_path), "alice")
+    chat_log.append(messages(3))
+    # A compaction interrupted between its two replaces leaves the old index over a shorter log
+    with open(chat_log.log_path, "wb") as log_file:
+        log_file.write(b"".join((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+                                for message in messages(2)))
+
+    assert chat_log.read_window(first=0, last=5)[1] == messages(2)
+    assert len(chat_log) == 2
+
+
+def test_repair_drops_a_partial_index_entry(tmp_path):
+    chat_log = ChatLog(str(tmp_path), "alice")
+    chat_log.append(messages(3))
+    with open(chat_log.index_path, "ab") as index_file:
+        index_file.write(b"\x01\x02")
+    with chat_log._lock():
+        chat_log._repair()
+
+    assert os.path.getsize(chat_log.index_path) == 3 * INDEX_ENTRY.size
+    assert chat_log.read_window(first=0, last=5)[1] == messages(3)
+
+
+def test_concurrent_migrations_copy_the_history_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(chat_history, "CHAT_HISTORY_FOLDER", str(tmp_path / "history"))
+    # Copies of the legacy file stand in for callers that all read it before the first rename
+    legacy_files = []
+    for number in range(4):
+        legacy_file = tmp_path / f"conversation_data_{number}.json"
+        legacy_file.write_text(json.dumps({"alice": {"legal": messages(5)}}), encoding="utf-8")
+        legacy_files.append(str(legacy_file))
+
+    threads = [threading.Thread(target=chat_history.migrate_legacy_file, args=(legacy_file,))
+               for legacy_file in legacy_files]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(chat_history.get_chat_log("alice", "legal")) == 5
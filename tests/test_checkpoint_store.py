@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+from app.utils.checkpoint_store import CheckpointStore, file_content_hash
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints.db"))
+
+
+def chunk_rows(store, collection, file_path):
+    return store._connection().execute(
+        "SELECT COUNT(*) FROM chunks WHERE collection = ? AND file_path = ?", (collection, file_path)
+    ).fetchone()[0]
+
+
+def test_start_file_returns_the_committed_indexes(store):
+    assert store.start_file("legal", "a.txt", "hash-1", chunking="semantic:whole") == set()
+    store.commit_chunks("legal", "a.txt", [0, 1, 3])
+    store.commit_chunks("legal", "a.txt", [3])
+
+    assert store.start_file("legal", "a.txt", "hash-1", chunking="semantic:whole") == {0, 1, 3}
+    assert not store.is_done("legal", "a.txt", "hash-1")
+
+
+def test_changed_content_resets_the_checkpoint(store):
+    store.start_file("legal", "a.txt", "hash-1")
+    store.commit_chunks("legal", "a.txt", [0, 1])
+
+    assert store.start_file("legal", "a.txt", "hash-2") == set()
+    assert chunk_rows(store, "legal", "a.txt") == 0
+
+
+def test_changed_chunking_resets_the_checkpoint(store):
+    store.start_file("legal", "a.txt", "hash-1", chunking="semantic:whole")
+    store.commit_chunks("legal", "a.txt", [0, 1])
+
+    assert store.start_file("legal", "a.txt", "hash-1", chunking="semantic:streamed") == set()
+    assert store.start_file("legal", "a.txt", "hash-1", chunking="semantic:streamed") == set()
+
+
+def test_checkpoints_are_kept_per_collection(store):
+    store.start_file("legal", "a.txt", "hash-1")
+    store.commit_chunks("legal", "a.txt", [0])
+    store.start_file("history", "a.txt", "hash-1")
+
+    assert store.start_file("legal", "a.txt", "hash-1") == {0}
+
+
+def test_finish_file_marks_it_done_and_clears_the_chunk_rows(store):
+    store.start_file("legal", "a.txt", "hash-1")
+    store.commit_chunks("legal", "a.txt", [0, 1, 2])
+    store.finish_file("legal", "a.txt", 3)
+
+    assert chunk_rows(store, "legal", "a.txt") == 0
+    assert store.is_done("legal", "a.txt", "hash-1")
+    assert not store.is_done("legal", "a.txt", "hash-2")
+
+
+def test_database_without_the_chunking_column_is_upgraded(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE files (collection TEXT NOT NULL, file_path TEXT NOT NULL, content_hash TEXT NOT NULL, "
+        "status TEXT NOT NULL, total_chunks INTEGER, updated_at REAL NOT NULL, PRIMARY KEY (collection, file_path))"
+    )
+    connection.execute("INSERT INTO files VALUES ('legal', 'a.txt', 'hash-1', 'done', 3, 0)")
+    connection.commit()
+    connection.close()
+
+    store = CheckpointStore(path)
+    assert store.is_done("legal", "a.txt", "hash-1")
+    # Checkpoints written before the column existed do not say how the file was chunked
+    assert store.start_file("legal", "a.txt", "hash-1", chunking="semantic:whole") == set()
+
+
+def test_file_content_hash_follows_the_content(tmp_path):
+    file_path = tmp_path / "a.txt"
+    file_path.write_text("Điều 1.", encoding="utf-8")
+    first = file_content_hash(str(file_path))
+    file_path.write_text("Điều 2.", encoding="utf-8")
+
+    assert file_content_hash(str(file_path)) != first
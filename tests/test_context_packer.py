@@ -0,0 +1,87 @@
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.chatbot.context_packer import DOCUMENT_SEPARATOR_TOKENS, MIN_ANSWER_TOKENS, TokenCounter, count_message_tokens, \
+    fit_context_budget, pack_context
+from app.chatbot.prompts import get_qa_prompt, get_user_qa_prompt
+from app.config.settings import MODEL_NUM_CTX, MODEL_NUM_PREDICT
+
+QUESTION = "Người lao động nghỉ việc có được trả trợ cấp thôi việc không?"
+
+
+def estimating_counter():
+    # Word-count estimate, the model tokenizer is not needed to check the arithmetic
+    counter = TokenCounter("unused")
+    counter._loaded = True
+    return counter
+
+
+def long_history(turns):
+    answer = "Theo Điều 46 Bộ luật Lao động năm 2019, người sử dụng lao động có trách nhiệm trả trợ cấp thôi việc. " * 8
+    history = []
+    for turn in range(turns):
+        history.append(HumanMessage(content=f"Câu hỏi số {turn} về hợp đồng lao động?"))
+        history.append(AIMessage(content=answer))
+    return history
+
+
+def documents(count):
+    return [Document(page_content=f"Khoản {number} Điều 46 quy định về trợ cấp thôi việc cho người lao động " * 5,
+                     metadata={"source": f"luat-{number}"}) for number in range(count)]
+
+
+def prompt_tokens(subject, counter):
+    return count_message_tokens(get_qa_prompt(subject).format_messages(context="", chat_history=[], input=QUESTION),
+                                counter)
+
+
+def test_long_history_is_trimmed_so_prompt_history_context_and_answer_fit():
+    counter = estimating_counter()
+    # The legal prompt is the longest, over a thousand words
+    legal_tokens = prompt_tokens("legal", counter)
+    history = long_history(6)
+    assert legal_tokens + count_message_tokens(history, counter) + MODEL_NUM_PREDICT > MODEL_NUM_CTX
+
+    budget, kept = fit_context_budget(legal_tokens, history, 768, counter=counter)
+    context = pack_context(documents(20), budget, counter=counter)
+
+    assert 0 < budget <= 768
+    assert len(kept) < len(history)
+    # The newest messages are kept
+    assert kept == history[len(history) - len(kept):]
+    assert context
+    context_tokens = sum(counter.count(document.page_content) + DOCUMENT_SEPARATOR_TOKENS for document in context)
+    assert legal_tokens + count_message_tokens(kept, counter) + context_tokens + MIN_ANSWER_TOKENS <= MODEL_NUM_CTX
+
+
+def test_answer_reserve_gives_way_before_the_history():
+    counter = estimating_counter()
+    user_tokens = count_message_tokens(get_user_qa_prompt().format_messages(context="", chat_history=[], input=QUESTION),
+                                       counter)
+    history = long_history(1)
+    # The full reserve would leave less than the smallest useful context
+    assert MODEL_NUM_CTX - user_tokens - count_message_tokens(history, counter) - MODEL_NUM_PREDICT < 256
+
+    budget, kept = fit_context_budget(user_tokens, history, 768, counter=counter)
+
+    assert budget >= 256
+    assert kept == history
+
+
+def test_short_prompt_and_history_keep_the_configured_budget():
+    counter = estimating_counter()
+    history = long_history(1)
+
+    budget, kept = fit_context_budget(200, history, 384, counter=counter)
+
+    assert budget == 384
+    assert kept == history
+
+
+def test_prompt_over_the_window_gives_no_context():
+    counter = estimating_counter()
+    budget, kept = fit_context_budget(MODEL_NUM_CTX, long_history(2), 768, counter=counter)
+
+    assert budget <= 0
+    assert kept == []
+    assert pack_context(documents(3), budget, counter=counter) == []
@@ -0,0 +1,124 @@
+import json
+import os
+import random
+
+import pytest
+
+from app.utils.merge_meaning import SIMILARITY_BLOCK_SIZE, SemanticChunker
+
+CORPUS_FILE = os.path.join(os.path.dirname(__file__), "fixtures", "chunker_corpus.json")
+# Settings used by add_knowledge.py and data_insert.py
+CHUNKER_SETTINGS = [(2, 20, 0.3), (5, 20, 0.3)]
+
+with open(CORPUS_FILE, "r", encoding="utf-8") as corpus_file:
+    CORPUS = json.load(corpus_file)
+
+
+def semantic_groups(chunker, sentences):
+    """Cut the sentences at the semantic boundaries, as create_semantic_chunks does."""
+    boundaries = chunker.find_banded_boundaries(chunker.calculate_banded_similarities(sentences))
+    return [list(range(start, end)) for start, end in zip([0] + boundaries, boundaries)]
+
+
+def fragmented_groups(sentences, seed):
+    """Cut the sentences into groups of 1-2 sentences, the worst case for merging."""
+    rng = random.Random(seed)
+    groups = []
+    start = 0
+    while start < len(sentences):
+        size = rng.randint(1, 2)
+        groups.append(list(range(start, min(start + size, len(sentences)))))
+        start += size
+    return groups
+
+
+def resplits(chunker, sentences, groups):
+    """True if joining a group and splitting it again does not give back its sentences."""
+    return any(len(chunker.split_into_sentences(" ".join(sentences[i] for i in group))) != len(group)
+               for group in groups)
+
+
+def merge_both(chunker, sentences, groups):
+    legacy = chunker.merge_small_chunks([" ".join(sentences[i] for i in group) for group in groups])
+    merged = chunker.merge_small_sentence_groups(sentences, groups)
+    return legacy, merged, [" ".join(sentences[i] for i in group) for group in merged]
+
+
+@pytest.mark.parametrize("settings", CHUNKER_SETTINGS)
+@pytest.mark.parametrize("grouping", ["semantic", "fragmented"])
+def test_incremental_merge_matches_the_legacy_merge(settings, grouping):
+    chunker = SemanticChunker(*settings)
+    compared = 0
+    for seed, document in enumerate(CORPUS):
+        sentences = chunker.split_into_sentences(document["text"])
+        groups = semantic_groups(chunker, sentences) if grouping == "semantic" else fragmented_groups(sentences, seed)
+        legacy, merged, incremental = merge_both(chunker, sentences, groups)
+        # Known difference: merge_small_chunks counts the sentences of a joined chunk by
+        # splitting it again, and underthesea sometimes cuts the joined text elsewhere (qa-1
+        # has a web address split as "...cantho." "gov." that joins back into one sentence).
+        # The incremental merge keeps the sentence count of its groups, so the two can pick
+        # another smallest chunk from there on. benchmark_chunker.py reports 18/20 identical
+        # merges at min_sentences=5 on the synthetic documents for this reason.
+        if resplits(chunker, sentences, groups) or resplits(chunker, sentences, merged):
+            continue
+        assert incremental == legacy, document["name"]
+        compared += 1
+    assert compared >= len(CORPUS) // 2
+
+
+def test_resplit_document_is_the_only_semantic_difference():
+    chunker = SemanticChunker(5, 20, 0.3)
+    different = []
+    for document in CORPUS:
+        sentences = chunker.split_into_sentences(document["text"])
+        legacy, _, incremental = merge_both(chunker, sentences, semantic_groups(chunker, sentences))
+        if incremental != legacy:
+            different.append(document["name"])
+    assert different == ["qa-1"]
+
+
+def test_merged_groups_keep_every_sentence_once():
+    chunker = SemanticChunker(5, 20, 0.3)
+    for seed, document in enumerate(CORPUS):
+        sentences = chunker.split_into_sentences(document["text"])
+        merged = chunker.merge_small_sentence_groups(sentences, fragmented_groups(sentences, seed))
+        assert sorted(i for group in merged for i in group) == list(range(len(sentences)))
+        assert all(len(group) >= chunker.min_sentences for group in merged) or len(merged) == 1
+
+
+def corpus_sentences(chunker, count, seed=0):
+    """Sample sentences of the corpus into one long document."""
+    sentences = [sentence for document in CORPUS for sentence in chunker.split_into_sentences(document["text"])]
+    rng = random.Random(seed)
+    return [rng.choice(sentences) for _ in range(count)]
+
+
+@pytest.mark.parametrize("settings", CHUNKER_SETTINGS + [(1, 3, 0.2)])
+def test_banded_boundaries_match_the_dense_boundaries(settings):
+    chunker = SemanticChunker(*settings)
+    for document in CORPUS:
+        sentences = chunker.split_into_sentences(document["text"])
+        dense = chunker.find_semantic_boundaries(chunker.calculate_sentence_similarities(sentences))
+        banded = chunker.find_banded_boundaries(chunker.calculate_banded_similarities(sentences))
+        assert banded == dense, document["name"]
+
+
+# Sentence counts around the edges of the SIMILARITY_BLOCK_SIZE blocks
+@pytest.mark.parametrize("count", [SIMILARITY_BLOCK_SIZE - 1, SIMILARITY_BLOCK_SIZE, SIMILARITY_BLOCK_SIZE + 1,
+                                   2 * SIMILARITY_BLOCK_SIZE + 3])
+def test_band_matches_the_dense_matrix_across_block_edges(count):
+    chunker = SemanticChunker(2, 20, 0.3)
+    sentences = corpus_sentences(chunker, count, seed=count)
+    dense = chunker.calculate_sentence_similarities(sentences)
+    band = chunker.calculate_banded_similarities(sentences)
+    width = chunker.max_sentences
+
+    for i in range(count):
+        for k in range(width):
+            j = i - width + k
+            assert band[i, k] == pytest.approx(dense[i, j] if j >= 0 else 0.0, abs=1e-9)
+
+    boundaries = chunker.find_banded_boundaries(band)
+    assert boundaries == chunker.find_semantic_boundaries(dense)
+    # The boundaries keep going past the first block, so the block edge is really crossed
+    assert boundaries[-2] > SIMILARITY_BLOCK_SIZE - width
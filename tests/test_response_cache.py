@@ -0,0 +1,53 @@
+import threading
+import time
+
+import numpy as np
+
+from app.utils.response_cache import ResponseCache
+
+
+def make_cache(tmp_path, ttl=3600):
+    return ResponseCache(folder=str(tmp_path), ttl=ttl, similarity_threshold=0.9, max_collections=4, max_entries=100)
+
+
+def test_expired_best_match_does_not_hide_a_valid_one(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("legal", "Điều 5 quy định gì", "cũ", embedding=[1.0, 0.0])
+    cache.put("legal", "Điều 5 nói gì", "mới", embedding=[0.95, 0.05])
+    collection = cache._collections["legal"]
+    next(iter(collection.entries.values()))["created_at"] = time.time() - 7200
+
+    assert cache.get("legal", "Nội dung Điều 5", embedding=[1.0, 0.0]) == "mới"
+
+
+def test_answers_are_reloaded_from_disk(tmp_path):
+    make_cache(tmp_path).put("legal", "Điều 5 quy định gì?", "Trả lời", embedding=[1.0, 0.0])
+
+    cache = make_cache(tmp_path)
+    assert cache.get("legal", "điều 5 quy định gì") == "Trả lời"
+    assert cache.get("legal", "Câu khác", embedding=np.array([0.0, 1.0])) is None
+    assert cache.stats() == {"exact_hits": 1, "semantic_hits": 0, "misses": 1}
+
+
+def test_invalidate_drops_answers_in_memory_and_on_disk(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("legal", "Điều 5 quy định gì", "Trả lời")
+    cache.put("history", "Năm 1945", "Trả lời")
+    cache.invalidate("legal")
+
+    assert cache.get("legal", "Điều 5 quy định gì") is None
+    assert make_cache(tmp_path).get("legal", "Điều 5 quy định gì") is None
+    assert cache.get("history", "Năm 1945") == "Trả lời"
+
+
+def test_cold_load_only_holds_up_its_collection(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("history", "Năm 1945", "Trả lời")
+    legal = cache._get_collection("legal")
+    with legal.lock:
+        # A request of another collection is served while legal is busy loading
+        result = []
+        thread = threading.Thread(target=lambda: result.append(cache.get("history", "Năm 1945")))
+        thread.start()
+        thread.join(timeout=2)
+        assert result == ["Trả lời"]
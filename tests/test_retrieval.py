@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.chatbot import retrieval
+from app.chatbot.retrieval import FusedRetriever, QdrantRetriever
+
+
+class FakeRetriever(QdrantRetriever):
+    """Answers with one document after a delay instead of searching Qdrant."""
+    delay: float = 0.0
+
+    def search(self, query_vector, timeout=None, lexical_vector=None):
+        time.sleep(self.delay)
+        return [Document(page_content=self.collection_name)]
+
+    async def asearch(self, query_vector, timeout=None, lexical_vector=None):
+        await asyncio.sleep(self.delay)
+        return [Document(page_content=self.collection_name)]
+
+
+@pytest.fixture(autouse=True)
+def fake_embeddings(monkeypatch):
+    monkeypatch.setattr(retrieval, "_embeddings", {None: DeterministicFakeEmbedding(size=8)})
+
+
+def fused(*delays):
+    retrievers = [FakeRetriever(collection_name=f"collection-{i}", delay=delay) for i, delay in enumerate(delays)]
+    return FusedRetriever(retrievers=retrievers, weights=[1.0] * len(delays), search_timeout=0.2)
+
+
+def test_slow_collection_is_left_out():
+    documents = fused(0.0, 1.0).invoke("Điều 5")
+    assert [document.page_content for document in documents] == ["collection-0"]
+
+
+def test_every_search_timing_out_is_an_error():
+    with pytest.raises(TimeoutError):
+        fused(1.0, 1.0).invoke("Điều 5")
+
+
+def test_every_async_search_timing_out_is_an_error():
+    with pytest.raises(TimeoutError):
+        asyncio.run(fused(1.0, 1.0).ainvoke("Điều 5"))
+
+
+
+def test_invalidate_collection_info_forgets_the_lexical_lookup(monkeypatch):
+    lookups = []
+    monkeypatch.setattr(retrieval, "HYBRID_SEARCH_ENABLED", True)
+    monkeypatch.setattr(retrieval, "get_client", lambda: None)
+    monkeypatch.setattr(retrieval, "has_lexical_vectors", lambda client, name: lookups.append(name) or len(lookups) > 1)
+    monkeypatch.setattr(retrieval, "_lexical_collections", {})
+
+    assert not retrieval.is_hybrid_collection("alice")
+    assert not retrieval.is_hybrid_collection("alice")
+    retrieval.invalidate_collection_info("alice")
+    assert retrieval.is_hybrid_collection("alice")
+    assert lookups == ["alice", "alice"]
@@ -0,0 +1,66 @@
+from itertools import combinations
+
+import pytest
+
+from app.utils.text_processing import StreamingAnswerFormatter, format_response
+
+ANSWERS = [
+    "<start>\nXin chào\n<end>\n",
+    "<st<start>\nart>\nx",
+    "  <start>\nĐiều 5 quy định:\n\n- khoản 1\n- khoản 2 <end>\n  \n",
+    "Không có <end>\n thẻ <start> nào\n",
+    '<start>\n{"answer": "Hà Nội"}\n<end>\n',
+    'Trả lời: {"answer": "Hà Nội"}',
+    'Danh sách [1, 2] không phải JSON',
+    " \n\t ",
+]
+
+
+def splits(text, max_cuts=3):
+    """Yield every way of cutting a text into at most max_cuts + 1 tokens."""
+    for cuts in range(max_cuts + 1):
+        for positions in combinations(range(1, len(text)), cuts):
+            bounds = (0, *positions, len(text))
+            yield [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def stream(tokens):
+    """Feed the tokens and return what the client ends up with."""
+    formatter = StreamingAnswerFormatter()
+    streamed = "".join(formatter.feed(token) for token in tokens) + formatter.finish()
+    if formatter.replaced:
+        return formatter.message
+    assert streamed == formatter.message
+    return streamed
+
+
+@pytest.mark.parametrize("answer", ANSWERS)
+def test_streamed_answer_does_not_depend_on_token_splits(answer):
+    expected = format_response(answer)["message"]
+    outputs = {stream(tokens) for tokens in splits(answer)}
+    assert outputs == {expected}
+
+
+@pytest.mark.parametrize("answer", ANSWERS)
+def test_streamed_answer_character_by_character(answer):
+    assert stream(list(answer)) == format_response(answer)["message"]
+
+
+def test_json_after_a_preamble_replaces_the_streamed_text():
+    formatter = StreamingAnswerFormatter()
+    streamed = formatter.feed("Trả lời: ") + formatter.feed('{"answer": ') + formatter.feed('"Hà Nội"}')
+
+    assert streamed == "Trả lời: "
+    assert formatter.finish() == ""
+    assert formatter.replaced
+    assert formatter.message == "Hà Nội"
+
+
+def test_format_response_reports_the_rewrite():
+    answer = {"answer": "<start>\nXin chào", "rewrite": "skipped",
+              "rewrite_stats": {"skipped": 1, "cache_hit": 0, "rewritten": 0}}
+
+    response = format_response(answer, 1.5)
+
+    assert response == {"message": "Xin chào", "response_time_seconds": 1.5, "rewrite": "skipped",
+                        "rewrite_stats": {"skipped": 1, "cache_hit": 0, "rewritten": 0}}